@@ -0,0 +1,114 @@
+import logging
+import threading
+from collections import OrderedDict
+
+from PyQt5.QtCore import QThread, pyqtSignal
+
+from .metrics import latency_tracker, registry
+from .resources import register_current_thread
+
+logger = logging.getLogger(__name__)
+
+
+class AIProcessor(QThread):
+    """Runs AI backends on camera frames on a worker thread.
+
+    Each camera has a one-frame slot: a newer frame replaces one that has not
+    been picked up yet, so a slow model drops frames instead of building up
+    lag. Backends are callables ``backend(frame) -> list[Detection]``
+    registered per AI mode (the names offered by ``CameraView``); they
+    should take their input from ``frame.tensor()``/``frame.gray()`` so
+    conversions are shared with the other consumers of the frame. Plate
+    reads are checked against ``watchlist`` when one is set, and matches are
+    emitted as extra "watchlist_match" detections.
+    """
+
+    detection_ready = pyqtSignal(object)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.backends = {}
+        self.modes = {}
+        self.detection_listeners = []
+        self.watchlist = None
+        self.frames_dropped = 0
+        self._slots = OrderedDict()
+        self._cond = threading.Condition()
+        self._running = True
+
+    def register_backend(self, mode, backend):
+        self.backends[mode] = backend
+
+    def add_detection_listener(self, listener):
+        """Call ``listener(detection)`` on the worker thread for every detection"""
+        self.detection_listeners.append(listener)
+
+    def set_watchlist(self, watchlist):
+        """Swap in a new Watchlist (or None); takes effect from the next frame"""
+        self.watchlist = watchlist
+
+    def set_mode(self, camera_id, mode):
+        self.modes[camera_id] = mode
+        if mode not in self.backends:
+            with self._cond:
+                self._slots.pop(camera_id, None)
+            if mode != "None":
+                logger.warning(f"No AI backend registered for '{mode}'")
+
+    def submit(self, frame):
+        """Offer a frame for processing; safe to call from capture threads"""
+        # Keyframe previews are seconds apart and may come from cameras that are not connected
+        if frame.preview or self.modes.get(frame.camera_id, "None") not in self.backends:
+            return
+        latency_tracker.observe(frame, "enqueue")
+        with self._cond:
+            if self._slots.pop(frame.camera_id, None) is not None:
+                self.frames_dropped += 1
+                registry.counter("ai_frames_dropped_total", "Frames replaced before inference",
+                                 camera=frame.camera_id).inc()
+            self._slots[frame.camera_id] = frame
+            self._cond.notify()
+
+    def run(self):
+        register_current_thread("ai-worker")
+        while self._running:
+            with self._cond:
+                while self._running and not self._slots:
+                    self._cond.wait()
+                if not self._running:
+                    break
+                # Oldest waiting camera first, so busy cameras cannot starve others
+                _, frame = self._slots.popitem(last=False)
+            self.process(frame)
+
+    def process(self, frame):
+        latency_tracker.observe(frame, "dequeue")
+        mode = self.modes.get(frame.camera_id, "None")
+        backend = self.backends.get(mode)
+        if backend is None:
+            return
+        try:
+            detections = backend(frame) or []
+        except Exception as e:
+            logger.error(f"AI backend '{mode}' failed on camera {frame.camera_id}: {str(e)}")
+            return
+        latency_tracker.observe(frame, "inference")
+        watchlist = self.watchlist
+        if watchlist is not None and detections:
+            detections = list(detections) + watchlist.alerts(detections)
+        registry.counter("ai_frames_processed_total", "Frames run through an AI backend",
+                         camera=frame.camera_id, mode=mode).inc()
+        for detection in detections:
+            registry.counter("detections_total", "Detections emitted by the AI pipeline",
+                             camera=detection.camera_id, type=detection.event_type).inc()
+            for listener in self.detection_listeners:
+                try:
+                    listener(detection)
+                except Exception as e:
+                    logger.error(f"Detection listener failed: {str(e)}")
+            self.detection_ready.emit(detection)
+
+    def stop(self):
+        self._running = False
+        with self._cond:
+            self._cond.notify_all()
@@ -0,0 +1,836 @@
+import heapq
+import itertools
+import logging
+import os
+import random
+import threading
+import time
+
+from PyQt5.QtCore import QObject, QThread, pyqtSignal
+
+from models.camera import TransportOptions
+from models.frame import Frame
+from .keyframes import PREVIEW_INTERVAL, KeyframeDecoder, is_keyframe, raw_mode_supported
+from .metrics import latency_tracker, registry
+from .resources import register_current_thread, unregister_current_thread
+
+logger = logging.getLogger(__name__)
+
+# A stream that has not delivered a frame for this long is considered dead.
+FRAME_TIMEOUT = 5.0
+# Consecutive failed reads before the capture is dropped and reopened.
+MAX_DECODE_ERRORS = 25
+# Open/read timeouts handed to the FFmpeg backend so RTSP stalls surface
+# as read failures instead of blocking the capture thread forever.
+OPEN_TIMEOUT_MSEC = 5000
+READ_TIMEOUT_MSEC = 5000
+# A stopping capture thread may be stuck in open() or read() for a full timeout
+SHUTDOWN_TIMEOUT_MSEC = max(OPEN_TIMEOUT_MSEC, READ_TIMEOUT_MSEC) + 1000
+# Streams allowed to be inside cv2.VideoCapture() at the same time. Opening
+# is the expensive, NVR-heavy part of bringing a camera online.
+MAX_PARALLEL_OPENS = 8
+# Share of the CPU cores handed to FFmpeg decoding; the rest is left for
+# inference and the UI.
+DECODE_CPU_SHARE = 0.5
+# Frame threading adds a frame of latency per thread, and returns diminish
+# quickly beyond a few threads.
+MAX_DECODE_THREADS = 4
+# Resolution assumed for a stream until it has been opened once.
+DEFAULT_FRAME_PIXELS = 1920 * 1080
+# Protocols whose raw packets can be decoded one keyframe at a time; files
+# carry length-prefixed packets instead of an elementary stream.
+KEYFRAME_PROTOCOLS = ("RTSP", "HTTP")
+# Returned by the read helpers for a packet that was read but not turned into a frame
+_SKIPPED = object()
+# Frames per second posted to the display; AI and other listeners pick their own rate.
+DISPLAY_FPS = 25
+
+
+def camera_source(camera_info):
+    """Build the cv2.VideoCapture source string for a camera info dict"""
+    protocol = camera_info.get("protocol")
+    if protocol == "RTSP":
+        url = camera_info.get("rtsp_url", "")
+        username = camera_info.get("username")
+        if username and "@" not in url:
+            credentials = f"{username}:{camera_info.get('password', '')}@"
+            url = url.replace("rtsp://", f"rtsp://{credentials}", 1)
+        return url
+    if protocol == "HTTP":
+        return f"http://{camera_info.get('ip_address', '')}:{camera_info.get('port', '')}/"
+    return camera_info.get("file_path", "")
+
+
+def upstream_key(camera_info):
+    """Cameras with equal keys are served by a single capture session, or None if unshareable"""
+    source = camera_source(camera_info)
+    if not source:
+        return None
+    transport = TransportOptions.from_info(camera_info)
+    return source, transport.ffmpeg_options(camera_info.get("protocol")), transport.buffer_size
+
+
+class FrameRateLimiter:
+    """Frame listener that passes at most ``max_fps`` frames per second per camera on to ``listener``"""
+
+    def __init__(self, listener, max_fps):
+        self.listener = listener
+        self.interval = 1.0 / max_fps
+        self._due = {}
+
+    def __call__(self, frame):
+        at = frame.timestamps["capture"]
+        due = self._due.get(frame.camera_id, 0.0)
+        if at < due:
+            return
+        # Keep the cadence through jitter, but do not burst to catch up after a gap
+        self._due[frame.camera_id] = due + self.interval if at < due + self.interval else at + self.interval
+        self.listener(frame)
+
+
+class _FFmpegOptionsGate:
+    """Serialises access to OPENCV_FFMPEG_CAPTURE_OPTIONS.
+
+    OpenCV reads FFmpeg options from a process-wide environment variable
+    when a capture is opened. Opens that need the same option string may run
+    concurrently; an open with different options waits until they finish.
+    """
+
+    ENV_VAR = "OPENCV_FFMPEG_CAPTURE_OPTIONS"
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._current = None
+        self._active = 0
+
+    def acquire(self, options):
+        with self._cond:
+            while self._active and self._current != options:
+                self._cond.wait()
+            if self._current != options:
+                if options:
+                    os.environ[self.ENV_VAR] = options
+                else:
+                    os.environ.pop(self.ENV_VAR, None)
+                self._current = options
+            self._active += 1
+
+    def release(self):
+        with self._cond:
+            self._active -= 1
+            if not self._active:
+                self._cond.notify_all()
+
+
+_ffmpeg_options = _FFmpegOptionsGate()
+
+
+def default_decode_budget():
+    return max(1, int((os.cpu_count() or 1) * DECODE_CPU_SHARE))
+
+
+class DecodeThreadBudget:
+    """Splits a global number of FFmpeg decoder threads across the streams.
+
+    Decode cost grows with resolution, so each stream gets a share of
+    ``total`` proportional to its pixel count, between 1 and
+    ``max_per_stream``. One thread means the capture thread decodes by
+    itself. Shares are worked out whenever a stream (re)opens. Streams that
+    were opened before others joined keep their count until their next
+    reconnect.
+    """
+
+    def __init__(self, total=None, max_per_stream=MAX_DECODE_THREADS):
+        self.total = total or default_decode_budget()
+        self.max_per_stream = max_per_stream
+        self._pixels = {}
+        self._threads = {}
+        self._lock = threading.Lock()
+        registry.gauge("decode_threads_budget", "Decoder threads available to all streams",
+                       fn=lambda: self.total)
+        registry.gauge("decode_threads_allocated", "Decoder threads given to open streams",
+                       fn=lambda: sum(list(self._threads.values())))
+
+    def register(self, stream, pixels):
+        """Count ``stream`` towards the split before it opens"""
+        with self._lock:
+            self._pixels[stream] = pixels
+
+    def allocate(self, stream, pixels, requested=0):
+        """Decoder threads for ``stream`` opening at ``pixels``; ``requested`` overrides the share"""
+        with self._lock:
+            self._pixels[stream] = pixels
+            if requested:
+                threads = requested
+            else:
+                share = pixels / sum(self._pixels.values())
+                threads = max(1, min(self.max_per_stream, int(self.total * share)))
+            self._threads[stream] = threads
+        return threads
+
+    def release(self, stream):
+        with self._lock:
+            self._pixels.pop(stream, None)
+            self._threads.pop(stream, None)
+
+
+class ReconnectBackoff:
+    """Exponential backoff with full jitter.
+
+    Every failed attempt doubles the ceiling (up to ``cap``) and the actual
+    delay is drawn uniformly below it, so cameras that drop together do not
+    retry together.
+    """
+
+    def __init__(self, base=1.0, cap=60.0, rng=None):
+        self.base = base
+        self.cap = cap
+        self.attempt = 0
+        self._rng = rng or random.Random()
+
+    def next_delay(self):
+        ceiling = min(self.cap, self.base * (2 ** self.attempt))
+        self.attempt += 1
+        return self._rng.uniform(0, ceiling)
+
+    def reset(self):
+        self.attempt = 0
+
+
+class StreamHealth:
+    """Liveness counters written by the capture thread and read by monitors"""
+
+    def __init__(self):
+        self.opened_at = None
+        self.last_frame_at = None
+        self.frames = 0
+        self.decode_errors = 0
+        self.total_decode_errors = 0
+        self.open_failures = 0
+        self.last_error = ""
+
+    @property
+    def is_open(self):
+        return self.opened_at is not None
+
+    def mark_opened(self):
+        self.opened_at = time.monotonic()
+        self.decode_errors = 0
+        self.last_error = ""
+
+    def mark_closed(self, reason=""):
+        self.opened_at = None
+        if reason:
+            self.last_error = reason
+
+    def mark_open_failed(self, reason):
+        self.open_failures += 1
+        self.last_error = reason
+
+    def mark_packet(self):
+        """Data arrived but produced no frame (keyframe-only mode skips most packets)"""
+        self.last_frame_at = time.monotonic()
+        self.decode_errors = 0
+
+    def mark_frame(self):
+        self.last_frame_at = time.monotonic()
+        self.frames += 1
+        self.decode_errors = 0
+
+    def mark_decode_error(self, reason="read failed"):
+        self.decode_errors += 1
+        self.total_decode_errors += 1
+        self.last_error = reason
+
+    def check(self, now=None, frame_timeout=FRAME_TIMEOUT, max_decode_errors=MAX_DECODE_ERRORS):
+        """Return ``(alive, reason)`` for the stream at time ``now``"""
+        now = time.monotonic() if now is None else now
+        if not self.is_open:
+            return False, self.last_error or "capture not open"
+        if self.decode_errors >= max_decode_errors:
+            return False, f"{self.decode_errors} consecutive decode errors"
+        last_seen = max(self.opened_at, self.last_frame_at or 0)
+        if now - last_seen > frame_timeout:
+            return False, f"no frames for {now - last_seen:.1f}s"
+        return True, ""
+
+
+class CameraStream(QThread):
+    """Capture thread for one upstream camera session.
+
+    Reads frames with OpenCV, records liveness in ``health`` and delivers
+    every decoded frame as a ``Frame`` to each id in ``camera_ids`` (several
+    configured cameras may point at the same source). Reconnects are not
+    decided here: a monitor inspects ``health`` and calls
+    ``schedule_reconnect`` with its backoff delay.
+
+    ``listeners`` are called with each frame on the capture thread itself,
+    before the queued ``frame_ready`` signal; they must be quick and
+    thread-safe. ``frame_ready`` is limited to ``display_fps``.
+
+    With ``keyframes_only`` set (see ``set_keyframes_only``) the stream is
+    opened in raw mode: packets are only demuxed, and one keyframe every
+    ``preview_interval`` seconds is decoded and delivered as a ``preview``
+    frame. That keeps a camera list of previews alive at a small fraction of
+    the cost of full decoding.
+    """
+
+    frame_ready = pyqtSignal(int, object)
+    open_finished = pyqtSignal(int, bool)
+
+    def __init__(self, camera_id, camera_info, max_decode_errors=MAX_DECODE_ERRORS, open_slots=None,
+                 display_fps=DISPLAY_FPS, decode_budget=None):
+        super().__init__()
+        self.camera_id = camera_id
+        # Replaced as a whole (never mutated) so the capture thread can iterate it safely
+        self.camera_ids = (camera_id,)
+        self.camera_info = camera_info
+        self.max_decode_errors = max_decode_errors
+        self.open_slots = open_slots
+        self.decode_budget = decode_budget
+        # Width * height, learned on the first successful open
+        self.frame_pixels = DEFAULT_FRAME_PIXELS
+        self.keyframes_only = False
+        self.preview_interval = PREVIEW_INTERVAL
+        self.listeners = []
+        self.health = StreamHealth()
+        self._frames_total = registry.counter(
+            "camera_frames_total", "Frames decoded per camera", camera=camera_id)
+        self._decode_errors_total = registry.counter(
+            "camera_decode_errors_total", "Failed frame reads per camera", camera=camera_id)
+        self._running = True
+        self._reconnect_at = 0.0
+        self._drop_requested = False
+        self._wake = threading.Event()
+        self._raw = False
+        self._raw_unsupported = False
+        self._keyframes = None
+        self._next_preview = 0.0
+        self._display = self._emit_frame
+        if display_fps:
+            self._display = FrameRateLimiter(self._emit_frame, display_fps)
+
+    def _emit_frame(self, frame):
+        self.frame_ready.emit(frame.camera_id, frame)
+
+    def run(self):
+        register_current_thread(f"capture:{self.camera_id}")
+        capture = None
+        while self._running:
+            if capture is None:
+                if self._reconnect_at is None:
+                    self._wake.wait()
+                    self._wake.clear()
+                    continue
+                delay = self._reconnect_at - time.monotonic()
+                if delay > 0:
+                    self._wake.wait(delay)
+                    self._wake.clear()
+                    continue
+                if self.open_slots is not None:
+                    with self.open_slots:
+                        capture = self._open_capture() if self._running else None
+                else:
+                    capture = self._open_capture()
+                for camera_id in self.camera_ids:
+                    self.open_finished.emit(camera_id, capture is not None)
+                if capture is None:
+                    # Wait for the monitor to schedule the next attempt
+                    self._reconnect_at = None
+                continue
+
+            if self._drop_requested:
+                self._release(capture, "reconnect requested")
+                capture = None
+                continue
+
+            if self._raw:
+                frame = self._read_keyframe(capture)
+            else:
+                frame = self._read_frame(capture)
+                if frame is not None and self.keyframes_only and frame.timestamps["capture"] < self._next_preview:
+                    # No raw mode here, so everything is decoded; only the preview rate is kept
+                    frame = _SKIPPED
+            if frame is _SKIPPED:
+                self.health.mark_packet()
+                continue
+            if frame is not None:
+                if self.keyframes_only:
+                    frame.preview = True
+                    self._next_preview = frame.timestamps["capture"] + self.preview_interval
+                self.health.mark_frame()
+                self._frames_total.inc()
+                for camera_id in self.camera_ids:
+                    self._deliver(frame if camera_id == frame.camera_id else frame.for_camera(camera_id))
+                continue
+
+            self.health.mark_decode_error()
+            self._decode_errors_total.inc()
+            if self.health.decode_errors >= self.max_decode_errors:
+                self._release(capture, f"{self.health.decode_errors} consecutive decode errors")
+                capture = None
+                self._reconnect_at = None
+
+        if capture is not None:
+            self._release(capture, "stopped")
+        if self.decode_budget is not None:
+            # Also covers an open that raced with disconnect_camera
+            self.decode_budget.release(self)
+        unregister_current_thread()
+
+    def _deliver(self, frame):
+        for listener in self.listeners:
+            try:
+                listener(frame)
+            except Exception as e:
+                logger.error(f"Frame listener failed for camera {frame.camera_id}: {str(e)}")
+        self._display(frame)
+
+    def _read_frame(self, capture):
+        # grab() waits for a packet, demuxes and decodes it; retrieve() converts to a BGR array.
+        # The frame counts as captured once grab() returns, so idle waiting for the
+        # camera's next frame stays out of every span but "grab".
+        read_at = time.monotonic()
+        if not capture.grab():
+            return None
+        captured_at = time.monotonic()
+        ok, image = capture.retrieve()
+        if not ok or image is None:
+            return None
+        return self._timed_frame(image, read_at, captured_at)
+
+    def _read_keyframe(self, capture):
+        # Raw mode: grab() only demuxes, nothing is decoded unless it becomes a preview
+        read_at = time.monotonic()
+        if not capture.grab():
+            return None
+        captured_at = time.monotonic()
+        if not is_keyframe(capture) or captured_at < self._next_preview:
+            return _SKIPPED
+        ok, packet = capture.retrieve()
+        if not ok or packet is None:
+            return None
+        if self._keyframes is None:
+            self._keyframes = KeyframeDecoder(capture)
+            if not self._keyframes.supported:
+                logger.warning(f"Camera {self.camera_id} sends '{self._keyframes.codec}', which cannot be "
+                               f"decoded one keyframe at a time; previews fall back to full decoding")
+                self._raw_unsupported = True
+                self.schedule_reconnect(0)
+                return _SKIPPED
+        image = self._keyframes.decode(packet)
+        if image is None:
+            return None
+        return self._timed_frame(image, read_at, captured_at)
+
+    def _timed_frame(self, image, read_at, captured_at):
+        frame = Frame(self.camera_id, image, self.health.frames, captured_at)
+        frame.mark("read", read_at)
+        latency_tracker.observe(frame, "capture", captured_at)
+        latency_tracker.observe(frame, "decode")
+        return frame
+
+    def _wants_raw(self):
+        return (self.keyframes_only and not self._raw_unsupported and raw_mode_supported()
+                and self.camera_info.get("protocol") in KEYFRAME_PROTOCOLS)
+
+    def set_keyframes_only(self, keyframes_only):
+        """Switch between full decoding and keyframe previews, reopening the stream if needed"""
+        if keyframes_only == self.keyframes_only:
+            return
+        self.keyframes_only = keyframes_only
+        self._next_preview = 0.0
+        if self._wants_raw() != self._raw:
+            self.schedule_reconnect(0)
+
+    def _open_capture(self):
+        # Imported on the capture thread: OpenCV is slow to load and not needed for the first paint
+        import cv2
+        source = camera_source(self.camera_info)
+        params = []
+        for prop, value in (("CAP_PROP_OPEN_TIMEOUT_MSEC", OPEN_TIMEOUT_MSEC),
+                            ("CAP_PROP_READ_TIMEOUT_MSEC", READ_TIMEOUT_MSEC)):
+            if hasattr(cv2, prop):
+                params += [getattr(cv2, prop), value]
+        transport = TransportOptions.from_info(self.camera_info)
+        raw = self._wants_raw()
+        threads = transport.decode_threads
+        if raw:
+            params += [cv2.CAP_PROP_FORMAT, -1]
+            # Keyframes are decoded one at a time off the session; it takes no decoder threads
+            threads = 0
+            if self.decode_budget is not None:
+                self.decode_budget.release(self)
+        elif self.decode_budget is not None:
+            threads = self.decode_budget.allocate(self, self.frame_pixels, transport.decode_threads)
+        # Older OpenCV builds cannot set decoder threads and let FFmpeg pick one per core
+        if threads and hasattr(cv2, "CAP_PROP_N_THREADS"):
+            params += [cv2.CAP_PROP_N_THREADS, threads]
+        if transport.hw_decode and hasattr(cv2, "CAP_PROP_HW_ACCELERATION"):
+            # Falls back to software decoding when no accelerator is usable
+            params += [cv2.CAP_PROP_HW_ACCELERATION, cv2.VIDEO_ACCELERATION_ANY]
+        _ffmpeg_options.acquire(transport.ffmpeg_options(self.camera_info.get("protocol")))
+        try:
+            capture = cv2.VideoCapture(source, cv2.CAP_FFMPEG, params)
+        except Exception as e:
+            self.health.mark_open_failed(str(e))
+            logger.error(f"Failed to open camera {self.camera_id}: {str(e)}")
+            return None
+        finally:
+            _ffmpeg_options.release()
+        if not capture.isOpened():
+            capture.release()
+            self.health.mark_open_failed("open failed")
+            logger.warning(f"Could not open stream for camera {self.camera_id}")
+            return None
+        if transport.buffer_size:
+            capture.set(cv2.CAP_PROP_BUFFERSIZE, transport.buffer_size)
+        self._drop_requested = False
+        self._raw = raw
+        self.health.mark_opened()
+        width = int(capture.get(cv2.CAP_PROP_FRAME_WIDTH))
+        height = int(capture.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        if width > 0 and height > 0:
+            self.frame_pixels = width * height
+            if self.decode_budget is not None and not raw:
+                self.decode_budget.register(self, self.frame_pixels)
+        decoding = "keyframes only" if raw else f"{threads or 'auto'} decode threads"
+        logger.info(f"Opened stream for camera {self.camera_id} ({width}x{height}, {decoding})")
+        return capture
+
+    def _release(self, capture, reason):
+        capture.release()
+        if self._keyframes is not None:
+            self._keyframes.close()
+            self._keyframes = None
+        self.health.mark_closed(reason)
+        logger.info(f"Released stream for camera {self.camera_id}: {reason}")
+
+    def schedule_reconnect(self, delay):
+        """Drop the current capture (if any) and reopen after ``delay`` seconds"""
+        self._reconnect_at = time.monotonic() + delay
+        self._drop_requested = True
+        self._wake.set()
+
+    def stop(self):
+        self._running = False
+        self._drop_requested = True
+        self._wake.set()
+
+
+class _Watch:
+    """Supervisor bookkeeping for one camera"""
+
+    def __init__(self, camera_id, stream, grace):
+        self.camera_id = camera_id
+        self.stream = stream
+        self.backoff = ReconnectBackoff()
+        self.connected = False
+        self.next_attempt = time.monotonic() + grace
+
+
+class ConnectionSupervisor(QThread):
+    """Single thread that watches the health of every camera stream.
+
+    Checks are kept in a heap ordered by due time, so the thread sleeps
+    until the next camera is due instead of polling each one on its own
+    thread. Dead streams are reopened with ``ReconnectBackoff`` delays.
+    """
+
+    connection_lost = pyqtSignal(int)
+    connection_restored = pyqtSignal(int)
+
+    def __init__(self, check_interval=1.0, frame_timeout=FRAME_TIMEOUT):
+        super().__init__()
+        self.check_interval = check_interval
+        self.frame_timeout = frame_timeout
+        # Time an open attempt is allowed before it is judged
+        self.grace = OPEN_TIMEOUT_MSEC / 1000.0
+        self._watches = {}
+        self._schedule = []
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._running = True
+
+    def watch(self, camera_id, stream):
+        """Start supervising ``stream``; replaces any previous stream for the camera"""
+        with self._lock:
+            watch = _Watch(camera_id, stream, self.grace)
+            self._watches[camera_id] = watch
+            # Spread first checks over one interval so large batches do not align
+            due = time.monotonic() + random.uniform(0, self.check_interval)
+            heapq.heappush(self._schedule, (due, next(self._counter), watch))
+        self._wake.set()
+
+    def unwatch(self, camera_id):
+        with self._lock:
+            self._watches.pop(camera_id, None)
+
+    def rename(self, camera_id, new_camera_id):
+        """Keep supervising a stream, with its backoff and state, under another camera id"""
+        with self._lock:
+            watch = self._watches.pop(camera_id, None)
+            if watch is not None:
+                watch.camera_id = new_camera_id
+                self._watches[new_camera_id] = watch
+
+    def is_connected(self, camera_id):
+        watch = self._watches.get(camera_id)
+        return watch is not None and watch.connected
+
+    def run(self):
+        register_current_thread("supervisor")
+        while self._running:
+            with self._lock:
+                timeout = None
+                if self._schedule:
+                    timeout = max(0.0, self._schedule[0][0] - time.monotonic())
+            if timeout is None or timeout > 0:
+                self._wake.wait(timeout)
+                self._wake.clear()
+                continue
+            self._run_due(time.monotonic())
+
+    def _run_due(self, now):
+        due_watches = []
+        with self._lock:
+            while self._schedule and self._schedule[0][0] <= now:
+                _, _, watch = heapq.heappop(self._schedule)
+                if self._watches.get(watch.camera_id) is not watch:
+                    # Unwatched or replaced since it was scheduled
+                    continue
+                due_watches.append(watch)
+                heapq.heappush(self._schedule, (now + self.check_interval, next(self._counter), watch))
+        for watch in due_watches:
+            self._check(watch, now)
+
+    def _check(self, watch, now):
+        try:
+            alive, reason = watch.stream.health.check(now, self.frame_timeout)
+        except Exception as e:
+            logger.error(f"Connection check failed for camera {watch.camera_id}: {str(e)}")
+            alive, reason = False, str(e)
+
+        if alive:
+            if not watch.connected:
+                watch.connected = True
+                watch.backoff.reset()
+                for camera_id in watch.stream.camera_ids:
+                    self.connection_restored.emit(camera_id)
+            return
+
+        if watch.connected:
+            watch.connected = False
+            logger.warning(f"Camera {watch.camera_id} unhealthy: {reason}")
+            for camera_id in watch.stream.camera_ids:
+                self.connection_lost.emit(camera_id)
+        if now >= watch.next_attempt:
+            delay = watch.backoff.next_delay()
+            watch.next_attempt = now + delay + self.grace
+            logger.info(f"Reconnecting camera {watch.camera_id} in {delay:.1f}s "
+                        f"(attempt {watch.backoff.attempt})")
+            registry.counter("camera_reconnects_total", "Reconnect attempts per camera",
+                             camera=watch.camera_id).inc()
+            watch.stream.schedule_reconnect(delay)
+
+    def stop(self):
+        self._running = False
+        self._wake.set()
+
+
+class CameraManager(QObject):
+    """Owns the capture threads of all connected cameras.
+
+    Connecting never blocks the caller: each stream opens on its own thread,
+    at most ``max_parallel_opens`` at a time, and batch progress is reported
+    through ``connect_progress``.
+
+    Cameras whose sources match (see ``upstream_key``) share one capture
+    session: cheap IP cameras only allow a few concurrent RTSP sessions, so
+    display, AI and any other consumer are fed from a single connection and
+    decode, each through its own listener at its own rate.
+
+    Cameras connected with ``keyframes_only`` only decode a keyframe every
+    few seconds, for previews. A shared session decodes fully as soon as
+    one of its cameras needs full frames.
+    """
+
+    frame_ready = pyqtSignal(int, object)
+    connection_lost = pyqtSignal(int)
+    connection_restored = pyqtSignal(int)
+    camera_opened = pyqtSignal(int, bool)
+    connect_progress = pyqtSignal(int, int)
+
+    def __init__(self, max_parallel_opens=MAX_PARALLEL_OPENS, display_fps=DISPLAY_FPS,
+                 decode_threads=None, parent=None):
+        super().__init__(parent)
+        self.display_fps = display_fps
+        self.decode_budget = DecodeThreadBudget(decode_threads)
+        # camera id -> stream; cameras sharing an upstream map to the same stream
+        self.streams = {}
+        # upstream_key -> stream
+        self.upstreams = {}
+        # Cameras that only need keyframe previews
+        self.keyframes_only = set()
+        self.frame_listeners = []
+        self.open_slots = threading.BoundedSemaphore(max_parallel_opens)
+        self.supervisor = ConnectionSupervisor()
+        self.supervisor.connection_lost.connect(self.connection_lost)
+        self.supervisor.connection_restored.connect(self.connection_restored)
+        self.supervisor.start()
+        self._pending = set()
+        self._batch_total = 0
+        # Stopped streams whose thread is still unwinding; dropping the last
+        # reference to a running QThread aborts the process
+        self._stopping = set()
+        registry.gauge("cameras_streaming", "Cameras with a running capture thread",
+                       fn=lambda: len(self.streams))
+        registry.gauge("camera_upstream_sessions", "Capture sessions open towards cameras",
+                       fn=lambda: len(set(map(id, list(self.streams.values())))))
+        registry.gauge("cameras_connected", "Cameras currently delivering frames",
+                       fn=lambda: sum(1 for camera_id in list(self.streams) if self.is_connected(camera_id)))
+
+    def is_connected(self, camera_id):
+        stream = self.streams.get(camera_id)
+        return stream is not None and self.supervisor.is_connected(stream.camera_id)
+
+    def add_frame_listener(self, listener, max_fps=None):
+        """Call ``listener(frame)`` on the capture thread for every frame of every camera,
+        or at most ``max_fps`` frames per second per camera"""
+        if max_fps:
+            listener = FrameRateLimiter(listener, max_fps)
+        self.frame_listeners.append(listener)
+        for stream in self.streams.values():
+            stream.listeners.append(listener)
+
+    def is_streaming(self, camera_id):
+        return camera_id in self.streams
+
+    def connect_camera(self, camera_id, camera_info):
+        self.connect_cameras([(camera_id, camera_info)])
+
+    def connect_cameras(self, cameras, keyframes_only=False):
+        """Start streams for ``(camera_id, camera_info)`` pairs without waiting for them to open.
+
+        Cameras already streaming are left as they are; use ``set_keyframes_only``
+        to change how they decode.
+        """
+        started = 0
+        new_streams = []
+        if not self._pending:
+            self._batch_total = 0
+        for camera_id, camera_info in cameras:
+            if camera_id in self.streams:
+                continue
+            self._batch_total += 1
+            if keyframes_only:
+                self.keyframes_only.add(camera_id)
+            key = upstream_key(camera_info)
+            stream = self.upstreams.get(key) if key is not None else None
+            if stream is not None:
+                self._share_stream(camera_id, stream)
+                started += 1
+                continue
+            stream = CameraStream(camera_id, camera_info, open_slots=self.open_slots,
+                                  display_fps=self.display_fps, decode_budget=self.decode_budget)
+            stream.keyframes_only = keyframes_only
+            stream.listeners.extend(self.frame_listeners)
+            if self.receivers(self.frame_ready):
+                # Without a display attached (headless) frames are not posted to the main thread at all
+                stream.frame_ready.connect(self.frame_ready)
+            stream.open_finished.connect(self._on_open_finished)
+            self.streams[camera_id] = stream
+            if key is not None:
+                self.upstreams[key] = stream
+            self._pending.add(camera_id)
+            # Known before any of the batch opens, so the first streams do not take the whole budget
+            self.decode_budget.register(stream, stream.frame_pixels)
+            new_streams.append(stream)
+            started += 1
+        for stream in new_streams:
+            stream.start()
+            self.supervisor.watch(stream.camera_id, stream)
+        if started:
+            self.connect_progress.emit(self._batch_total - len(self._pending), self._batch_total)
+        return started
+
+    def _share_stream(self, camera_id, stream):
+        self.streams[camera_id] = stream
+        stream.camera_ids = stream.camera_ids + (camera_id,)
+        # The open result arrives through open_finished unless the session is already up
+        if stream.health.is_open:
+            self.camera_opened.emit(camera_id, True)
+        else:
+            self._pending.add(camera_id)
+        self._update_decode_mode(stream)
+        logger.info(f"Camera {camera_id} shares the upstream session of camera {stream.camera_id}")
+
+    def set_keyframes_only(self, camera_id, keyframes_only):
+        """Decode only periodic keyframes for ``camera_id``, or go back to every frame"""
+        if keyframes_only:
+            self.keyframes_only.add(camera_id)
+        else:
+            self.keyframes_only.discard(camera_id)
+        stream = self.streams.get(camera_id)
+        if stream is not None:
+            self._update_decode_mode(stream)
+
+    def is_keyframes_only(self, camera_id):
+        return camera_id in self.keyframes_only
+
+    def _update_decode_mode(self, stream):
+        stream.set_keyframes_only(all(camera_id in self.keyframes_only for camera_id in stream.camera_ids))
+
+    def _on_open_finished(self, camera_id, ok):
+        self.camera_opened.emit(camera_id, ok)
+        if camera_id in self._pending:
+            self._pending.discard(camera_id)
+            self.connect_progress.emit(self._batch_total - len(self._pending), self._batch_total)
+
+    def disconnect_camera(self, camera_id):
+        stream = self.streams.pop(camera_id, None)
+        if stream is None:
+            return False
+        self.keyframes_only.discard(camera_id)
+        stream.camera_ids = tuple(other for other in stream.camera_ids if other != camera_id)
+        if stream.camera_ids:
+            self._update_decode_mode(stream)
+            # Other cameras still use the session; hand it over instead of closing it
+            if stream.camera_id == camera_id:
+                stream.camera_id = stream.camera_ids[0]
+                self.supervisor.rename(camera_id, stream.camera_id)
+        else:
+            self.upstreams = {key: other for key, other in self.upstreams.items() if other is not stream}
+            self.supervisor.unwatch(stream.camera_id)
+            self.decode_budget.release(stream)
+            self._stop_stream(stream)
+        if camera_id in self._pending:
+            self._pending.discard(camera_id)
+            self.connect_progress.emit(self._batch_total - len(self._pending), self._batch_total)
+        return True
+
+    def _stop_stream(self, stream):
+        self._stopping.add(stream)
+        stream.finished.connect(lambda: self._on_stream_finished(stream))
+        stream.stop()
+
+    def _on_stream_finished(self, stream):
+        if stream in self._stopping:
+            self._stopping.discard(stream)
+            stream.deleteLater()
+
+    def disconnect_all(self):
+        for camera_id in list(self.streams):
+            self.disconnect_camera(camera_id)
+
+    def shutdown(self, timeout_ms=SHUTDOWN_TIMEOUT_MSEC):
+        """Stop the supervisor and every capture thread"""
+        self.supervisor.stop()
+        self.disconnect_all()
+        self.supervisor.wait()
+        for stream in list(self._stopping):
+            if stream.wait(timeout_ms):
+                self._stopping.discard(stream)
+            else:
+                logger.warning(f"Capture thread for camera {stream.camera_id} did not stop in time")
@@ -0,0 +1,97 @@
+import bisect
+import re
+import threading
+from collections import deque
+
+CAPACITY = 5000
+
+_PLATE_SEPARATORS = re.compile(r"[\s.\-_]")
+
+
+def normalize_plate(text):
+    """Uppercase plate text without separators, so "51a-123.45" matches "51A12345" """
+    return _PLATE_SEPARATORS.sub("", text or "").upper()
+
+
+class DetectionIndex:
+    """Bounded buffer of recent detections indexed by camera, type and plate prefix.
+
+    Every index holds sequence numbers in arrival order, so evicting the
+    oldest detection only pops from the left of its camera and type
+    indexes. Plates are kept in a sorted list, making a prefix search two
+    bisections instead of a scan.
+    """
+
+    def __init__(self, capacity=CAPACITY):
+        self.capacity = capacity
+        self._entries = {}
+        self._order = deque()
+        self._by_camera = {}
+        self._by_type = {}
+        self._plates = []
+        self._next_seq = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._order)
+
+    def cameras(self):
+        with self._lock:
+            return sorted(self._by_camera)
+
+    def add(self, detection, item=None):
+        """Index ``detection``; ``item`` is what queries return for it (default: the detection)"""
+        with self._lock:
+            seq = self._next_seq
+            self._next_seq += 1
+            self._entries[seq] = (detection, detection if item is None else item)
+            self._order.append(seq)
+            self._by_camera.setdefault(detection.camera_id, deque()).append(seq)
+            self._by_type.setdefault(detection.event_type, deque()).append(seq)
+            plate = normalize_plate(detection.label)
+            if plate:
+                bisect.insort(self._plates, (plate, seq))
+            while len(self._order) > self.capacity:
+                self._evict()
+
+    def _evict(self):
+        seq = self._order.popleft()
+        detection, _ = self._entries.pop(seq)
+        for index, key in ((self._by_camera, detection.camera_id), (self._by_type, detection.event_type)):
+            seqs = index[key]
+            seqs.popleft()
+            if not seqs:
+                del index[key]
+        plate = normalize_plate(detection.label)
+        if plate:
+            del self._plates[bisect.bisect_left(self._plates, (plate, seq))]
+
+    @staticmethod
+    def matches(detection, camera_id=None, event_type=None, plate_prefix=""):
+        return ((camera_id is None or detection.camera_id == camera_id)
+                and (event_type is None or detection.event_type == event_type)
+                and normalize_plate(detection.label).startswith(normalize_plate(plate_prefix)))
+
+    def query(self, camera_id=None, event_type=None, plate_prefix="", limit=None):
+        """Items of matching detections, newest first"""
+        prefix = normalize_plate(plate_prefix)
+        with self._lock:
+            candidates = []
+            if camera_id is not None:
+                candidates.append(self._by_camera.get(camera_id, ()))
+            if event_type is not None:
+                candidates.append(self._by_type.get(event_type, ()))
+            if prefix:
+                start = bisect.bisect_left(self._plates, (prefix,))
+                end = bisect.bisect_left(self._plates, (prefix + "\uffff",))
+                candidates.append(sorted(seq for _, seq in self._plates[start:end]))
+            # Walk the smallest candidate list and check the other filters per entry
+            seqs = min(candidates, key=len) if candidates else self._order
+            items = []
+            for seq in reversed(seqs):
+                detection, item = self._entries[seq]
+                if self.matches(detection, camera_id, event_type, prefix):
+                    items.append(item)
+                    if limit is not None and len(items) >= limit:
+                        break
+            return items
@@ -0,0 +1,284 @@
+import json
+import logging
+import math
+import os
+import queue
+import sqlite3
+import threading
+import time
+import urllib.parse
+
+from .metrics import registry
+from .resources import register_current_thread
+from utils.helpers import app_data_dir
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 500
+FLUSH_INTERVAL = 0.25
+QUEUE_SIZE = 100000
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    id INTEGER PRIMARY KEY,
+    ts REAL NOT NULL,
+    camera_id INTEGER NOT NULL,
+    event_type TEXT NOT NULL,
+    label TEXT NOT NULL DEFAULT '',
+    confidence REAL NOT NULL DEFAULT 0,
+    details TEXT NOT NULL DEFAULT '',
+    thumbnail TEXT NOT NULL DEFAULT ''
+);
+CREATE INDEX IF NOT EXISTS idx_events_ts ON events(ts);
+CREATE INDEX IF NOT EXISTS idx_events_camera_ts ON events(camera_id, ts);
+CREATE INDEX IF NOT EXISTS idx_events_type_ts ON events(event_type, ts);
+CREATE TABLE IF NOT EXISTS event_rollups (
+    bucket INTEGER NOT NULL,
+    camera_id INTEGER NOT NULL,
+    event_type TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (bucket, camera_id, event_type)
+) WITHOUT ROWID;
+"""
+
+# Rollup bucket width. Local days start on a bucket boundary in every
+# whole-hour UTC offset, so day reports can be summed from hour buckets.
+ROLLUP_SECONDS = 3600
+SCHEMA_VERSION = 2
+
+
+def default_path():
+    return os.path.join(app_data_dir("data"), "events.db")
+
+
+class EventStore:
+    """Append-only detection log in SQLite (WAL mode).
+
+    ``append`` only enqueues, so the AI worker never waits on disk; a writer
+    thread drains the queue and inserts in batches of up to ``BATCH_SIZE``
+    rows per transaction. Readers use their own per-thread connections,
+    which WAL lets run concurrently with the writer.
+
+    With ``read_only`` the store only queries a database another process
+    writes: no schema setup, migration or writer thread, and ``append``
+    does nothing.
+    """
+
+    def __init__(self, path=None, batch_size=BATCH_SIZE, flush_interval=FLUSH_INTERVAL, thumbnails=None,
+                 read_only=False):
+        self.path = path or default_path()
+        self.read_only = read_only
+        self.thumbnails = thumbnails
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue = queue.Queue(QUEUE_SIZE)
+        self._local = threading.local()
+        self._dropped = registry.counter("event_store_dropped_total", "Events dropped because the write queue was full")
+        self._written = registry.counter("event_store_written_total", "Events committed to the event store")
+        registry.gauge("event_store_queue_depth", "Events waiting to be written", fn=self._queue.qsize)
+        self._writer = None
+        if read_only:
+            return
+
+        connection = self._connect()
+        connection.executescript(SCHEMA)
+        self._migrate(connection)
+        connection.commit()
+        self._writer_connection = connection
+        self._running = True
+        self._writer = threading.Thread(target=self._write_loop, name="event-store-writer")
+        self._writer.start()
+
+    def _connect(self):
+        if self.read_only:
+            # mode=ro never creates or writes the file, not even the WAL setting
+            uri = f"file:{urllib.parse.quote(os.path.abspath(self.path))}?mode=ro"
+            return sqlite3.connect(uri, uri=True, check_same_thread=False)
+        connection = sqlite3.connect(self.path, check_same_thread=False)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        return connection
+
+    @staticmethod
+    def _migrate(connection):
+        version = connection.execute("PRAGMA user_version").fetchone()[0]
+        if version < 1:
+            # Rollups were added after events; build them once from the raw log
+            with connection:
+                connection.execute("DELETE FROM event_rollups")
+                connection.execute(
+                    f"INSERT INTO event_rollups (bucket, camera_id, event_type, count) "
+                    f"SELECT CAST(ts / {ROLLUP_SECONDS} AS INTEGER) * {ROLLUP_SECONDS}, camera_id, event_type, COUNT(*) "
+                    f"FROM events GROUP BY 1, 2, 3")
+        if version < 2:
+            columns = [row[1] for row in connection.execute("PRAGMA table_info(events)")]
+            if "thumbnail" not in columns:
+                connection.execute("ALTER TABLE events ADD COLUMN thumbnail TEXT NOT NULL DEFAULT ''")
+        connection.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    def reader(self):
+        """Connection for the calling thread, for read-only queries"""
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = self._connect()
+            connection.execute("PRAGMA query_only=ON")
+            self._local.connection = connection
+        return connection
+
+    @staticmethod
+    def _row(detection):
+        details = {}
+        if detection.bbox:
+            details["bbox"] = list(detection.bbox)
+        return (detection.timestamp, int(detection.camera_id), detection.event_type,
+                detection.label or "", float(detection.confidence or 0.0),
+                json.dumps(details) if details else "", detection.thumbnail or "")
+
+    def append(self, detection):
+        """Queue a Detection for writing; never blocks.
+
+        With a thumbnail store attached, the crop is queued there too and
+        its key is set on ``detection.thumbnail`` before this returns.
+        """
+        if self.read_only:
+            return
+        if self.thumbnails is not None and detection.crop is not None and not detection.thumbnail:
+            detection.thumbnail = self.thumbnails.put(detection.crop, detection.timestamp)
+        try:
+            self._queue.put_nowait(self._row(detection))
+        except queue.Full:
+            self._dropped.inc()
+
+    def _write_loop(self):
+        register_current_thread("event-store")
+        while self._running or not self._queue.empty():
+            try:
+                batch = [self._queue.get(timeout=self.flush_interval)]
+            except queue.Empty:
+                continue
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            try:
+                self._write_batch(self._writer_connection, batch)
+                self._written.inc(len(batch))
+            except sqlite3.Error as e:
+                logger.error(f"Failed to write {len(batch)} events: {str(e)}")
+
+    def _write_batch(self, connection, rows):
+        rollups = {}
+        for ts, camera_id, event_type, *_ in rows:
+            key = (int(ts // ROLLUP_SECONDS) * ROLLUP_SECONDS, camera_id, event_type)
+            rollups[key] = rollups.get(key, 0) + 1
+        # Events and their rollup counts commit in the same transaction
+        with connection:
+            connection.executemany(
+                "INSERT INTO events (ts, camera_id, event_type, label, confidence, details, thumbnail) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+            connection.executemany(
+                "INSERT INTO event_rollups (bucket, camera_id, event_type, count) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (bucket, camera_id, event_type) DO UPDATE SET count = count + excluded.count",
+                [key + (count,) for key, count in rollups.items()])
+
+    @staticmethod
+    def _where(start, end, camera_ids=None, event_types=None):
+        clauses = ["ts >= ?", "ts < ?"]
+        params = [start, end]
+        if camera_ids:
+            clauses.append(f"camera_id IN ({','.join('?' * len(camera_ids))})")
+            params.extend(int(camera_id) for camera_id in camera_ids)
+        if event_types:
+            clauses.append(f"event_type IN ({','.join('?' * len(event_types))})")
+            params.extend(event_types)
+        return " AND ".join(clauses), params
+
+    def query(self, start, end, camera_ids=None, event_types=None, limit=1000, after=None):
+        """Events in ``[start, end)`` (unix seconds), newest first.
+
+        Pass the ``(ts, id)`` of the last row already seen as ``after`` to get
+        the next page; unlike OFFSET this stays an index seek on deep pages.
+        """
+        where, params = self._where(start, end, camera_ids, event_types)
+        if after is not None:
+            where += " AND (ts, id) < (?, ?)"
+            params.extend(after)
+        cursor = self.reader().execute(
+            f"SELECT id, ts, camera_id, event_type, label, confidence, details, thumbnail FROM events "
+            f"WHERE {where} ORDER BY ts DESC, id DESC LIMIT ?", params + [limit])
+        return cursor.fetchall()
+
+    def thumbnail(self, event_id):
+        """Thumbnail store key of event ``event_id``, or ''"""
+        row = self.reader().execute("SELECT thumbnail FROM events WHERE id = ?", (event_id,)).fetchone()
+        return row[0] if row else ""
+
+    def count(self, start, end, camera_ids=None, event_types=None):
+        return sum(count for _, _, count in self.summary(start, end, camera_ids, event_types))
+
+    @staticmethod
+    def _aligned(start, end):
+        """Split ``[start, end)`` into the whole rollup buckets it covers"""
+        aligned_start = math.ceil(start / ROLLUP_SECONDS) * ROLLUP_SECONDS
+        if end >= time.time():
+            # Nothing is newer than now, so the open bucket already holds
+            # exactly the events up to ``end``
+            aligned_end = math.ceil(end / ROLLUP_SECONDS) * ROLLUP_SECONDS
+        else:
+            aligned_end = math.floor(end / ROLLUP_SECONDS) * ROLLUP_SECONDS
+        return aligned_start, max(aligned_start, aligned_end)
+
+    def _raw_summary(self, start, end, camera_ids, event_types):
+        if end <= start:
+            return []
+        where, params = self._where(start, end, camera_ids, event_types)
+        return self.reader().execute(
+            f"SELECT camera_id, event_type, COUNT(*) FROM events WHERE {where} "
+            f"GROUP BY camera_id, event_type", params).fetchall()
+
+    def _rollup_where(self, start, end, camera_ids, event_types):
+        where, params = self._where(start, end, camera_ids, event_types)
+        return where.replace("ts >= ?", "bucket >= ?").replace("ts < ?", "bucket < ?"), params
+
+    def summary(self, start, end, camera_ids=None, event_types=None):
+        """Return ``[(camera_id, event_type, count)]`` for ``[start, end)``.
+
+        Whole hours are read from the rollup table; only the partial hours at
+        either edge touch the raw event log.
+        """
+        aligned_start, aligned_end = self._aligned(start, end)
+        if aligned_start >= aligned_end:
+            return self._raw_summary(start, end, camera_ids, event_types)
+        where, params = self._rollup_where(aligned_start, aligned_end, camera_ids, event_types)
+        totals = {}
+        parts = [
+            self.reader().execute(
+                f"SELECT camera_id, event_type, SUM(count) FROM event_rollups WHERE {where} "
+                f"GROUP BY camera_id, event_type", params).fetchall(),
+            self._raw_summary(start, aligned_start, camera_ids, event_types),
+            self._raw_summary(aligned_end, end, camera_ids, event_types),
+        ]
+        for rows in parts:
+            for camera_id, event_type, count in rows:
+                totals[(camera_id, event_type)] = totals.get((camera_id, event_type), 0) + count
+        return [(camera_id, event_type, count) for (camera_id, event_type), count in totals.items()]
+
+    def rollups(self, start, end, camera_ids=None, event_types=None):
+        """Return ``[(bucket_start, camera_id, event_type, count)]`` hourly buckets in ``[start, end)``"""
+        where, params = self._rollup_where(start, end, camera_ids, event_types)
+        return self.reader().execute(
+            f"SELECT bucket, camera_id, event_type, count FROM event_rollups WHERE {where} "
+            f"ORDER BY bucket", params).fetchall()
+
+    def close(self):
+        """Flush queued events and stop the writer"""
+        if self._writer is None:
+            return
+        self._running = False
+        self._writer.join()
+        self._writer_connection.close()
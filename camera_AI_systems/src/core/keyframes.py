@@ -0,0 +1,83 @@
+import logging
+import os
+import tempfile
+
+logger = logging.getLogger(__name__)
+
+# Seconds between preview frames of a camera in keyframe-only mode
+PREVIEW_INTERVAL = 5.0
+# Raw elementary-stream files FFmpeg can decode a lone keyframe from, by codec fourcc
+ELEMENTARY_STREAMS = {
+    "h264": ".h264", "avc1": ".h264",
+    "hevc": ".hevc", "h265": ".hevc", "hev1": ".hevc", "hvc1": ".hevc",
+}
+JPEG_CODECS = ("mjpg", "jpeg")
+
+
+def raw_mode_supported():
+    """Whether this OpenCV build hands out undecoded packets (FFmpeg backend, OpenCV 4.5+)"""
+    import cv2
+    return hasattr(cv2, "CAP_PROP_LRF_HAS_KEY_FRAME") and hasattr(cv2, "CAP_PROP_CODEC_EXTRADATA_INDEX")
+
+
+def capture_fourcc(capture):
+    import cv2
+    code = int(capture.get(cv2.CAP_PROP_FOURCC))
+    return "".join(chr((code >> 8 * i) & 0xFF) for i in range(4)).strip("\x00 ").lower()
+
+
+def is_keyframe(capture):
+    """Whether the packet last grabbed by a raw-mode capture starts a keyframe"""
+    import cv2
+    return bool(capture.get(cv2.CAP_PROP_LRF_HAS_KEY_FRAME))
+
+
+class KeyframeDecoder:
+    """Decodes single keyframes taken from a capture opened in raw mode.
+
+    With ``CAP_PROP_FORMAT=-1`` the FFmpeg backend only demuxes: ``grab``
+    reads a packet and ``retrieve`` returns its compressed bytes. A keyframe
+    needs no other frame to decode, so it is written after the stream's
+    parameter sets into a small elementary-stream file and decoded on its
+    own; every other packet is dropped without being decoded.
+    """
+
+    def __init__(self, capture):
+        import cv2
+        self.codec = capture_fourcc(capture)
+        self.suffix = ELEMENTARY_STREAMS.get(self.codec)
+        self.extradata = b""
+        ok, extradata = capture.retrieve(flag=int(capture.get(cv2.CAP_PROP_CODEC_EXTRADATA_INDEX)))
+        if ok and extradata is not None:
+            self.extradata = extradata.tobytes()
+        self._path = None
+        if self.suffix is not None:
+            fd, self._path = tempfile.mkstemp(prefix="keyframe-", suffix=self.suffix)
+            os.close(fd)
+
+    @property
+    def supported(self):
+        return self.suffix is not None or self.codec in JPEG_CODECS
+
+    def decode(self, packet):
+        """BGR image of a keyframe packet, or None"""
+        import cv2
+        if self.codec in JPEG_CODECS:
+            # Every MJPEG packet is a complete JPEG
+            return cv2.imdecode(packet, cv2.IMREAD_COLOR)
+        with open(self._path, "wb") as f:
+            f.write(self.extradata + packet.tobytes())
+        capture = cv2.VideoCapture(self._path, cv2.CAP_FFMPEG)
+        try:
+            ok, image = capture.read()
+        finally:
+            capture.release()
+        return image if ok else None
+
+    def close(self):
+        if self._path is not None:
+            try:
+                os.remove(self._path)
+            except OSError as e:
+                logger.warning(f"Failed to remove {self._path}: {str(e)}")
+            self._path = None
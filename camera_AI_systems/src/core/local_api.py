@@ -0,0 +1,362 @@
+import asyncio
+import json
+import logging
+import os
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from .metrics import registry
+from utils.helpers import app_data_dir
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_WIDTH = 320
+DEFAULT_FPS = 5.0
+DETECTION_QUEUE_SIZE = 1000
+ENCODE_WORKERS = 2
+JPEG_QUALITY = 75
+
+
+def default_socket_path():
+    return os.path.join(app_data_dir("run"), "api.sock")
+
+
+def server_running(path=None):
+    """Whether a process is accepting connections on the local API socket"""
+    path = path or default_socket_path()
+    if not hasattr(socket, "AF_UNIX") or not os.path.exists(path):
+        return False
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(path)
+    except OSError:
+        return False
+    finally:
+        probe.close()
+    return True
+
+
+def detection_message(detection):
+    return {
+        "type": "detection",
+        "camera_id": detection.camera_id,
+        "event_type": detection.event_type,
+        "label": detection.label,
+        "confidence": detection.confidence,
+        "bbox": list(detection.bbox),
+        "timestamp": detection.timestamp,
+        "thumbnail": detection.thumbnail,
+    }
+
+
+def encode_frame(frame, max_width):
+    """JPEG-encode ``frame`` downscaled to at most ``max_width`` pixels wide"""
+    import cv2
+    image = frame.scaled(max_width)
+    ok, encoded = cv2.imencode(".jpg", image, [cv2.IMWRITE_JPEG_QUALITY, JPEG_QUALITY])
+    if not ok:
+        raise ValueError("JPEG encoder returned no data")
+    return image.shape[1], image.shape[0], encoded.tobytes()
+
+
+class _Client:
+    """One connected client; whole messages are written under ``lock``"""
+
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self.lock = asyncio.Lock()
+        self.tasks = {}
+
+    async def send(self, message, payload=b""):
+        if payload:
+            message = dict(message, size=len(payload))
+        async with self.lock:
+            self.writer.write(json.dumps(message).encode("utf-8") + b"\n" + payload)
+            # Waits while the socket buffer is full: a slow client only slows
+            # its own sender task, never capture or AI
+            await self.writer.drain()
+
+
+class LocalApiServer:
+    """Unix-socket API for observing a running pipeline.
+
+    Clients send newline-delimited JSON requests::
+
+        {"op": "subscribe", "topic": "detections"}
+        {"op": "subscribe", "topic": "frames", "camera_id": 1, "max_width": 320, "fps": 5}
+        {"op": "unsubscribe", "topic": "frames", "camera_id": 1}
+
+    and receive one JSON line per message; frame messages carry ``size``
+    bytes of JPEG right after the line. Capture threads only store the
+    newest frame per watched camera, so a subscriber that cannot keep up
+    skips frames (counted in ``local_api_frames_dropped_total``) instead of
+    queueing them; frames left out to keep to a subscriber's ``fps`` are
+    not counted. Each frame is downscaled and encoded at most once per
+    requested width, on a small worker pool, however many clients watch it.
+    """
+
+    def __init__(self, camera_manager, ai_processor, path=None):
+        self.camera_manager = camera_manager
+        self.ai_processor = ai_processor
+        self.path = path or default_socket_path()
+        self._loop = None
+        self._server = None
+        self._thread = None
+        self._ready = threading.Event()
+        self._encoder = ThreadPoolExecutor(max_workers=ENCODE_WORKERS, thread_name_prefix="api-encode")
+        self._latest = {}
+        self._frame_events = {}
+        self._notify_pending = set()
+        self._encoded = {}
+        self._detection_queues = set()
+        self._listening = False
+
+    def start(self):
+        if self._thread is not None:
+            return
+        if not hasattr(socket, "AF_UNIX"):
+            raise RuntimeError("The local API needs Unix domain socket support")
+        if not self._listening:
+            # Listeners stay registered; they return at once while nobody is subscribed
+            self.camera_manager.add_frame_listener(self._on_frame)
+            self.ai_processor.add_detection_listener(self._on_detection)
+            self._listening = True
+        self._thread = threading.Thread(target=self._run, name="local-api", daemon=True)
+        self._thread.start()
+        self._ready.wait()
+        if self._server is None:
+            self._thread.join()
+            self._thread = None
+            raise RuntimeError(f"Could not start the local API on {self.path}")
+        logger.info(f"Local API listening on {self.path}")
+
+    def _run(self):
+        self._loop = asyncio.new_event_loop()
+        try:
+            self._server = self._loop.run_until_complete(self._listen())
+        except OSError as e:
+            logger.error(f"Failed to open local API socket {self.path}: {str(e)}")
+            self._ready.set()
+            self._loop.close()
+            return
+        self._ready.set()
+        self._loop.run_forever()
+        self._server.close()
+        self._loop.run_until_complete(self._server.wait_closed())
+        tasks = asyncio.all_tasks(self._loop)
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            # gather() with nothing to wait for looks up the thread's (unset) current loop
+            self._loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+        self._loop.close()
+
+    async def _listen(self):
+        if os.path.exists(self.path):
+            # A socket file left behind by a crashed process; refuse to steal a live one
+            if server_running(self.path):
+                raise OSError(f"another process is already serving {self.path}")
+            os.remove(self.path)
+        return await asyncio.start_unix_server(self._handle_client, path=self.path)
+
+    # Called on capture and AI threads
+
+    def _on_frame(self, frame):
+        if not self._frame_events.get(frame.camera_id) or self._loop.is_closed():
+            return
+        self._latest[frame.camera_id] = frame
+        if frame.camera_id not in self._notify_pending:
+            self._notify_pending.add(frame.camera_id)
+            self._loop.call_soon_threadsafe(self._notify_frame, frame.camera_id)
+
+    def _on_detection(self, detection):
+        if not self._detection_queues or self._loop.is_closed():
+            return
+        self._loop.call_soon_threadsafe(self._publish_detection, detection_message(detection))
+
+    # Event loop side
+
+    def _notify_frame(self, camera_id):
+        self._notify_pending.discard(camera_id)
+        for event in self._frame_events.get(camera_id, ()):
+            event.set()
+
+    def _publish_detection(self, message):
+        for detection_queue in self._detection_queues:
+            try:
+                detection_queue.put_nowait(message)
+            except asyncio.QueueFull:
+                registry.counter("local_api_detections_dropped_total",
+                                 "Detections not delivered because a client fell behind").inc()
+
+    async def _encoded_frame(self, frame, max_width):
+        key = (frame.camera_id, max_width)
+        cached = self._encoded.get(key)
+        if cached is None or cached[0] != frame.seq:
+            # Subscribers asking for the same frame and width share one encode
+            cached = (frame.seq, self._loop.run_in_executor(self._encoder, encode_frame, frame, max_width))
+            self._encoded[key] = cached
+        return await asyncio.shield(cached[1])
+
+    async def _send_frames(self, client, camera_id, max_width, fps):
+        event = asyncio.Event()
+        self._frame_events.setdefault(camera_id, set()).add(event)
+        dropped = registry.counter("local_api_frames_dropped_total",
+                                   "Frames skipped because a subscriber was still busy", camera=camera_id)
+        interval = 1.0 / fps if fps > 0 else 0.0
+        last_seq = None
+        try:
+            while True:
+                await event.wait()
+                event.clear()
+                frame = self._latest.get(camera_id)
+                if frame is None or frame.seq == last_seq:
+                    continue
+                last_seq = frame.seq
+                started = time.monotonic()
+                try:
+                    width, height, payload = await self._encoded_frame(frame, max_width)
+                except Exception as e:
+                    # One bad frame must not end the subscription; the next one may encode fine
+                    logger.error(f"Failed to encode frame {frame.seq} of camera {camera_id}: {str(e)}")
+                    registry.counter("local_api_encode_errors_total",
+                                     "Frames skipped because JPEG encoding failed", camera=camera_id).inc()
+                    continue
+                await client.send({"type": "frame", "camera_id": camera_id, "seq": frame.seq,
+                                   "width": width, "height": height, "format": "jpeg"}, payload)
+                # Frames that came and were replaced during the encode and send are drops; those
+                # skipped while sleeping below were left out on purpose for the requested fps
+                newest = self._latest.get(camera_id)
+                if newest is not None and newest.seq > frame.seq + 1:
+                    dropped.inc(newest.seq - frame.seq - 1)
+                await asyncio.sleep(max(0.0, interval - (time.monotonic() - started)))
+        except ConnectionError:
+            pass
+        finally:
+            events = self._frame_events.get(camera_id)
+            events.discard(event)
+            if not events:
+                del self._frame_events[camera_id]
+                self._latest.pop(camera_id, None)
+                self._encoded = {key: value for key, value in self._encoded.items() if key[0] != camera_id}
+
+    async def _send_detections(self, client):
+        detection_queue = asyncio.Queue(DETECTION_QUEUE_SIZE)
+        self._detection_queues.add(detection_queue)
+        try:
+            while True:
+                await client.send(await detection_queue.get())
+        except ConnectionError:
+            pass
+        finally:
+            self._detection_queues.discard(detection_queue)
+
+    def _subscribe(self, client, request):
+        topic = request.get("topic")
+        if topic == "detections":
+            key = ("detections",)
+            coroutine = self._send_detections(client)
+        elif topic == "frames":
+            camera_id = int(request["camera_id"])
+            key = ("frames", camera_id)
+            coroutine = self._send_frames(client, camera_id, int(request.get("max_width", DEFAULT_MAX_WIDTH)),
+                                          float(request.get("fps", DEFAULT_FPS)))
+        else:
+            raise ValueError(f"unknown topic {topic!r}")
+        self._unsubscribe(client, key)
+        client.tasks[key] = self._loop.create_task(coroutine)
+
+    @staticmethod
+    def _unsubscribe(client, key):
+        task = client.tasks.pop(key, None)
+        if task is not None:
+            task.cancel()
+
+    async def _handle_client(self, reader, writer):
+        client = _Client(reader, writer)
+        registry.gauge("local_api_clients", "Connected local API clients").inc()
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    request = json.loads(line)
+                    op = request.get("op")
+                    if op == "subscribe":
+                        self._subscribe(client, request)
+                    elif op == "unsubscribe":
+                        topic = request.get("topic")
+                        key = ("frames", int(request["camera_id"])) if topic == "frames" else (topic,)
+                        self._unsubscribe(client, key)
+                    else:
+                        raise ValueError(f"unknown op {op!r}")
+                except (ValueError, KeyError, TypeError) as e:
+                    await client.send({"type": "error", "message": str(e)})
+        except (ConnectionError, asyncio.CancelledError):
+            # Cancelled on shutdown; the handler is a top-level task, so just end it
+            pass
+        finally:
+            for key in list(client.tasks):
+                self._unsubscribe(client, key)
+            registry.gauge("local_api_clients", "Connected local API clients").dec()
+            writer.close()
+
+    def stop(self):
+        if self._thread is None:
+            return
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._thread = None
+        self._server = None
+        self._encoder.shutdown(wait=False)
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+
+class LocalApiClient:
+    """Blocking client for scripts::
+
+        client = LocalApiClient()
+        client.subscribe("detections")
+        client.subscribe("frames", camera_id=1, max_width=640, fps=2)
+        for message, jpeg in client.messages():
+            ...
+    """
+
+    def __init__(self, path=None, timeout=None):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(timeout)
+        self.sock.connect(path or default_socket_path())
+        self._file = self.sock.makefile("rb")
+
+    def _request(self, request):
+        self.sock.sendall(json.dumps(request).encode("utf-8") + b"\n")
+
+    def subscribe(self, topic, **options):
+        self._request(dict(options, op="subscribe", topic=topic))
+
+    def unsubscribe(self, topic, **options):
+        self._request(dict(options, op="unsubscribe", topic=topic))
+
+    def receive(self):
+        """Next ``(message, payload)``; payload is the JPEG for frames, else b''"""
+        line = self._file.readline()
+        if not line:
+            raise ConnectionError("local API closed the connection")
+        message = json.loads(line)
+        payload = self._file.read(message["size"]) if "size" in message else b""
+        return message, payload
+
+    def messages(self):
+        while True:
+            yield self.receive()
+
+    def close(self):
+        self._file.close()
+        self.sock.close()
@@ -0,0 +1,307 @@
+import bisect
+import threading
+from collections import defaultdict
+
+# Upper bounds in milliseconds, roughly exponential from 1 ms to 10 s.
+LATENCY_BUCKETS_MS = (1, 2, 5, 10, 20, 35, 50, 75, 100, 150, 200, 300, 500,
+                      750, 1000, 1500, 2000, 3000, 5000, 10000)
+
+# Named intervals between two frame stages, see models.frame.Frame.
+# read:    the capture thread asked for the next packet (just before grab())
+# capture: grab() returned with the next frame; until then the thread was
+#          mostly idle, waiting for the camera to send it
+# decode:  the BGR image is ready
+# With full decoding FFmpeg decodes inside grab(), so "grab" holds the decode
+# as well as the wait and "decode" only OpenCV's conversion to BGR; in
+# keyframe-only mode grab() just demuxes and "decode" is the keyframe decode.
+LATENCY_SPANS = {
+    "grab": ("read", "capture"),
+    "decode": ("capture", "decode"),
+    "queue": ("enqueue", "dequeue"),
+    "inference": ("dequeue", "inference"),
+    "detection": ("capture", "inference"),
+    "display": ("decode", "paint"),
+    "glass_to_glass": ("capture", "paint"),
+}
+
+
+class _Sharded:
+    """Base for metrics that accumulate into one cell per writing thread.
+
+    The hot path touches only the calling thread's cell, so writers never
+    contend; readers sum the cells under a lock that writers only take the
+    first time a thread writes.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+        self._cells = []
+        self._cells_lock = threading.Lock()
+
+    def _new_cell(self):
+        raise NotImplementedError
+
+    def _cell(self):
+        cell = getattr(self._local, "cell", None)
+        if cell is None:
+            cell = self._new_cell()
+            self._local.cell = cell
+            with self._cells_lock:
+                self._cells.append(cell)
+        return cell
+
+    def _all_cells(self):
+        with self._cells_lock:
+            return list(self._cells)
+
+
+class Counter(_Sharded):
+    """Monotonically increasing count"""
+
+    kind = "counter"
+
+    def _new_cell(self):
+        return [0]
+
+    def inc(self, amount=1):
+        self._cell()[0] += amount
+
+    @property
+    def value(self):
+        return sum(cell[0] for cell in self._all_cells())
+
+
+class Gauge:
+    """Point-in-time value, either set explicitly or read from ``fn`` on demand"""
+
+    kind = "gauge"
+
+    def __init__(self, fn=None):
+        self.fn = fn
+        self._value = 0
+        self._lock = threading.Lock()
+
+    def set(self, value):
+        self._value = value
+
+    def inc(self, amount=1):
+        with self._lock:
+            self._value += amount
+
+    def dec(self, amount=1):
+        self.inc(-amount)
+
+    @property
+    def value(self):
+        if self.fn is not None:
+            try:
+                return self.fn()
+            except Exception:
+                return 0
+        return self._value
+
+
+class Histogram(_Sharded):
+    """Fixed-bucket histogram with interpolated quantiles"""
+
+    kind = "histogram"
+
+    def __init__(self, buckets=LATENCY_BUCKETS_MS):
+        super().__init__()
+        self.buckets = tuple(buckets)
+
+    def _new_cell(self):
+        # [bucket counts..., overflow, count, total]
+        return [0] * (len(self.buckets) + 3)
+
+    def observe(self, value):
+        cell = self._cell()
+        cell[bisect.bisect_left(self.buckets, value)] += 1
+        cell[-2] += 1
+        cell[-1] += value
+
+    def _merged(self):
+        merged = [0] * (len(self.buckets) + 3)
+        for cell in self._all_cells():
+            for index, value in enumerate(cell):
+                merged[index] += value
+        return merged
+
+    @property
+    def count(self):
+        return self._merged()[-2]
+
+    @property
+    def total(self):
+        return self._merged()[-1]
+
+    def bucket_counts(self):
+        """Per-bucket (non-cumulative) counts; the last entry is the overflow bucket"""
+        return self._merged()[:-2]
+
+    @staticmethod
+    def _quantile(buckets, counts, count, q):
+        if not count:
+            return 0.0
+        target = q * count
+        cumulative = 0
+        for index, bucket_count in enumerate(counts):
+            if cumulative + bucket_count >= target and bucket_count:
+                if index >= len(buckets):
+                    return float(buckets[-1])
+                lower = buckets[index - 1] if index > 0 else 0.0
+                upper = buckets[index]
+                return lower + (upper - lower) * (target - cumulative) / bucket_count
+            cumulative += bucket_count
+        return float(buckets[-1])
+
+    def quantile(self, q):
+        merged = self._merged()
+        return self._quantile(self.buckets, merged[:-2], merged[-2], q)
+
+    def snapshot(self):
+        merged = self._merged()
+        counts, count, total = merged[:-2], merged[-2], merged[-1]
+        return {
+            "count": count,
+            "mean": total / count if count else 0.0,
+            "p50": self._quantile(self.buckets, counts, count, 0.50),
+            "p95": self._quantile(self.buckets, counts, count, 0.95),
+            "p99": self._quantile(self.buckets, counts, count, 0.99),
+        }
+
+
+class MetricsRegistry:
+    """In-process registry of named, labelled metrics.
+
+    ``counter``/``gauge``/``histogram`` return the existing metric for a
+    name and label set, creating it on first use, so producers can simply
+    look their metric up once and keep the reference.
+    """
+
+    def __init__(self):
+        self._metrics = {}
+        self._help = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(name, labels):
+        return name, tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+    def _get_or_create(self, cls, name, help, labels, factory):
+        key = self._key(name, labels)
+        metric = self._metrics.get(key)
+        if metric is None:
+            with self._lock:
+                metric = self._metrics.get(key)
+                if metric is None:
+                    metric = factory()
+                    self._metrics[key] = metric
+                    if help:
+                        self._help[name] = help
+        if not isinstance(metric, cls):
+            raise ValueError(f"Metric {name} is already registered as a {metric.kind}")
+        return metric
+
+    def counter(self, name, help="", **labels):
+        return self._get_or_create(Counter, name, help, labels, Counter)
+
+    def gauge(self, name, help="", fn=None, **labels):
+        gauge = self._get_or_create(Gauge, name, help, labels, lambda: Gauge(fn))
+        if fn is not None:
+            gauge.fn = fn
+        return gauge
+
+    def histogram(self, name, help="", buckets=LATENCY_BUCKETS_MS, **labels):
+        return self._get_or_create(Histogram, name, help, labels, lambda: Histogram(buckets))
+
+    def remove(self, name=None, **labels):
+        """Drop every metric matching ``name`` (if given) and all of ``labels``"""
+        wanted = {key: str(value) for key, value in labels.items()}
+        with self._lock:
+            for key in list(self._metrics):
+                metric_name, metric_labels = key
+                if name is not None and metric_name != name:
+                    continue
+                if all(dict(metric_labels).get(k) == v for k, v in wanted.items()):
+                    del self._metrics[key]
+
+    def collect(self):
+        """Return ``[(name, help, labels, metric)]`` sorted by name"""
+        with self._lock:
+            items = sorted(self._metrics.items(), key=lambda item: item[0])
+        return [(name, self._help.get(name, ""), dict(labels), metric)
+                for (name, labels), metric in items]
+
+    def series(self, name):
+        """Return ``[(labels, metric)]`` for every label set of ``name``"""
+        return [(labels, metric) for metric_name, _, labels, metric in self.collect() if metric_name == name]
+
+    def snapshot(self):
+        """Return ``{name: {labels_tuple: value}}``; histograms give their summary dict"""
+        result = defaultdict(dict)
+        for name, _, labels, metric in self.collect():
+            value = metric.snapshot() if isinstance(metric, Histogram) else metric.value
+            result[name][tuple(sorted(labels.items()))] = value
+        return dict(result)
+
+
+class LatencyTracker:
+    """Per-camera latency histograms for the spans in ``LATENCY_SPANS``.
+
+    Pipeline stages call ``observe(frame, stage)``; every span that ends at
+    that stage and whose start the frame has already passed is recorded
+    in the ``frame_latency_ms`` histogram of the registry.
+    """
+
+    METRIC = "frame_latency_ms"
+
+    def __init__(self, registry, spans=LATENCY_SPANS):
+        self.registry = registry
+        self._spans_by_end = defaultdict(list)
+        for name, (start, end) in spans.items():
+            self._spans_by_end[end].append((name, start))
+        self._histograms = {}
+
+    def _histogram(self, camera_id, span):
+        key = (camera_id, span)
+        histogram = self._histograms.get(key)
+        if histogram is None:
+            histogram = self.registry.histogram(
+                self.METRIC, "Frame pipeline latency per stage span", camera=camera_id, span=span)
+            self._histograms[key] = histogram
+        return histogram
+
+    def observe(self, frame, stage, at=None):
+        at = frame.mark(stage, at)
+        for span, start in self._spans_by_end.get(stage, ()):
+            started = frame.timestamps.get(start)
+            if started is not None:
+                self._histogram(frame.camera_id, span).observe((at - started) * 1000.0)
+
+    def snapshot(self):
+        """Return ``{camera_id: {span: {"count", "mean", "p50", "p95", "p99"}}}`` in milliseconds"""
+        result = defaultdict(dict)
+        for (camera_id, span), histogram in list(self._histograms.items()):
+            result[camera_id][span] = histogram.snapshot()
+        return dict(result)
+
+    def reset(self, camera_id=None):
+        for key in list(self._histograms):
+            if camera_id is None or key[0] == camera_id:
+                del self._histograms[key]
+        if camera_id is None:
+            self.registry.remove(self.METRIC)
+        else:
+            self.registry.remove(self.METRIC, camera=camera_id)
+
+
+def rates(previous, current, seconds):
+    """Per-second rate of each key between two ``{key: count}`` readings"""
+    if seconds <= 0:
+        return {key: 0.0 for key in current}
+    return {key: max(0.0, value - previous.get(key, 0)) / seconds for key, value in current.items()}
+
+
+registry = MetricsRegistry()
+latency_tracker = LatencyTracker(registry)
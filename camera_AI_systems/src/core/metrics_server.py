@@ -0,0 +1,118 @@
+import logging
+import math
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from .metrics import Histogram, registry
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 9108
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+NAMESPACE = "camera_ai"
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(labels, extra=None):
+    items = list(labels.items()) + list((extra or {}).items())
+    if not items:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in items) + "}"
+
+
+def _number(value):
+    if isinstance(value, bool):
+        value = int(value)
+    if isinstance(value, float):
+        if math.isnan(value):
+            return "NaN"
+        if math.isinf(value):
+            return "+Inf" if value > 0 else "-Inf"
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+def render(metrics_registry=registry, namespace=NAMESPACE):
+    """Render every metric in ``metrics_registry`` in the Prometheus text format"""
+    lines = []
+    seen = set()
+    for name, help_text, labels, metric in metrics_registry.collect():
+        full_name = f"{namespace}_{name}" if namespace else name
+        if full_name not in seen:
+            seen.add(full_name)
+            if help_text:
+                lines.append(f"# HELP {full_name} {_escape(help_text)}")
+            lines.append(f"# TYPE {full_name} {metric.kind}")
+        if isinstance(metric, Histogram):
+            counts = metric.bucket_counts()
+            cumulative = 0
+            for bound, count in zip(metric.buckets, counts):
+                cumulative += count
+                lines.append(f"{full_name}_bucket{_labels(labels, {'le': _number(float(bound))})} {cumulative}")
+            cumulative += counts[-1]
+            lines.append(f"{full_name}_bucket{_labels(labels, {'le': '+Inf'})} {cumulative}")
+            lines.append(f"{full_name}_sum{_labels(labels)} {_number(float(metric.total))}")
+            lines.append(f"{full_name}_count{_labels(labels)} {cumulative}")
+        else:
+            lines.append(f"{full_name}{_labels(labels)} {_number(metric.value)}")
+    return "\n".join(lines) + "\n"
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    metrics_registry = registry
+
+    def do_GET(self):
+        if self.path.split("?", 1)[0] not in ("/metrics", "/"):
+            self.send_error(404)
+            return
+        body = render(self.metrics_registry).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logger.debug(f"{self.address_string()} - {format % args}")
+
+
+class MetricsServer:
+    """Optional HTTP endpoint serving ``/metrics`` for Prometheus scrapers.
+
+    Runs on its own daemon thread; nothing is computed until a scrape
+    arrives, so an idle endpoint costs one blocked thread.
+    """
+
+    def __init__(self, host=DEFAULT_HOST, port=DEFAULT_PORT, metrics_registry=registry):
+        self.host = host
+        self.port = port
+        self.metrics_registry = metrics_registry
+        self._server = None
+        self._thread = None
+
+    @property
+    def running(self):
+        return self._server is not None
+
+    def start(self):
+        if self._server is not None:
+            return
+        handler = type("MetricsHandler", (_MetricsHandler,), {"metrics_registry": self.metrics_registry})
+        self._server = ThreadingHTTPServer((self.host, self.port), handler)
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, name="metrics-http", daemon=True)
+        self._thread.start()
+        logger.info(f"Serving metrics on http://{self.host}:{self.port}/metrics")
+
+    def stop(self):
+        if self._server is None:
+            return
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
+        self._server = None
+        self._thread = None
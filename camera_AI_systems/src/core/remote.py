@@ -0,0 +1,288 @@
+import logging
+import socket
+import threading
+
+from PyQt5.QtCore import QObject, QThread, pyqtSignal
+
+from models.detection import Detection
+from models.frame import Frame
+from .camera_manager import DISPLAY_FPS, FrameRateLimiter
+from .event_store import EventStore
+from .keyframes import PREVIEW_INTERVAL
+from .local_api import LocalApiClient
+from .resources import register_current_thread
+from .thumbnail_store import ThumbnailStore
+from utils.config import ConfigStore
+
+logger = logging.getLogger(__name__)
+
+# Frames requested from the service for the camera grid and for list previews
+REMOTE_FRAME_WIDTH = 640
+PREVIEW_FRAME_WIDTH = 160
+
+
+def decode_jpeg(payload):
+    import cv2
+    import numpy as np
+    return cv2.imdecode(np.frombuffer(payload, dtype=np.uint8), cv2.IMREAD_COLOR)
+
+
+def detection_from_message(message):
+    return Detection(camera_id=message["camera_id"], event_type=message["event_type"],
+                     label=message.get("label", ""), confidence=message.get("confidence", 0.0),
+                     bbox=tuple(message.get("bbox", ())), timestamp=message["timestamp"],
+                     thumbnail=message.get("thumbnail", ""))
+
+
+class RemoteReader(QThread):
+    """Reads messages from a LocalApiClient and hands them to the remote manager and AI"""
+
+    disconnected = pyqtSignal(str)
+
+    def __init__(self, client, camera_manager, ai_processor):
+        super().__init__()
+        self.client = client
+        self.camera_manager = camera_manager
+        self.ai_processor = ai_processor
+
+    def run(self):
+        register_current_thread("remote-reader")
+        try:
+            while True:
+                message, payload = self.client.receive()
+                try:
+                    self.dispatch(message, payload)
+                except (KeyError, TypeError, ValueError) as e:
+                    # One bad message is skipped; the stream itself is still in sync
+                    logger.error(f"Malformed local API message {str(message)[:200]}: {e!r}")
+        except (ConnectionError, OSError, ValueError) as e:
+            self.disconnected.emit(str(e))
+        except Exception as e:
+            logger.error(f"Local API reader failed: {e!r}")
+            self.disconnected.emit(str(e))
+
+    def dispatch(self, message, payload):
+        kind = message.get("type")
+        if kind == "frame":
+            self.camera_manager.deliver(message, payload)
+        elif kind == "detection":
+            self.ai_processor.deliver(detection_from_message(message))
+        elif kind == "error":
+            logger.warning(f"Local API refused a request: {message.get('message')}")
+
+
+class RemoteCameraManager(QObject):
+    """CameraManager stand-in that shows cameras captured by another process.
+
+    "Connecting" a camera subscribes to its frames on the local API; nothing
+    is opened or decoded here beyond the downscaled JPEGs the service sends.
+    A camera counts as connected once its first frame has arrived.
+    """
+
+    frame_ready = pyqtSignal(int, object)
+    connection_lost = pyqtSignal(int)
+    connection_restored = pyqtSignal(int)
+    camera_opened = pyqtSignal(int, bool)
+    connect_progress = pyqtSignal(int, int)
+
+    def __init__(self, client, parent=None):
+        super().__init__(parent)
+        self.client = client
+        self.streams = {}
+        self.keyframes_only = set()
+        self.frame_listeners = []
+        self._connected = set()
+        self._lock = threading.Lock()
+
+    def add_frame_listener(self, listener, max_fps=None):
+        if max_fps:
+            listener = FrameRateLimiter(listener, max_fps)
+        self.frame_listeners.append(listener)
+
+    def is_connected(self, camera_id):
+        return camera_id in self._connected
+
+    def is_streaming(self, camera_id):
+        return camera_id in self.streams
+
+    def is_keyframes_only(self, camera_id):
+        return camera_id in self.keyframes_only
+
+    def _subscribe(self, camera_id):
+        if camera_id in self.keyframes_only:
+            self.client.subscribe("frames", camera_id=camera_id, max_width=PREVIEW_FRAME_WIDTH,
+                                  fps=1.0 / PREVIEW_INTERVAL)
+        else:
+            self.client.subscribe("frames", camera_id=camera_id, max_width=REMOTE_FRAME_WIDTH, fps=DISPLAY_FPS)
+
+    def connect_camera(self, camera_id, camera_info):
+        self.connect_cameras([(camera_id, camera_info)])
+
+    def connect_cameras(self, cameras, keyframes_only=False):
+        started = 0
+        for camera_id, camera_info in cameras:
+            if camera_id in self.streams:
+                continue
+            self.streams[camera_id] = camera_info
+            if keyframes_only:
+                self.keyframes_only.add(camera_id)
+            self._subscribe(camera_id)
+            started += 1
+        if started:
+            # Subscribing does not wait for anything; the service owns the actual connections
+            self.connect_progress.emit(started, started)
+        return started
+
+    def set_keyframes_only(self, camera_id, keyframes_only):
+        if keyframes_only == (camera_id in self.keyframes_only):
+            return
+        if keyframes_only:
+            self.keyframes_only.add(camera_id)
+        else:
+            self.keyframes_only.discard(camera_id)
+        if camera_id in self.streams:
+            # A new subscription replaces the old one
+            self._subscribe(camera_id)
+
+    def disconnect_camera(self, camera_id):
+        if self.streams.pop(camera_id, None) is None:
+            return False
+        self.keyframes_only.discard(camera_id)
+        with self._lock:
+            self._connected.discard(camera_id)
+        self.client.unsubscribe("frames", camera_id=camera_id)
+        return True
+
+    def disconnect_all(self):
+        for camera_id in list(self.streams):
+            self.disconnect_camera(camera_id)
+
+    def deliver(self, message, payload):
+        """Reader thread: decode a frame message and pass it on like a capture thread would"""
+        camera_id = message["camera_id"]
+        if camera_id not in self.streams:
+            return
+        image = decode_jpeg(payload)
+        if image is None:
+            logger.warning(f"Undecodable frame from the local API for camera {camera_id}")
+            return
+        with self._lock:
+            first = camera_id not in self._connected
+            self._connected.add(camera_id)
+        if first:
+            self.camera_opened.emit(camera_id, True)
+            self.connection_restored.emit(camera_id)
+        frame = Frame(camera_id, image, message["seq"])
+        frame.preview = camera_id in self.keyframes_only
+        for listener in self.frame_listeners:
+            try:
+                listener(frame)
+            except Exception as e:
+                logger.error(f"Frame listener failed for camera {camera_id}: {str(e)}")
+        self.frame_ready.emit(camera_id, frame)
+
+    def service_lost(self):
+        with self._lock:
+            lost, self._connected = self._connected, set()
+        for camera_id in lost:
+            self.connection_lost.emit(camera_id)
+
+    def shutdown(self):
+        self.streams.clear()
+
+
+class RemoteAIProcessor(QObject):
+    """AIProcessor stand-in fed with the detections of the service.
+
+    AI runs in the service, with the modes it was started with; modes set
+    here are only recorded (and saved with the configuration), so they
+    apply the next time the service starts.
+    """
+
+    detection_ready = pyqtSignal(object)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.modes = {}
+        self.detection_listeners = []
+
+    def add_detection_listener(self, listener):
+        self.detection_listeners.append(listener)
+
+    def set_mode(self, camera_id, mode):
+        if self.modes.get(camera_id, "None") != mode:
+            logger.info(f"AI mode '{mode}' for camera {camera_id} applies when the service restarts")
+        self.modes[camera_id] = mode
+
+    def deliver(self, detection):
+        for listener in self.detection_listeners:
+            try:
+                listener(detection)
+            except Exception as e:
+                logger.error(f"Detection listener failed: {str(e)}")
+        self.detection_ready.emit(detection)
+
+    def stop(self):
+        pass
+
+    def wait(self, *args):
+        return True
+
+
+class RemoteService(QObject):
+    """Drop-in for CameraService that observes a pipeline running in another process.
+
+    The window uses this when a headless service (or another window with
+    ``--local-api``) is already serving the local API: frames and
+    detections come over the socket, so cameras are not opened or decoded
+    twice. Events and thumbnails are only read from the files the service
+    writes. The service reads its camera list once at startup, so
+    ``manages_cameras`` is False: cameras cannot be added from here.
+    """
+
+    manages_cameras = False
+
+    def __init__(self, path=None, config_store=None, parent=None):
+        super().__init__(parent)
+        self.client = LocalApiClient(path)
+        self.config_store = config_store or ConfigStore()
+        self.thumbnail_store = ThumbnailStore(read_only=True)
+        self.event_store = EventStore(thumbnails=self.thumbnail_store, read_only=True)
+        self.camera_manager = RemoteCameraManager(self.client, parent=self)
+        self.ai_processor = RemoteAIProcessor(self)
+        self.local_api = None
+        self._closing = False
+        self.client.subscribe("detections")
+        self.reader = RemoteReader(self.client, self.camera_manager, self.ai_processor)
+        self.reader.disconnected.connect(self._on_disconnected)
+        self.reader.start()
+
+    def _on_disconnected(self, reason):
+        if self._closing:
+            return
+        logger.error(f"Lost the connection to the camera service: {reason}")
+        self.camera_manager.service_lost()
+
+    def start_local_api(self, path=None):
+        raise RuntimeError("Attached to another process's local API; it is already serving clients")
+
+    def load_watchlist(self, path=None):
+        # Plates are matched by the service
+        pass
+
+    def apply_ai_modes(self, modes):
+        self.ai_processor.modes.update(modes)
+
+    def shutdown(self):
+        self._closing = True
+        try:
+            # Wakes the reader blocked in receive(); closing alone does not
+            self.client.sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self.reader.wait()
+        self.client.close()
+        self.camera_manager.shutdown()
+        self.event_store.close()
+        self.thumbnail_store.close()
+        self.config_store.flush()
@@ -0,0 +1,255 @@
+import csv
+import datetime
+import json
+import logging
+import os
+import threading
+import time
+
+from PyQt5.QtCore import QThread, pyqtSignal
+
+logger = logging.getLogger(__name__)
+
+EXPORT_COLUMNS = ["id", "time", "camera_id", "event_type", "label", "confidence", "details", "thumbnail"]
+EXPORT_PAGE_SIZE = 5000
+
+
+def day_range(start_date, end_date):
+    """Unix-second bounds ``[start, end)`` covering whole local days ``start_date``..``end_date``"""
+    start = datetime.datetime.combine(start_date, datetime.time.min)
+    end = datetime.datetime.combine(end_date + datetime.timedelta(days=1), datetime.time.min)
+    return time.mktime(start.timetuple()), time.mktime(end.timetuple())
+
+
+def format_row(row):
+    """Turn an event store row into the (Date, Camera, Event, Details) report columns"""
+    _, ts, camera_id, event_type, label, confidence, details = row[:7]
+    when = datetime.datetime.fromtimestamp(ts).strftime("%Y-%m-%d %H:%M:%S")
+    parts = []
+    if label:
+        parts.append(label)
+    if confidence:
+        parts.append(f"{confidence:.0%}")
+    if details:
+        bbox = json.loads(details).get("bbox")
+        if bbox:
+            parts.append(f"bbox={bbox}")
+    return when, f"Camera {camera_id}", event_type, " ".join(parts)
+
+
+class ReportCursor:
+    """Pages through a report's events, newest first, without OFFSET scans"""
+
+    def __init__(self, event_store, start, end, camera_ids=None, event_types=None):
+        self.event_store = event_store
+        self.start = start
+        self.end = end
+        self.camera_ids = camera_ids
+        self.event_types = event_types
+        self.exhausted = False
+        self._after = None
+
+    def fetch(self, limit):
+        """Return up to ``limit`` raw event rows following the previous page"""
+        if self.exhausted:
+            return []
+        rows = self.event_store.query(self.start, self.end, self.camera_ids, self.event_types,
+                                      limit=limit, after=self._after)
+        if len(rows) < limit:
+            self.exhausted = True
+        if rows:
+            self._after = (rows[-1][1], rows[-1][0])
+        return rows
+
+
+class ReportGenerator:
+    """Builds report data for ReportsPage from an EventStore"""
+
+    def __init__(self, event_store):
+        self.event_store = event_store
+
+    def cursor(self, start_date, end_date, camera_ids=None, event_types=None):
+        start, end = day_range(start_date, end_date)
+        return ReportCursor(self.event_store, start, end, camera_ids, event_types)
+
+    def summary(self, start_date, end_date, camera_ids=None, event_types=None):
+        """Return ``{"total", "by_camera", "by_type"}`` event counts for the date range"""
+        start, end = day_range(start_date, end_date)
+        by_camera = {}
+        by_type = {}
+        total = 0
+        for camera_id, event_type, count in self.event_store.summary(start, end, camera_ids, event_types):
+            by_camera[camera_id] = by_camera.get(camera_id, 0) + count
+            by_type[event_type] = by_type.get(event_type, 0) + count
+            total += count
+        return {"total": total, "by_camera": by_camera, "by_type": by_type}
+
+
+def export_row(row):
+    """Event store row with an ISO timestamp, in ``EXPORT_COLUMNS`` order"""
+    event_id, ts, camera_id, event_type, label, confidence, details, thumbnail = row
+    return (event_id, datetime.datetime.fromtimestamp(ts).isoformat(timespec="milliseconds"),
+            camera_id, event_type, label, confidence, details, thumbnail)
+
+
+class CsvReportWriter:
+    def __init__(self, path):
+        self._file = open(path, 'w', newline='', encoding='utf-8')
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(EXPORT_COLUMNS)
+
+    def write_rows(self, rows):
+        self._writer.writerows(export_row(row) for row in rows)
+
+    def close(self):
+        self._file.close()
+
+
+class ParquetReportWriter:
+    """Writes one Parquet row group per page; needs the optional ``pyarrow`` package"""
+
+    def __init__(self, path):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise RuntimeError("Parquet export requires the 'pyarrow' package")
+        self._pa = pa
+        self._schema = pa.schema([
+            ("id", pa.int64()), ("time", pa.string()), ("camera_id", pa.int64()),
+            ("event_type", pa.string()), ("label", pa.string()),
+            ("confidence", pa.float64()), ("details", pa.string()), ("thumbnail", pa.string()),
+        ])
+        self._writer = pq.ParquetWriter(path, self._schema)
+
+    def write_rows(self, rows):
+        columns = list(zip(*(export_row(row) for row in rows)))
+        if columns:
+            self._writer.write_table(self._pa.Table.from_arrays(
+                [self._pa.array(column, type=field.type) for column, field in zip(columns, self._schema)],
+                schema=self._schema))
+
+    def close(self):
+        self._writer.close()
+
+
+class PdfReportWriter:
+    """Paginated plain-table PDF drawn with QPdfWriter, one page at a time"""
+
+    LINE_HEIGHT = 14
+    MARGIN = 36
+
+    def __init__(self, path, title="Detection Report"):
+        from PyQt5.QtGui import QPdfWriter, QPainter, QFont, QPageSize
+        self._writer = QPdfWriter(path)
+        self._writer.setPageSize(QPageSize(QPageSize.A4))
+        self._writer.setResolution(72)
+        self._painter = QPainter(self._writer)
+        self._painter.setFont(QFont("Monospace", 8))
+        self._title = title
+        self._page_height = self._writer.height()
+        self._y = None
+
+    def _new_page(self):
+        if self._y is not None:
+            self._writer.newPage()
+        self._y = self.MARGIN
+        self._painter.drawText(self.MARGIN, self._y, self._title)
+        self._y += self.LINE_HEIGHT * 2
+
+    def write_rows(self, rows):
+        for row in rows:
+            if self._y is None or self._y > self._page_height - self.MARGIN:
+                self._new_page()
+            when, camera, event, details = format_row(row)
+            self._painter.drawText(self.MARGIN, self._y, f"{when}  {camera:<10}  {event:<24}  {details}")
+            self._y += self.LINE_HEIGHT
+
+    def close(self):
+        if self._y is None:
+            self._new_page()
+        self._painter.end()
+
+
+REPORT_WRITERS = {
+    "csv": CsvReportWriter,
+    "parquet": ParquetReportWriter,
+    "pdf": PdfReportWriter,
+}
+
+
+def export_report(cursor, path, fmt, total=None, progress=None, cancelled=None, page_size=EXPORT_PAGE_SIZE):
+    """Stream every row of ``cursor`` into ``path`` one page at a time.
+
+    The file is written as ``path + ".part"`` and renamed when complete, so
+    a cancelled or failed export never leaves a truncated report behind.
+    Returns the number of rows written, or None if cancelled.
+    """
+    writer_class = REPORT_WRITERS.get(fmt)
+    if writer_class is None:
+        raise ValueError(f"Unsupported export format: {fmt}")
+    partial = path + ".part"
+    writer = writer_class(partial)
+    written = 0
+    try:
+        while not cursor.exhausted:
+            if cancelled is not None and cancelled():
+                writer.close()
+                os.remove(partial)
+                return None
+            rows = cursor.fetch(page_size)
+            if rows:
+                writer.write_rows(rows)
+                written += len(rows)
+                if progress is not None:
+                    progress(written, total)
+        writer.close()
+    except Exception:
+        try:
+            writer.close()
+        finally:
+            if os.path.exists(partial):
+                os.remove(partial)
+        raise
+    os.replace(partial, path)
+    return written
+
+
+class ReportExporter(QThread):
+    """Runs ``export_report`` on a worker thread with progress and cancel"""
+
+    progress = pyqtSignal(int, int)
+    export_finished = pyqtSignal(str, int)
+    export_failed = pyqtSignal(str)
+    export_cancelled = pyqtSignal()
+
+    def __init__(self, report_generator, start_date, end_date, path, fmt, parent=None):
+        super().__init__(parent)
+        self.report_generator = report_generator
+        self.start_date = start_date
+        self.end_date = end_date
+        self.path = path
+        self.fmt = fmt
+        self._cancel = threading.Event()
+
+    def cancel(self):
+        self._cancel.set()
+
+    def run(self):
+        try:
+            total = self.report_generator.summary(self.start_date, self.end_date)["total"]
+            self.progress.emit(0, total)
+            cursor = self.report_generator.cursor(self.start_date, self.end_date)
+            written = export_report(cursor, self.path, self.fmt, total,
+                                    progress=lambda done, count: self.progress.emit(done, count or done),
+                                    cancelled=self._cancel.is_set)
+        except Exception as e:
+            logger.error(f"Report export to {self.path} failed: {str(e)}")
+            self.export_failed.emit(str(e))
+            return
+        if written is None:
+            logger.info(f"Report export to {self.path} cancelled")
+            self.export_cancelled.emit()
+        else:
+            logger.info(f"Exported {written} events to {self.path}")
+            self.export_finished.emit(self.path, written)
@@ -0,0 +1,184 @@
+import json
+import logging
+import os
+import threading
+import time
+
+import psutil
+from PyQt5.QtCore import QThread
+
+from .metrics import registry
+
+logger = logging.getLogger(__name__)
+
+# Sampling is cheap but not free (one /proc read per thread), keep it slow.
+DEFAULT_INTERVAL = 2.0
+
+_thread_names = {}
+_thread_names_lock = threading.Lock()
+
+
+def register_current_thread(name):
+    """Attribute the calling thread's CPU time to subsystem ``name`` (e.g. "capture:3")"""
+    with _thread_names_lock:
+        _thread_names[threading.get_native_id()] = name
+
+
+def unregister_current_thread():
+    with _thread_names_lock:
+        _thread_names.pop(threading.get_native_id(), None)
+
+
+def _thread_comm(thread_id):
+    """OS-level thread name on Linux (FFmpeg names its decode threads), or ''"""
+    try:
+        with open(f"/proc/self/task/{thread_id}/comm") as f:
+            return f.read().strip()
+    except OSError:
+        return ""
+
+
+class ResourceMonitor(QThread):
+    """Samples system CPU, and CPU time and memory of this process, its threads and children.
+
+    Threads report which subsystem they belong to through
+    ``register_current_thread``; unregistered threads (FFmpeg decoders,
+    Qt internals) are grouped by their OS thread name as "other:<name>".
+    Results are published as registry gauges and kept in ``latest`` for
+    ``export_json``.
+    """
+
+    def __init__(self, interval=DEFAULT_INTERVAL, parent=None):
+        super().__init__(parent)
+        self.interval = interval
+        self.process = psutil.Process(os.getpid())
+        self.latest = {}
+        self._previous_threads = {}
+        self._previous_children = {}
+        self._previous_process = None
+        self._previous_system = None
+        self._previous_time = None
+        self._published = {"subsystem_cpu_percent": set(), "child_process": set()}
+        self._stop_event = threading.Event()
+        self._lock = threading.Lock()
+
+    def run(self):
+        register_current_thread("resource-monitor")
+        while not self._stop_event.is_set():
+            try:
+                self.sample()
+            except Exception as e:
+                logger.error(f"Resource sampling failed: {str(e)}")
+            self._stop_event.wait(self.interval)
+
+    def sample(self):
+        now = time.monotonic()
+        elapsed = now - self._previous_time if self._previous_time is not None else None
+        self._previous_time = now
+
+        def percent(current, previous):
+            if elapsed is None or previous is None or elapsed <= 0:
+                return 0.0
+            return max(0.0, current - previous) / elapsed * 100.0
+
+        with self.process.oneshot():
+            process_times = self.process.cpu_times()
+            process_cpu = process_times.user + process_times.system
+            rss = self.process.memory_info().rss
+            threads = self.process.threads()
+
+        with _thread_names_lock:
+            names = dict(_thread_names)
+
+        subsystems = {}
+        current_threads = {}
+        for thread in threads:
+            cpu = thread.user_time + thread.system_time
+            current_threads[thread.id] = cpu
+            name = names.get(thread.id)
+            if name is None:
+                comm = _thread_comm(thread.id)
+                name = f"other:{comm}" if comm else "other"
+            subsystems[name] = subsystems.get(name, 0.0) + percent(cpu, self._previous_threads.get(thread.id))
+        self._previous_threads = current_threads
+
+        children = {}
+        current_children = {}
+        for child in self.process.children(recursive=True):
+            try:
+                with child.oneshot():
+                    times = child.cpu_times()
+                    cpu = times.user + times.system
+                    children[f"{child.name()}:{child.pid}"] = {
+                        "cpu_percent": percent(cpu, self._previous_children.get(child.pid)),
+                        "rss_bytes": child.memory_info().rss,
+                    }
+                current_children[child.pid] = cpu
+            except psutil.Error:
+                continue
+        self._previous_children = current_children
+
+        # Own baseline rather than psutil.cpu_percent(), whose single global
+        # baseline is reset by every other caller in the process
+        system_times = psutil.cpu_times()
+        system_total = sum(system_times)
+        system_idle = system_times.idle + getattr(system_times, "iowait", 0.0)
+        system_cpu = 0.0
+        if self._previous_system is not None:
+            total_delta = system_total - self._previous_system[0]
+            if total_delta > 0:
+                busy_delta = total_delta - (system_idle - self._previous_system[1])
+                system_cpu = min(100.0, max(0.0, busy_delta / total_delta * 100.0))
+        self._previous_system = (system_total, system_idle)
+
+        snapshot = {
+            "timestamp": time.time(),
+            "system": {"cpu_percent": system_cpu},
+            "process": {
+                "pid": self.process.pid,
+                "cpu_percent": percent(process_cpu, self._previous_process),
+                "rss_bytes": rss,
+                "threads": len(threads),
+            },
+            "subsystems": {name: {"cpu_percent": value} for name, value in sorted(subsystems.items())},
+            "children": children,
+        }
+        self._previous_process = process_cpu
+        with self._lock:
+            self.latest = snapshot
+        self.publish(snapshot)
+        return snapshot
+
+    def publish(self, snapshot):
+        registry.gauge("system_cpu_percent", "System-wide CPU usage").set(snapshot["system"]["cpu_percent"])
+        process = snapshot["process"]
+        registry.gauge("process_cpu_percent", "CPU usage of the application process").set(process["cpu_percent"])
+        registry.gauge("process_rss_bytes", "Resident memory of the application process").set(process["rss_bytes"])
+        registry.gauge("process_threads", "OS threads in the application process").set(process["threads"])
+        # Gauges are updated in place; only series whose thread or child went away are removed
+        for name, values in snapshot["subsystems"].items():
+            registry.gauge("subsystem_cpu_percent", "CPU usage per thread subsystem",
+                           subsystem=name).set(values["cpu_percent"])
+        for name in self._published["subsystem_cpu_percent"] - snapshot["subsystems"].keys():
+            registry.remove("subsystem_cpu_percent", subsystem=name)
+        self._published["subsystem_cpu_percent"] = set(snapshot["subsystems"])
+        for name, values in snapshot["children"].items():
+            registry.gauge("child_process_cpu_percent", "CPU usage per child process",
+                           process=name).set(values["cpu_percent"])
+            registry.gauge("child_process_rss_bytes", "Resident memory per child process",
+                           process=name).set(values["rss_bytes"])
+        for name in self._published["child_process"] - snapshot["children"].keys():
+            registry.remove("child_process_cpu_percent", process=name)
+            registry.remove("child_process_rss_bytes", process=name)
+        self._published["child_process"] = set(snapshot["children"])
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self.latest)
+
+    def export_json(self, path):
+        with open(path, 'w') as f:
+            json.dump(self.snapshot(), f, indent=2)
+
+    def stop(self):
+        self._stop_event.set()
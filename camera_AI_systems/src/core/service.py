@@ -0,0 +1,95 @@
+import logging
+import os
+import threading
+
+from PyQt5.QtCore import QObject
+
+from .ai_processor import AIProcessor
+from .camera_manager import CameraManager
+from .event_store import EventStore
+from .local_api import LocalApiServer
+from .thumbnail_store import ThumbnailStore
+from .watchlist import Watchlist, default_path as watchlist_path
+from utils.config import ConfigStore
+
+logger = logging.getLogger(__name__)
+
+
+class CameraService(QObject):
+    """Capture, AI and event recording, with no widgets involved.
+
+    The GUI builds its camera page on top of one of these; headless mode
+    runs it alone under a QCoreApplication. Both read the same camera
+    configuration through ``config_store``.
+    """
+
+    # Cameras added to the configuration can be opened by this process
+    manages_cameras = True
+
+    def __init__(self, config_store=None, event_store=None, thumbnail_store=None, parent=None):
+        super().__init__(parent)
+        self.config_store = config_store or ConfigStore()
+        self.thumbnail_store = thumbnail_store or ThumbnailStore()
+        self.event_store = event_store or EventStore(thumbnails=self.thumbnail_store)
+        self.camera_manager = CameraManager(parent=self)
+        self.ai_processor = AIProcessor(self)
+        self.camera_manager.add_frame_listener(self.ai_processor.submit)
+        self.ai_processor.add_detection_listener(self.event_store.append)
+        self.ai_processor.start()
+        self.local_api = None
+
+    def start_local_api(self, path=None):
+        """Let other processes subscribe to this pipeline's frames and detections"""
+        if self.local_api is None:
+            local_api = LocalApiServer(self.camera_manager, self.ai_processor, path)
+            local_api.start()
+            self.local_api = local_api
+
+    def load_watchlist(self, path=None):
+        """Build the plate watchlist index in the background and hand it to the AI worker"""
+        path = path or watchlist_path()
+        if not os.path.exists(path):
+            return
+
+        def build():
+            try:
+                watchlist = Watchlist.load(path)
+            except (OSError, ValueError) as e:
+                logger.error(f"Failed to load watchlist {path}: {str(e)}")
+                return
+            self.ai_processor.set_watchlist(watchlist)
+            logger.info(f"Loaded {len(watchlist)} watchlisted plates from {path}")
+
+        threading.Thread(target=build, name="watchlist-loader", daemon=True).start()
+
+    def apply_ai_modes(self, modes):
+        for camera_id, mode in modes.items():
+            self.ai_processor.set_mode(camera_id, mode)
+
+    def start(self, config=None):
+        """Load the configuration, set AI modes and connect every configured camera.
+
+        This is what headless mode runs; the GUI decides itself which
+        cameras to connect.
+        """
+        config = config or self.config_store.load()
+        self.apply_ai_modes(config["ai_modes"])
+        self.load_watchlist()
+        self.camera_manager.connection_lost.connect(
+            lambda camera_id: logger.warning(f"Connection lost to Camera {camera_id}"))
+        self.camera_manager.connection_restored.connect(
+            lambda camera_id: logger.info(f"Connection restored to Camera {camera_id}"))
+        self.camera_manager.connect_cameras([(camera_id, camera["info"])
+                                             for camera_id, camera in config["cameras"].items()])
+        logger.info(f"Started {len(config['cameras'])} camera(s)")
+
+    def shutdown(self):
+        """Stop capture and AI, then flush the event log, thumbnails and configuration"""
+        if self.local_api is not None:
+            self.local_api.stop()
+        self.camera_manager.shutdown()
+        self.ai_processor.stop()
+        self.ai_processor.wait()
+        self.event_store.close()
+        self.thumbnail_store.close()
+        self.config_store.flush()
@@ -0,0 +1,181 @@
+import datetime
+import hashlib
+import logging
+import os
+import queue
+import shutil
+import threading
+
+from .metrics import registry
+from .resources import register_current_thread
+from utils.helpers import app_data_dir
+
+logger = logging.getLogger(__name__)
+
+THUMBNAIL_SIZE = 160
+MAX_BYTES = 512 * 1024 * 1024
+QUEUE_SIZE = 1000
+# Eviction stops once usage drops below this fraction of ``max_bytes``, so
+# a full store does not rescan the disk on every write
+EVICT_TARGET = 0.9
+
+# Extension and the name of the cv2 quality flag; cv2 itself is only
+# imported by the writer thread so it stays off the startup path
+FORMATS = {
+    "jpg": (".jpg", "IMWRITE_JPEG_QUALITY"),
+    "webp": (".webp", "IMWRITE_WEBP_QUALITY"),
+}
+
+
+def default_root():
+    return app_data_dir("thumbnails")
+
+
+class ThumbnailStore:
+    """Content-addressed detection crops on disk, one directory per day.
+
+    A crop's key is ``<YYYY-MM-DD>/<hash of its pixels><ext>``; the event
+    store keeps it alongside the event so any past event can show its crop.
+    ``put`` only hashes and enqueues — resizing, encoding and writing run on
+    a background thread, identical crops of the same day are written once,
+    and the oldest days are deleted when the store grows past ``max_bytes``.
+
+    The existing days are sized by the writer thread before its first
+    write, so opening the store does not walk the disk. A ``read_only``
+    store only resolves keys to files another process writes; it does not
+    scan, write or evict.
+    """
+
+    def __init__(self, root=None, max_bytes=MAX_BYTES, size=THUMBNAIL_SIZE, fmt="jpg", quality=80,
+                 read_only=False):
+        if fmt not in FORMATS:
+            raise ValueError(f"Unsupported thumbnail format: {fmt}")
+        self.root = root or default_root()
+        self.max_bytes = max_bytes
+        self.size = size
+        self.extension, self._quality_flag = FORMATS[fmt]
+        self.quality = quality
+        self.read_only = read_only
+        self._queue = queue.Queue(QUEUE_SIZE)
+        self._day_bytes = {}
+        self._total_bytes = 0
+        self._written = registry.counter("thumbnails_written_total", "Thumbnails encoded and written to disk")
+        self._deduplicated = registry.counter("thumbnails_deduplicated_total",
+                                              "Thumbnails skipped because the same crop was already stored")
+        self._dropped = registry.counter("thumbnails_dropped_total",
+                                         "Thumbnails dropped because the write queue was full")
+        registry.gauge("thumbnail_store_bytes", "Disk space used by stored thumbnails",
+                       fn=lambda: self._total_bytes)
+        self._writer = None
+        if read_only:
+            return
+        self._running = True
+        self._writer = threading.Thread(target=self._write_loop, name="thumbnail-writer")
+        self._writer.start()
+
+    def _scan(self):
+        day_bytes = {}
+        for day in os.listdir(self.root):
+            directory = os.path.join(self.root, day)
+            if os.path.isdir(directory):
+                day_bytes[day] = sum(entry.stat().st_size for entry in os.scandir(directory) if entry.is_file())
+        return day_bytes
+
+    def key(self, image, timestamp):
+        digest = hashlib.blake2b(str(image.shape).encode(), digest_size=16)
+        digest.update(image.tobytes())
+        day = datetime.date.fromtimestamp(timestamp).isoformat()
+        return f"{day}/{digest.hexdigest()}{self.extension}"
+
+    def put(self, image, timestamp):
+        """Queue a BGR crop for storage and return its key ('' if it was dropped)"""
+        if self.read_only:
+            return ""
+        key = self.key(image, timestamp)
+        try:
+            self._queue.put_nowait((key, image))
+        except queue.Full:
+            self._dropped.inc()
+            return ""
+        return key
+
+    def path(self, key):
+        day, name = key.split("/")
+        return os.path.join(self.root, day, name)
+
+    def exists(self, key):
+        return bool(key) and os.path.exists(self.path(key))
+
+    def _write_loop(self):
+        register_current_thread("thumbnail-writer")
+        try:
+            self._day_bytes = self._scan()
+        except OSError as e:
+            logger.error(f"Failed to scan thumbnail store {self.root}: {str(e)}")
+        self._total_bytes = sum(self._day_bytes.values())
+        while self._running or not self._queue.empty():
+            try:
+                key, image = self._queue.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            # Only loaded once there is something to encode, not while the window starts
+            import cv2
+            try:
+                self._write(key, image)
+            except (OSError, cv2.error) as e:
+                logger.error(f"Failed to store thumbnail {key}: {str(e)}")
+
+    def _write(self, key, image):
+        import cv2
+        path = self.path(key)
+        if os.path.exists(path):
+            self._deduplicated.inc()
+            return
+        height, width = image.shape[:2]
+        scale = self.size / max(height, width)
+        if scale < 1:
+            image = cv2.resize(image, (max(1, int(width * scale)), max(1, int(height * scale))),
+                               interpolation=cv2.INTER_AREA)
+        ok, encoded = cv2.imencode(self.extension, image, [getattr(cv2, self._quality_flag), self.quality])
+        if not ok:
+            raise OSError("encoder returned no data")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        partial = path + ".part"
+        with open(partial, 'wb') as f:
+            f.write(encoded.tobytes())
+        os.replace(partial, path)
+        day = key.split("/")[0]
+        self._day_bytes[day] = self._day_bytes.get(day, 0) + len(encoded)
+        self._total_bytes += len(encoded)
+        self._written.inc()
+        if self._total_bytes > self.max_bytes:
+            self._evict()
+
+    def _evict(self):
+        target = self.max_bytes * EVICT_TARGET
+        for day in sorted(self._day_bytes):
+            if self._total_bytes <= target:
+                return
+            directory = os.path.join(self.root, day)
+            if day != max(self._day_bytes):
+                shutil.rmtree(directory, ignore_errors=True)
+                self._total_bytes -= self._day_bytes.pop(day)
+                logger.info(f"Evicted thumbnails for {day}")
+                continue
+            # Only the newest day is left; drop its oldest files
+            entries = sorted((entry for entry in os.scandir(directory) if entry.is_file()),
+                             key=lambda entry: entry.stat().st_mtime)
+            for entry in entries:
+                if self._total_bytes <= target:
+                    return
+                size = entry.stat().st_size
+                os.remove(entry.path)
+                self._day_bytes[day] -= size
+                self._total_bytes -= size
+
+    def close(self):
+        """Write queued thumbnails and stop the writer"""
+        if self._writer is None:
+            return
+        self._running = False
+        self._writer.join()
@@ -0,0 +1,158 @@
+import csv
+import logging
+import os
+from dataclasses import dataclass, replace
+
+from .detection_index import normalize_plate
+from .metrics import registry
+from utils.helpers import app_data_dir
+
+logger = logging.getLogger(__name__)
+
+PLATE_EVENT_TYPE = "license_plate"
+MATCH_EVENT_TYPE = "watchlist_match"
+MAX_DISTANCE = 1
+
+# Characters OCR commonly mistakes for one another map to a single class
+# representative, so "51A-8O0I2" and "51A-80012" share a key.
+CONFUSABLE = str.maketrans({
+    "O": "0", "Q": "0", "D": "0",
+    "I": "1", "L": "1",
+    "Z": "2",
+    "S": "5",
+    "G": "6",
+    "B": "8",
+})
+
+
+def default_path():
+    return os.path.join(app_data_dir(), "watchlist.csv")
+
+
+def canonical_plate(text):
+    return normalize_plate(text).translate(CONFUSABLE)
+
+
+def _deletions(key, depth):
+    """``key`` and every string made by deleting up to ``depth`` of its characters"""
+    variants = {key}
+    frontier = {key}
+    for _ in range(depth):
+        frontier = {variant[:i] + variant[i + 1:] for variant in frontier for i in range(len(variant))}
+        variants |= frontier
+    return variants
+
+
+def edit_distance(a, b, limit):
+    """Levenshtein distance of ``a`` and ``b``, or ``limit + 1`` once it exceeds ``limit``"""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char_a != char_b)))
+        if min(current) > limit:
+            return limit + 1
+        previous = current
+    return previous[-1]
+
+
+@dataclass
+class WatchlistEntry:
+    plate: str
+    note: str = ""
+
+
+@dataclass
+class WatchlistMatch:
+    entry: WatchlistEntry
+    read: str
+    distance: int
+
+
+class Watchlist:
+    """Plates to alert on, matched tolerantly against OCR output.
+
+    Plates are compared by confusion-class key (see ``CONFUSABLE``), so the
+    usual 0/O, 8/B and 1/I misreads are exact hits. Remaining OCR errors up
+    to ``max_distance`` edits are found through a deletion-neighbourhood
+    index: every key is stored under each variant with up to
+    ``max_distance`` characters deleted, and a read only has to look up its
+    own deletion variants, a handful of dict probes regardless of list size.
+    """
+
+    def __init__(self, entries=(), max_distance=MAX_DISTANCE):
+        self.max_distance = max_distance
+        self._entries = {}
+        self._variants = {}
+        for entry in entries:
+            self.add(entry.plate, entry.note)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def add(self, plate, note=""):
+        key = canonical_plate(plate)
+        if not key:
+            return
+        if key not in self._entries:
+            for variant in _deletions(key, self.max_distance):
+                keys = self._variants.get(variant)
+                if keys is None:
+                    # Most variants belong to a single plate; skip the list for those
+                    self._variants[variant] = key
+                elif isinstance(keys, str):
+                    self._variants[variant] = [keys, key]
+                else:
+                    keys.append(key)
+        self._entries[key] = WatchlistEntry(plate, note)
+
+    def match(self, text):
+        """Closest watchlisted plate within ``max_distance`` edits of ``text``, or None"""
+        key = canonical_plate(text)
+        if not key:
+            return None
+        entry = self._entries.get(key)
+        if entry is not None:
+            return WatchlistMatch(entry, text, 0)
+        best = None
+        best_distance = self.max_distance + 1
+        for variant in _deletions(key, self.max_distance):
+            keys = self._variants.get(variant)
+            if keys is None:
+                continue
+            for candidate in ([keys] if isinstance(keys, str) else keys):
+                distance = edit_distance(key, candidate, self.max_distance)
+                if distance < best_distance:
+                    best, best_distance = candidate, distance
+        if best is None:
+            return None
+        return WatchlistMatch(self._entries[best], text, best_distance)
+
+    def alerts(self, detections):
+        """A watchlist-match Detection for every plate detection that hits the list"""
+        alerts = []
+        for detection in detections:
+            if detection.event_type != PLATE_EVENT_TYPE:
+                continue
+            match = self.match(detection.label)
+            if match is None:
+                continue
+            registry.counter("watchlist_matches_total", "Plate reads that matched the watchlist",
+                             camera=detection.camera_id).inc()
+            logger.warning(f"Watchlisted plate {match.entry.plate} read as '{match.read}' "
+                           f"on camera {detection.camera_id}")
+            alerts.append(replace(detection, event_type=MATCH_EVENT_TYPE, label=match.entry.plate))
+        return alerts
+
+    @classmethod
+    def load(cls, path=None, max_distance=MAX_DISTANCE):
+        """Read ``plate[,note]`` rows from a CSV file; lines starting with '#' are skipped"""
+        watchlist = cls(max_distance=max_distance)
+        with open(path or default_path(), newline='', encoding='utf-8') as f:
+            for row in csv.reader(f):
+                if not row or not row[0].strip() or row[0].lstrip().startswith("#"):
+                    continue
+                watchlist.add(row[0].strip(), row[1].strip() if len(row) > 1 else "")
+        return watchlist
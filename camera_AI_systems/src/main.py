@@ -1,12 +1,123 @@
+from utils import startup  # first, so the startup timing covers every import below
+import argparse
+import logging
+import signal
 import sys
-from PyQt5.QtWidgets import QApplication
-from ui.main_window import ModernCameraAISystem
+from core.metrics_server import MetricsServer, DEFAULT_HOST
 
-def main():
-    app = QApplication(sys.argv)
-    ex = ModernCameraAISystem()
+logging.basicConfig(level=logging.INFO,
+                    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+startup.mark("imports")
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="Camera AI System")
+    parser.add_argument("--headless", action="store_true",
+                        help="run capture, AI and event recording without the window")
+    parser.add_argument("--local-api", action=argparse.BooleanOptionalAction, default=None,
+                        help="serve frames and detections to other processes over a Unix socket "
+                             "(default: on when headless, off with the window)")
+    parser.add_argument("--attach", action=argparse.BooleanOptionalAction, default=None,
+                        help="show cameras and detections of an already running service through "
+                             "its local API instead of capturing them again "
+                             "(default: attach when one is running)")
+    parser.add_argument("--metrics-port", type=int, default=None,
+                        help="serve Prometheus metrics on this port (disabled by default)")
+    parser.add_argument("--metrics-host", default=DEFAULT_HOST,
+                        help="interface for the metrics endpoint (default: %(default)s)")
+    # Anything we do not know is left for Qt (-style, -platform, ...)
+    return parser.parse_known_args(argv[1:])
+
+def start_local_api(service):
+    try:
+        service.start_local_api()
+    except RuntimeError as e:
+        logger.error(str(e))
+
+def attached_service(attach):
+    """A RemoteService on the running pipeline, or None to capture in this process"""
+    from core.local_api import server_running
+    if attach is False:
+        return None
+    if not server_running():
+        if attach:
+            raise RuntimeError("No running camera service to attach to; start one with --headless")
+        return None
+    from core.remote import RemoteService
+    service = RemoteService()
+    logger.info("Attached to the running camera service through its local API")
+    return service
+
+def run_gui(qt_args, local_api=False, attach=None):
+    from PyQt5.QtWidgets import QApplication
+    from ui.main_window import ModernCameraAISystem
+
+    app = QApplication(sys.argv[:1] + qt_args)
+    startup.mark("QApplication created")
+    try:
+        service = attached_service(attach)
+    except (RuntimeError, OSError) as e:
+        logger.error(str(e))
+        return 1
+    ex = ModernCameraAISystem(service=service)
+    startup.mark("main window built")
+    if local_api:
+        start_local_api(ex.service)
     ex.show()
-    sys.exit(app.exec_())
+    return app.exec_()
+
+def run_headless(qt_args, local_api=True):
+    # QtCore only: no widgets, no display connection, nothing rendered
+    from PyQt5.QtCore import QCoreApplication, QTimer
+    from core.resources import ResourceMonitor, register_current_thread
+    from core.service import CameraService
+
+    app = QCoreApplication(sys.argv[:1] + qt_args)
+    register_current_thread("main")
+    resource_monitor = ResourceMonitor()
+    resource_monitor.start()
+    service = CameraService()
+    service.start()
+    if local_api:
+        start_local_api(service)
+    startup.mark("service started")
+    startup.report()
+
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signum, lambda *_: app.quit())
+    # Python only runs signal handlers between bytecodes; wake up regularly
+    # so Ctrl+C / SIGTERM are not stuck behind the Qt event loop
+    signal_timer = QTimer()
+    signal_timer.timeout.connect(lambda: None)
+    signal_timer.start(500)
+
+    exit_code = app.exec_()
+    logger.info("Shutting down")
+    service.shutdown()
+    resource_monitor.stop()
+    resource_monitor.wait()
+    return exit_code
+
+def main():
+    args, qt_args = parse_args(sys.argv)
+
+    metrics_server = None
+    if args.metrics_port is not None:
+        metrics_server = MetricsServer(args.metrics_host, args.metrics_port)
+        try:
+            metrics_server.start()
+        except OSError as e:
+            # A taken port or bad host must not stop the cameras
+            logger.error(f"metrics endpoint disabled: {str(e)}")
+            metrics_server = None
+
+    if args.headless:
+        exit_code = run_headless(qt_args, local_api=args.local_api is not False)
+    else:
+        exit_code = run_gui(qt_args, local_api=bool(args.local_api), attach=args.attach)
+    if metrics_server is not None:
+        metrics_server.stop()
+    sys.exit(exit_code)
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,52 @@
+from dataclasses import dataclass, asdict, fields
+
+RTSP_TRANSPORTS = ("tcp", "udp")
+
+
+@dataclass
+class TransportOptions:
+    """Per-camera capture tuning applied by the capture engine.
+
+    Defaults favour glass-to-glass latency over robustness on lossy links:
+    FFmpeg normally probes 5 MB / 5 s of stream and buffers decoded frames,
+    which is where most of the 1-3 s lag on RTSP cameras comes from.
+
+    Only demuxer (format) options reach FFmpeg: OpenCV passes
+    OPENCV_FFMPEG_CAPTURE_OPTIONS to avformat_open_input and opens the
+    decoder with its own settings, so codec flags such as
+    ``flags=low_delay`` would be silently ignored and are not offered.
+    """
+
+    rtsp_transport: str = "tcp"
+    buffer_size: int = 1           # frames queued inside the capture backend
+    probe_size: int = 500000       # bytes read to detect the stream format
+    analyze_duration: int = 500000  # microseconds of stream analysed on open
+    low_delay: bool = True         # fflags=nobuffer: no demuxer-side packet buffering
+    decode_threads: int = 0        # FFmpeg decoder threads; 0 = share of the global budget
+    hw_decode: bool = False        # use a hardware decoder when OpenCV finds one
+
+    @classmethod
+    def from_info(cls, camera_info):
+        """Read options stored under ``camera_info["transport"]``, ignoring unknown keys"""
+        data = camera_info.get("transport") or {}
+        known = {field.name for field in fields(cls)}
+        options = cls(**{key: value for key, value in data.items() if key in known})
+        if options.rtsp_transport not in RTSP_TRANSPORTS:
+            options.rtsp_transport = "tcp"
+        return options
+
+    def to_dict(self):
+        return asdict(self)
+
+    def ffmpeg_options(self, protocol):
+        """Return the OPENCV_FFMPEG_CAPTURE_OPTIONS string for ``protocol``"""
+        if protocol == "Local File":
+            return ""
+        options = []
+        if protocol == "RTSP":
+            options.append(("rtsp_transport", self.rtsp_transport))
+        options.append(("probesize", self.probe_size))
+        options.append(("analyzeduration", self.analyze_duration))
+        if self.low_delay:
+            options.append(("fflags", "nobuffer"))
+        return "|".join(f"{key};{value}" for key, value in options)
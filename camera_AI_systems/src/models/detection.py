@@ -0,0 +1,21 @@
+import time
+from dataclasses import dataclass, field
+
+
+@dataclass
+class Detection:
+    """One object found by the AI pipeline in a camera frame.
+
+    ``crop`` holds the BGR image region and is never persisted itself; the
+    event store saves it through a ThumbnailStore and records the key in
+    ``thumbnail``. Everything else is what reports and the event store keep.
+    """
+
+    camera_id: int
+    event_type: str
+    label: str = ""
+    confidence: float = 0.0
+    bbox: tuple = ()
+    timestamp: float = field(default_factory=time.time)
+    crop: object = field(default=None, repr=False, compare=False)
+    thumbnail: str = ""
@@ -0,0 +1,118 @@
+import threading
+import time
+
+# ImageNet statistics, in RGB order, used by most pretrained detectors
+TENSOR_MEAN = (0.485, 0.456, 0.406)
+TENSOR_STD = (0.229, 0.224, 0.225)
+
+
+class FrameViews:
+    """Derived images of one decoded frame, each computed at most once.
+
+    Display wants RGB, motion checks want grayscale, the local API wants a
+    downscaled copy and models want a normalized NCHW tensor. Converting the
+    full frame separately in every consumer multiplies memory traffic, so
+    the first consumer to ask computes a view and everyone after it gets
+    the same array. Views belong to the frame and are freed with it; treat
+    them as read-only.
+    """
+
+    def __init__(self):
+        self._views = {}
+        self._lock = threading.Lock()
+
+    def get(self, key, compute):
+        view = self._views.get(key)
+        if view is None:
+            # Consumers on other threads wait for the conversion instead of repeating it
+            with self._lock:
+                view = self._views.get(key)
+                if view is None:
+                    view = compute()
+                    self._views[key] = view
+        return view
+
+
+class Frame:
+    """A decoded camera frame and the pipeline timestamps it collects.
+
+    Timestamps are ``time.monotonic()`` values keyed by stage name
+    ("read", "capture", "decode", "enqueue", "dequeue", "inference", "paint").
+    ``image`` is the BGR array from OpenCV; ``rgb``, ``gray``, ``scaled``
+    and ``tensor`` return cached conversions of it (see ``FrameViews``).
+    ``preview`` marks a keyframe decoded for a thumbnail, seconds apart from
+    the previous one.
+    """
+
+    def __init__(self, camera_id, image, seq, captured_at=None):
+        self.camera_id = camera_id
+        self.image = image
+        self.seq = seq
+        self.preview = False
+        self.views = FrameViews()
+        self.timestamps = {}
+        self.mark("capture", captured_at)
+
+    def mark(self, stage, at=None):
+        at = time.monotonic() if at is None else at
+        self.timestamps[stage] = at
+        return at
+
+    def for_camera(self, camera_id):
+        """The same decoded image delivered under another camera id.
+
+        Used when several configured cameras share one upstream session; the
+        image and its views are shared, the timestamps are copied, since
+        each copy moves through the pipeline on its own.
+        """
+        frame = Frame(camera_id, self.image, self.seq)
+        frame.views = self.views
+        frame.preview = self.preview
+        frame.timestamps = dict(self.timestamps)
+        return frame
+
+    def elapsed(self, start, end):
+        """Seconds between two recorded stages, or None if either is missing"""
+        if start not in self.timestamps or end not in self.timestamps:
+            return None
+        return self.timestamps[end] - self.timestamps[start]
+
+    def rgb(self):
+        """The image in RGB channel order, as Qt and most models expect"""
+        def compute():
+            import cv2
+            return cv2.cvtColor(self.image, cv2.COLOR_BGR2RGB)
+        return self.views.get("rgb", compute)
+
+    def gray(self, max_width=None):
+        """Single-channel image, optionally from the ``max_width`` downscale"""
+        def compute():
+            import cv2
+            return cv2.cvtColor(self.scaled(max_width), cv2.COLOR_BGR2GRAY)
+        return self.views.get(("gray", max_width), compute)
+
+    def scaled(self, max_width=None):
+        """BGR image at most ``max_width`` pixels wide; the original when it already fits"""
+        height, width = self.image.shape[:2]
+        if not max_width or width <= max_width:
+            return self.image
+
+        def compute():
+            import cv2
+            return cv2.resize(self.image, (max_width, max(1, height * max_width // width)),
+                              interpolation=cv2.INTER_AREA)
+        return self.views.get(("scaled", max_width), compute)
+
+    def tensor(self, size, mean=TENSOR_MEAN, std=TENSOR_STD):
+        """Float32 NCHW RGB blob of ``size`` (width, height), scaled to 0..1 and normalized"""
+        def compute():
+            import cv2
+            import numpy as np
+            # One pass for resize, BGR->RGB, HWC->NCHW and the 0..1 scaling
+            blob = cv2.dnn.blobFromImage(self.image, 1.0 / 255, tuple(size), swapRB=True)
+            if mean is not None:
+                blob -= np.asarray(mean, dtype=blob.dtype).reshape(1, -1, 1, 1)
+            if std is not None:
+                blob /= np.asarray(std, dtype=blob.dtype).reshape(1, -1, 1, 1)
+            return blob
+        return self.views.get(("tensor", tuple(size), mean, std), compute)
@@ -1,17 +1,22 @@
-from .main_window import ModernCameraAISystem
-from .dashboard_page import DashboardPage
-from .camera_page import CameraPage
-from .ai_control_page import AIControlPage
-from .reports_page import ReportsPage
-from .styles import ModernStyle
-from .memory_usage_chart import MemoryUsageChart
+import importlib
 
-__all__ = [
-    'ModernCameraAISystem',
-    'DashboardPage',
-    'CameraPage',
-    'AIControlPage',
-    'ReportsPage',
-    'ModernStyle',
-    'MemoryUsageChart'
-]
\ No newline at end of file
+# Pages are imported on first access so that importing one ui module (as
+# main.py does) does not pull in every page and its dependencies (cv2, ...)
+_EXPORTS = {
+    'ModernCameraAISystem': '.main_window',
+    'DashboardPage': '.dashboard_page',
+    'CameraPage': '.camera_page',
+    'AIControlPage': '.ai_control_page',
+    'ReportsPage': '.reports_page',
+    'ModernStyle': '.styles',
+    'TimeSeriesChart': '.time_series_chart',
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(importlib.import_module(module, __name__), name)
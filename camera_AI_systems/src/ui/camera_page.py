@@ -1,65 +1,32 @@
  
 import sys
-import json
-import time
+import queue
 import logging
-import cv2
+import threading
+from collections import deque
+from dataclasses import replace
 from PyQt5.QtWidgets import (QApplication, QDialog, QVBoxLayout, QHBoxLayout, QLabel, 
                             QLineEdit, QComboBox, QPushButton, QFileDialog, QFormLayout,
                             QWidget, QListWidget, QGridLayout, QMessageBox, QScrollArea, 
-                            QListWidgetItem, QGroupBox, QProgressBar, QStatusBar, QShortcut)
-from PyQt5.QtCore import Qt, QThread, pyqtSignal
-from PyQt5.QtGui import QImage, QPixmap, QIcon, QKeySequence
+                            QGroupBox, QProgressBar, QStatusBar, QShortcut,
+                            QCheckBox, QAbstractItemView, QSpinBox, QListView)
+from PyQt5.QtCore import Qt, QThread, QTimer, QAbstractListModel, QModelIndex, QSize, pyqtSignal
+from PyQt5.QtGui import QImage, QPixmap, QKeySequence, QColor, QIcon
+from core.detection_index import DetectionIndex
+from core.keyframes import PREVIEW_INTERVAL
+from core.service import CameraService
+from core.thumbnail_store import THUMBNAIL_SIZE
+from .thumbnail_cache import ThumbnailCache
+from core.watchlist import MATCH_EVENT_TYPE
+from core.metrics import latency_tracker, registry
+from core.resources import register_current_thread
+from models.camera import TransportOptions
 
 # Set up logging
 logging.basicConfig(level=logging.INFO,
                    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-class CameraConnection(QThread):
-    connection_lost = pyqtSignal(int)
-    connection_restored = pyqtSignal(int)
-    
-    def __init__(self, camera_id, camera_info):
-        super().__init__()
-        self.camera_id = camera_id
-        self.camera_info = camera_info
-        self.retry_count = 0
-        self.max_retries = 3
-        self._running = True
-        
-    def run(self):
-        while self._running:
-            if not self.check_connection():
-                self.connection_lost.emit(self.camera_id)
-                self.attempt_reconnect()
-            time.sleep(5)
-    
-    def check_connection(self):
-        try:
-            # Implement connection check based on protocol
-            return True
-        except Exception as e:
-            logger.error(f"Connection check failed for camera {self.camera_id}: {str(e)}")
-            return False
-            
-    def attempt_reconnect(self):
-        while self.retry_count < self.max_retries and self._running:
-            try:
-                logger.info(f"Attempting to reconnect camera {self.camera_id}")
-                # Implement reconnection logic
-                self.connection_restored.emit(self.camera_id)
-                self.retry_count = 0
-                return True
-            except Exception as e:
-                logger.error(f"Reconnection attempt failed: {str(e)}")
-                self.retry_count += 1
-                time.sleep(2)
-        return False
-    
-    def stop(self):
-        self._running = False
-
 class AddCameraDialog(QDialog):
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -101,6 +68,45 @@ class AddCameraDialog(QDialog):
         self.password.setEchoMode(QLineEdit.Password)
         form_layout.addRow("Password:", self.password)
 
+        # Transport tuning (RTSP / HTTP)
+        defaults = TransportOptions()
+        self.rtsp_transport = QComboBox()
+        self.rtsp_transport.addItems(["TCP", "UDP"])
+        self.rtsp_transport.setCurrentText(defaults.rtsp_transport.upper())
+        form_layout.addRow("RTSP Transport:", self.rtsp_transport)
+
+        self.low_delay = QCheckBox("No input buffering (lower latency)")
+        self.low_delay.setChecked(defaults.low_delay)
+        form_layout.addRow("Latency:", self.low_delay)
+
+        self.buffer_size = QSpinBox()
+        self.buffer_size.setRange(0, 100)
+        self.buffer_size.setValue(defaults.buffer_size)
+        self.buffer_size.setSuffix(" frames")
+        form_layout.addRow("Capture Buffer:", self.buffer_size)
+
+        self.probe_size = QSpinBox()
+        self.probe_size.setRange(32, 50000)
+        self.probe_size.setValue(defaults.probe_size // 1000)
+        self.probe_size.setSuffix(" KB")
+        form_layout.addRow("Probe Size:", self.probe_size)
+
+        self.analyze_duration = QSpinBox()
+        self.analyze_duration.setRange(0, 10000)
+        self.analyze_duration.setValue(defaults.analyze_duration // 1000)
+        self.analyze_duration.setSuffix(" ms")
+        form_layout.addRow("Analyze Duration:", self.analyze_duration)
+
+        self.decode_threads = QSpinBox()
+        self.decode_threads.setRange(0, 16)
+        self.decode_threads.setValue(defaults.decode_threads)
+        self.decode_threads.setSpecialValueText("Auto")
+        form_layout.addRow("Decode Threads:", self.decode_threads)
+
+        self.hw_decode = QCheckBox("Hardware decoding if available")
+        self.hw_decode.setChecked(defaults.hw_decode)
+        form_layout.addRow("Decoder:", self.hw_decode)
+
         # File Path
         self.file_path = QLineEdit()
         self.browse_btn = QPushButton("Browse")
@@ -158,6 +164,10 @@ class AddCameraDialog(QDialog):
         self.port.setVisible(is_http)
         self.username.setVisible(is_rtsp or is_http)
         self.password.setVisible(is_rtsp or is_http)
+        self.rtsp_transport.setVisible(is_rtsp)
+        for widget in (self.low_delay, self.buffer_size, self.probe_size, self.analyze_duration,
+                       self.decode_threads, self.hw_decode):
+            widget.setVisible(is_rtsp or is_http)
         self.file_path.setVisible(is_local)
         self.browse_btn.setVisible(is_local)
 
@@ -171,9 +181,20 @@ class AddCameraDialog(QDialog):
         if file_name:
             self.file_path.setText(file_name)
 
+    def get_transport_options(self):
+        return TransportOptions(
+            rtsp_transport=self.rtsp_transport.currentText().lower(),
+            buffer_size=self.buffer_size.value(),
+            probe_size=self.probe_size.value() * 1000,
+            analyze_duration=self.analyze_duration.value() * 1000,
+            low_delay=self.low_delay.isChecked(),
+            decode_threads=self.decode_threads.value(),
+            hw_decode=self.hw_decode.isChecked()
+        )
+
     def get_camera_info(self):
         protocol = self.protocol.currentText()
-        return {
+        info = {
             "name": self.camera_name.text(),
             "protocol": protocol,
             "rtsp_url": self.rtsp_url.text() if protocol == "RTSP" else "",
@@ -183,12 +204,18 @@ class AddCameraDialog(QDialog):
             "password": self.password.text() if protocol in ["RTSP", "HTTP"] else "",
             "file_path": self.file_path.text() if protocol == "Local File" else ""
         }
+        if protocol in ["RTSP", "HTTP"]:
+            info["transport"] = self.get_transport_options().to_dict()
+        return info
 
 
 class CameraView(QLabel):
+    ai_mode_changed = pyqtSignal(int, str)
+
     def __init__(self, camera_id):
         super().__init__()
         self.camera_id = camera_id
+        self._pending_frame = None
         self.fullscreen = False
         self.stream = None
         self._is_running = False
@@ -274,10 +301,11 @@ class CameraView(QLabel):
         """Handle AI mode change"""
         self.ai_mode = mode
         logger.info(f"Camera {self.camera_id} AI mode changed to: {mode}")
-        # Implement AI mode change logic here
+        self.ai_mode_changed.emit(self.camera_id, mode)
         
     def start_stream(self):
         if not self._is_running:
+            import cv2
             self._is_running = True
             self.stream = cv2.VideoCapture()
             logger.info(f"Started stream for camera {self.camera_id}")
@@ -290,10 +318,20 @@ class CameraView(QLabel):
                 self.stream = None
             logger.info(f"Stopped stream for camera {self.camera_id}")
 
-    def update_frame(self, frame):
-        """Update the camera frame"""
+    def update_frame(self, frame, source=None):
+        """Update the camera frame; ``source`` is the pipeline Frame it was rendered from"""
+        if self._pending_frame is not None:
+            registry.counter("display_frames_dropped_total", "Frames replaced before they were painted",
+                             camera=self.camera_id).inc()
+        self._pending_frame = source
         self.setPixmap(QPixmap.fromImage(frame))
 
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        if self._pending_frame is not None:
+            latency_tracker.observe(self._pending_frame, "paint")
+            self._pending_frame = None
+
     def set_status(self, status):
         """Update camera status"""
         if status == "connected":
@@ -320,10 +358,131 @@ class CameraView(QLabel):
         """Handle close event"""
         self.stop_stream()
         super().closeEvent(event)
+class ResultScaler(QThread):
+    """Turns detection crops into list thumbnails off the GUI thread.
+
+    Results are collected until the view takes them with ``take()``, so the
+    GUI thread handles a burst of detections in a single update.
+    """
+
+    THUMBNAIL_WIDTH = THUMBNAIL_SIZE  # Same as the stored thumbnails, so cached and reloaded rows match
+    QUEUE_SIZE = 256
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._queue = queue.Queue(self.QUEUE_SIZE)
+        self._pending = []
+        self._lock = threading.Lock()
+        self._running = True
+
+    def submit(self, detection):
+        """Queue a detection for scaling; safe to call from any thread"""
+        try:
+            self._queue.put_nowait(detection)
+        except queue.Full:
+            registry.counter("result_thumbnails_dropped_total",
+                             "Detections left out of the result list because scaling fell behind").inc()
+
+    def take(self):
+        """Return and clear the ``[(detection, QImage)]`` scaled since the last call"""
+        with self._lock:
+            pending, self._pending = self._pending, []
+        return pending
+
+    def run(self):
+        register_current_thread("gui-scaler")
+        while self._running:
+            try:
+                detection = self._queue.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            image = QImage()
+            # Without a thumbnail key there is nowhere to keep the image, so the row shows none
+            if detection.crop is not None and detection.thumbnail:
+                try:
+                    image = CameraPage.to_qimage(detection.crop).scaledToWidth(self.THUMBNAIL_WIDTH)
+                except Exception as e:
+                    logger.error(f"Failed to scale detection crop: {str(e)}")
+            # The crop is no longer needed once scaled; don't keep it alive in the feed
+            with self._lock:
+                self._pending.append((replace(detection, crop=None), image))
+
+    def stop(self):
+        self._running = False
+
+
+class ResultModel(QAbstractListModel):
+    """Newest-first list model over a bounded ring of recent detections"""
+
+    CAPACITY = 200
+
+    def __init__(self, parent=None, capacity=CAPACITY, thumbnail_cache=None):
+        super().__init__(parent)
+        self.thumbnail_cache = thumbnail_cache
+        self._entries = deque(maxlen=capacity)
+        if thumbnail_cache is not None:
+            thumbnail_cache.thumbnail_loaded.connect(self.on_thumbnail_loaded)
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._entries)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        detection = self._entries[index.row()]
+        if role == Qt.DisplayRole:
+            return f"Camera {detection.camera_id} - License: {detection.label}"
+        if role == Qt.DecorationRole and self.thumbnail_cache is not None:
+            return self.thumbnail_cache.get(detection.thumbnail)
+        if role == Qt.BackgroundRole and detection.event_type == MATCH_EVENT_TYPE:
+            return QColor("#F8D7DA")
+        if role == Qt.UserRole:
+            return detection.thumbnail
+        return None
+
+    def on_thumbnail_loaded(self, key):
+        for row, detection in enumerate(self._entries):
+            if detection.thumbnail == key:
+                index = self.index(row)
+                self.dataChanged.emit(index, index, [Qt.DecorationRole])
+
+    def prepend(self, entries):
+        """Insert detections oldest first, dropping the oldest rows past capacity"""
+        entries = entries[-self._entries.maxlen:]
+        overflow = len(self._entries) + len(entries) - self._entries.maxlen
+        if overflow > 0:
+            self.beginRemoveRows(QModelIndex(), len(self._entries) - overflow, len(self._entries) - 1)
+            for _ in range(overflow):
+                self._entries.pop()
+            self.endRemoveRows()
+        self.beginInsertRows(QModelIndex(), 0, len(entries) - 1)
+        self._entries.extendleft(entries)
+        self.endInsertRows()
+
+    def set_entries(self, entries):
+        """Replace the rows with ``entries``, newest first"""
+        self.beginResetModel()
+        self._entries.clear()
+        self._entries.extend(entries[:self._entries.maxlen])
+        self.endResetModel()
+
+
 class ResultView(QWidget):
-    def __init__(self):
+    UPDATE_INTERVAL_MS = 250
+
+    def __init__(self, thumbnail_cache):
         super().__init__()
+        self.thumbnail_cache = thumbnail_cache
+        self.index = DetectionIndex()
+        self.camera_filter = None
+        self.plate_filter = ""
+        self.scaler = ResultScaler(self)
+        self.scaler.start()
         self.init_ui()
+        # Insertions are batched so a busy feed repaints the list a few times a second at most
+        self.update_timer = QTimer(self)
+        self.update_timer.timeout.connect(self.flush)
+        self.update_timer.start(self.UPDATE_INTERVAL_MS)
 
     def init_ui(self):
         # Set fixed width to be half of original (assuming original matches camera view width)
@@ -343,20 +502,36 @@ class ResultView(QWidget):
             }
         """)
         
+        # Live feed filters
+        filter_widget = QWidget()
+        filter_layout = QHBoxLayout(filter_widget)
+        filter_layout.setContentsMargins(0, 0, 0, 0)
+        self.camera_filter_combo = QComboBox()
+        self.camera_filter_combo.addItem("All cameras", None)
+        self.camera_filter_combo.currentIndexChanged.connect(self.apply_filter)
+        self.plate_search = QLineEdit()
+        self.plate_search.setPlaceholderText("Plate starts with...")
+        self.plate_search.textChanged.connect(self.apply_filter)
+        filter_layout.addWidget(self.camera_filter_combo)
+        filter_layout.addWidget(self.plate_search)
+
         # Results list with styling
-        self.results_list = QListWidget()
+        self.results_model = ResultModel(self, thumbnail_cache=self.thumbnail_cache)
+        self.results_list = QListView()
+        self.results_list.setModel(self.results_model)
+        self.results_list.setUniformItemSizes(True)
         self.results_list.setStyleSheet("""
-            QListWidget {
+            QListView {
                 font-size: 12px;
                 border: 1px solid #cccccc;
                 border-radius: 4px;
                 background-color: white;
             }
-            QListWidget::item {
+            QListView::item {
                 padding: 5px;
                 border-bottom: 1px solid #eeeeee;
             }
-            QListWidget::item:selected {
+            QListView::item:selected {
                 background-color: #e6e6e6;
                 color: black;
             }
@@ -365,27 +540,81 @@ class ResultView(QWidget):
 
         
         layout.addWidget(title_label)
+        layout.addWidget(filter_widget)
         layout.addWidget(self.results_list)
 
-    def update_result(self, license_plate, image):
-        item = QListWidgetItem(f"License: {license_plate}")
-        
-        # Scale down the image to fit the narrower width
-        scaled_image = image.scaledToWidth(280)  # Slightly less than widget width
-        item.setIcon(QIcon(QPixmap.fromImage(scaled_image)))
-        
-        self.results_list.insertItem(0, item)
-        if self.results_list.count() > 10:
-            self.results_list.takeItem(10)
+    def update_result(self, detection):
+        """Queue a detection for the list; safe to call from the AI worker thread"""
+        self.scaler.submit(detection)
+
+    def flush(self):
+        entries = self.scaler.take()
+        if not entries:
+            return
+        matching = []
+        for detection, image in entries:
+            # The thumbnail file may still be queued; serve it from memory until then.
+            # The cache turns it into a pixmap when the row is first painted.
+            # Rows and the index keep only the key, so images are bounded by the cache.
+            self.thumbnail_cache.insert(detection.thumbnail, image)
+            if detection.camera_id not in self.index.cameras():
+                self.camera_filter_combo.addItem(f"Camera {detection.camera_id}", detection.camera_id)
+            self.index.add(detection)
+            if self.index.matches(detection, self.camera_filter, plate_prefix=self.plate_filter):
+                matching.append(detection)
+        if matching:
+            self.results_model.prepend(matching)
+
+    def apply_filter(self):
+        self.camera_filter = self.camera_filter_combo.currentData()
+        self.plate_filter = self.plate_search.text()
+        self.results_model.set_entries(self.index.query(camera_id=self.camera_filter,
+                                                        plate_prefix=self.plate_filter,
+                                                        limit=ResultModel.CAPACITY))
+
+    def shutdown(self):
+        self.update_timer.stop()
+        self.scaler.stop()
+        self.scaler.wait()
 
 class CameraPage(QWidget):
-    def __init__(self, parent=None):
+    # Width of the camera list previews
+    PREVIEW_WIDTH = 160
+
+    preview_ready = pyqtSignal(int, object)
+
+    def __init__(self, parent=None, service=None, thumbnail_cache=None):
         super().__init__(parent)
+        # Standalone use (see main() below) runs its own service
+        self.owns_service = service is None
+        self.service = service or CameraService(parent=self)
+        self.event_store = self.service.event_store
+        self.config_store = self.service.config_store
+        self.camera_manager = self.service.camera_manager
+        self.ai_processor = self.service.ai_processor
+        self.owns_thumbnail_cache = thumbnail_cache is None
+        self.thumbnail_cache = thumbnail_cache or ThumbnailCache(self.service.thumbnail_store)
         self.current_layout = "2x2"  # Đặt layout mặc định là 2x2
         self.cameras = {}
-        self.camera_connections = {}
+        self.camera_views = {}
+        self.preview_icons = {}
+        registry.gauge("cameras_configured", "Cameras defined in the configuration",
+                       fn=lambda: len(self.cameras))
+        self.camera_manager.frame_ready.connect(self.handle_frame)
+        self.camera_manager.connection_lost.connect(self.handle_connection_lost)
+        self.camera_manager.connection_restored.connect(self.handle_connection_restored)
+        self.camera_manager.camera_opened.connect(self.handle_camera_opened)
+        self.camera_manager.connect_progress.connect(self.update_connect_progress)
         self.init_ui()
+        # One thumbnail per camera every few seconds, from full streams and keyframe previews alike
+        self.preview_ready.connect(self.update_preview)
+        self.camera_manager.add_frame_listener(self.emit_preview, max_fps=1.0 / PREVIEW_INTERVAL)
+        # After the event store, so detections already carry their thumbnail key
+        self.ai_processor.add_detection_listener(self.update_detection_result)
         self.load_camera_config()
+        self.service.load_watchlist()
+        if self.auto_connect_check.isChecked():
+            self.connect_all_cameras()
         self.setup_shortcuts()
 
     def init_ui(self):
@@ -425,6 +654,8 @@ class CameraPage(QWidget):
         self.search_bar.textChanged.connect(self.filter_cameras)
         
         self.camera_list = QListWidget()
+        self.camera_list.setSelectionMode(QAbstractItemView.ExtendedSelection)
+        self.camera_list.setIconSize(QSize(96, 54))
         
         self.layout_selector = QComboBox()
         self.layout_selector.addItems(["2x2", "3x3", "4x4", "2x3", "3x2"])
@@ -463,6 +694,14 @@ class CameraPage(QWidget):
         for btn in [self.add_btn, self.connect_btn, self.disconnect_btn, self.playback_btn]:
             control_layout.addWidget(btn)
         
+        self.auto_connect_check = QCheckBox("Connect all on startup")
+        self.auto_connect_check.toggled.connect(lambda _: self.save_camera_config())
+        control_layout.addWidget(self.auto_connect_check)
+
+        self.previews_check = QCheckBox("Preview all cameras (keyframes only)")
+        self.previews_check.toggled.connect(lambda _: self.update_decode_modes())
+        self.previews_check.toggled.connect(lambda _: self.save_camera_config())
+        control_layout.addWidget(self.previews_check)
         control_layout.addWidget(self.loading_spinner)
         
         left_layout.addWidget(self.search_bar)
@@ -481,7 +720,7 @@ class CameraPage(QWidget):
         scroll_area.setWidget(grid_widget)
         scroll_area.setWidgetResizable(True)
         
-        self.result_view = ResultView()
+        self.result_view = ResultView(self.thumbnail_cache)
         
         right_layout.addWidget(scroll_area, 3)
         right_layout.addWidget(self.result_view, 1)
@@ -513,13 +752,12 @@ class CameraPage(QWidget):
     def reset_system(self):
         """Reset all camera configurations and connections."""
         # Dừng tất cả các kết nối camera
-        for connection in self.camera_connections.values():
-            connection.stop()
+        self.camera_manager.disconnect_all()
         
         # Xóa tất cả camera
         self.cameras.clear()
-        self.camera_connections.clear()
         self.camera_list.clear()
+        self.preview_icons.clear()
         
         # Khôi phục lại giao diện
         self.current_layout = "2x2"
@@ -537,7 +775,9 @@ class CameraPage(QWidget):
         camera_id = int(selected_items[0].text().split(':')[ 0].split()[-1])
         
         try:
+            self.camera_manager.disconnect_camera(camera_id)
             del self.cameras[camera_id]
+            self.preview_icons.pop(camera_id, None)
             self.camera_list.takeItem(self.camera_list.row(selected_items[0]))
             self.update_grid_layout()
             self.save_camera_config()
@@ -547,34 +787,6 @@ class CameraPage(QWidget):
             logger.error(f"Failed to delete camera {camera_id}: {str(e)}")
             QMessageBox.critical(self, "Error", f"Failed to delete camera: {str(e)}")
 
-    def save_camera_config(self):
-        """Save the current camera configuration to a file."""
-        config = {
-            'cameras': self.cameras,
-            'layout': self.current_layout
-        }
-        try:
-            with open('camera_config.json', 'w') as f:
-                json.dump(config, f)
-            logger.info("Camera configuration saved successfully")
-        except Exception as e:
-            logger.error(f"Failed to save camera configuration: {str(e)}")
-
-    def load_camera_config(self):
-        """Load the camera configuration from a file."""
-        try:
-            with open('camera_config.json', 'r') as f:
-                config = json.load(f)
-                self.cameras = config['cameras']
-                self.current_layout = config['layout']
-                self.layout_selector.setCurrentText(self.current_layout)
-                self.update_camera_list()
-            logger.info("Camera configuration loaded successfully")
-        except FileNotFoundError:
-            logger.info("No camera configuration file found")
-        except Exception as e:
-            logger.error(f"Failed to load camera configuration: {str(e)}")
-    
     # Thêm phương thức toggle_theme
     def toggle_theme(self):
         if self.theme_btn.isChecked():
@@ -648,42 +860,95 @@ class CameraPage(QWidget):
         self.disconnect_shortcut.activated.connect(self.disconnect_camera)
 
     def save_camera_config(self):
-        config = {
-            'cameras': self.cameras,
-            'layout': self.current_layout
-        }
-        try:
-            with open('camera_config.json', 'w') as f:
-                json.dump(config, f)
-            logger.info("Camera configuration saved successfully")
-        except Exception as e:
-            logger.error(f"Failed to save camera configuration: {str(e)}")
+        """Queue the camera configuration for a debounced, atomic save"""
+        self.config_store.save({
+            'cameras': {camera_id: {'info': camera['info']} for camera_id, camera in self.cameras.items()},
+            'ai_modes': dict(self.ai_processor.modes),
+            'layout': self.current_layout,
+            'auto_connect': self.auto_connect_check.isChecked(),
+            'previews': self.previews_check.isChecked()
+        })
 
     def load_camera_config(self):
         try:
-            with open('camera_config.json', 'r') as f:
-                config = json.load(f)
-                self.cameras = config['cameras']
-                self.current_layout = config['layout']
-                self.layout_selector.setCurrentText(self.current_layout)
-                self.update_camera_list()
-            logger.info("Camera configuration loaded successfully")
-        except FileNotFoundError:
-            logger.info("No camera configuration file found")
+            config = self.config_store.load()
         except Exception as e:
             logger.error(f"Failed to load camera configuration: {str(e)}")
+            return
+        self.cameras = {camera_id: {"info": camera["info"], "connected": False}
+                        for camera_id, camera in config['cameras'].items()}
+        self.service.apply_ai_modes(config['ai_modes'])
+        self.current_layout = config['layout']
+        self.auto_connect_check.blockSignals(True)
+        self.auto_connect_check.setChecked(config['auto_connect'])
+        self.auto_connect_check.blockSignals(False)
+        self.previews_check.blockSignals(True)
+        self.previews_check.setChecked(config['previews'])
+        self.previews_check.blockSignals(False)
+        self.layout_selector.setCurrentText(self.current_layout)
+        self.update_camera_list()
+        # Builds the first grid page, which also decides which cameras decode fully
+        self.update_grid_layout()
+        logger.info(f"Loaded {len(self.cameras)} camera(s) from {self.config_store.path}")
 
     def update_camera_list(self):
         self.camera_list.clear()
         for camera_id, camera_info in self.cameras.items():
             self.camera_list.addItem(f"Camera {camera_id}: {camera_info['info']['name']}")
+            if camera_id in self.preview_icons:
+                self.camera_list.item(self.camera_list.count() - 1).setIcon(self.preview_icons[camera_id])
+
+    def camera_item(self, camera_id):
+        for i in range(self.camera_list.count()):
+            item = self.camera_list.item(i)
+            if int(item.text().split(':')[0].split()[-1]) == camera_id:
+                return item
+        return None
+
+    def emit_preview(self, frame):
+        # Capture thread: downscale here, the list only gets a small image
+        self.preview_ready.emit(frame.camera_id, frame.scaled(self.PREVIEW_WIDTH))
+
+    def update_preview(self, camera_id, image):
+        import cv2
+        rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+        height, width, channels = rgb.shape
+        qimage = QImage(rgb.data, width, height, channels * width, QImage.Format_RGB888)
+        icon = QIcon(QPixmap.fromImage(qimage))
+        self.preview_icons[camera_id] = icon
+        item = self.camera_item(camera_id)
+        if item is not None:
+            item.setIcon(icon)
+
+    def update_decode_modes(self):
+        """Full decoding for cameras on the grid or running AI, keyframe previews for the rest"""
+        previews = self.previews_check.isChecked()
+        pending = []
+        for camera_id, camera in self.cameras.items():
+            streaming = self.camera_manager.is_streaming(camera_id)
+            if camera["connected"]:
+                # Off-page cameras without AI only feed the camera list
+                idle = (camera_id not in self.camera_views
+                        and self.ai_processor.modes.get(camera_id, "None") == "None")
+                self.camera_manager.set_keyframes_only(camera_id, idle)
+            elif previews and not streaming:
+                pending.append((camera_id, camera["info"]))
+            elif not previews and streaming:
+                self.camera_manager.disconnect_camera(camera_id)
+        if pending:
+            self.camera_manager.connect_cameras(pending, keyframes_only=True)
 
     def add_camera(self):
+        if not self.service.manages_cameras:
+            QMessageBox.warning(self, "Warning",
+                                "This window is attached to a running camera service, which only reads "
+                                "its cameras at startup. Add the camera while the service is stopped.")
+            return
         dialog = AddCameraDialog(self)
         if dialog.exec_():
             try:
                 camera_info = dialog.get_camera_info()
-                camera_id = len(self.cameras) + 1
+                camera_id = max(self.cameras, default=0) + 1
                 self.cameras[camera_id] = {
                     "info": camera_info,
                     "connected": False
@@ -696,57 +961,71 @@ class CameraPage(QWidget):
                 logger.error(f"Failed to add camera: {str(e)}")
                 QMessageBox.critical(self, "Error", f"Failed to add camera: {str(e)}")
 
+    def selected_camera_ids(self):
+        return [int(item.text().split(':')[0].split()[-1]) for item in self.camera_list.selectedItems()]
+
     def connect_camera(self):
-        selected_items = self.camera_list.selectedItems()
-        if not selected_items:
+        camera_ids = self.selected_camera_ids()
+        if not camera_ids:
             QMessageBox.warning(self, "Warning", "Please select a camera to connect.")
             return
-        
-        camera_id = int(selected_items[0].text().split(':')[0].split()[-1])
-        
+        self.connect_cameras(camera_ids)
+
+    def connect_all_cameras(self):
+        self.connect_cameras(list(self.cameras))
+
+    def connect_cameras(self, camera_ids):
+        """Start streams for the given cameras; opening happens off the GUI thread"""
+        pending = []
+        for camera_id in camera_ids:
+            camera = self.cameras.get(camera_id)
+            if camera is None or camera["connected"]:
+                continue
+            camera["connected"] = True
+            pending.append((camera_id, camera["info"]))
+        if not pending:
+            return
         try:
-            self.loading_spinner.setVisible(True)
-            if not self.cameras[camera_id]["connected"]:
-                camera_info = self.cameras[camera_id]["info"]
-                
-                # Start camera connection thread
-                connection = CameraConnection(camera_id, camera_info)
-                connection.connection_lost.connect(self.handle_connection_lost)
-                connection.connection_restored.connect(self.handle_connection_restored)
-                self.camera_connections[camera_id] = connection
-                connection.start()
-                
-                self.cameras[camera_id]["connected"] = True
-                self.update_camera_status(camera_id, "connected")
-                logger.info(f"Camera {camera_id} connected successfully")
-                QMessageBox.information(self, "Success", f"Camera {camera_id} connected successfully.")
+            # Cameras already previewing keep their session and switch to full decoding
+            self.camera_manager.connect_cameras(pending)
+            self.update_decode_modes()
+            self.status_bar.showMessage(f"Connecting {len(pending)} camera(s)...")
+            logger.info(f"Connecting cameras {[camera_id for camera_id, _ in pending]}")
         except Exception as e:
-            logger.error(f"Failed to connect camera {camera_id}: {str(e)}")
+            logger.error(f"Failed to connect cameras: {str(e)}")
             QMessageBox.critical(self, "Error", f"Failed to connect camera: {str(e)}")
-        finally:
-            self.loading_spinner.setVisible(False)
 
     def disconnect_camera(self):
-        selected_items = self.camera_list.selectedItems()
-        if not selected_items:
+        camera_ids = self.selected_camera_ids()
+        if not camera_ids:
             QMessageBox.warning(self, "Warning", "Please select a camera to disconnect.")
             return
         
-        camera_id = int(selected_items[0].text().split(':')[0].split()[-1])
-        
-        try:
-            if self.cameras[camera_id]["connected"]:
-                if camera_id in self.camera_connections:
-                    self.camera_connections[camera_id].stop()
-                    del self.camera_connections[camera_id]
-                
-                self.cameras[camera_id]["connected"] = False
-                self.update_camera_status(camera_id, "disconnected")
-                logger.info(f"Camera {camera_id} disconnected successfully")
-                QMessageBox.information(self, "Success", f"Camera {camera_id} disconnected.")
-        except Exception as e:
-            logger.error(f"Failed to disconnect camera {camera_id}: {str(e)}")
-            QMessageBox.critical(self, "Error", f"Failed to disconnect camera: {str(e)}")
+        for camera_id in camera_ids:
+            try:
+                if self.cameras[camera_id]["connected"]:
+                    self.camera_manager.disconnect_camera(camera_id)
+                    self.cameras[camera_id]["connected"] = False
+                    self.update_camera_status(camera_id, "disconnected")
+                    logger.info(f"Camera {camera_id} disconnected successfully")
+            except Exception as e:
+                logger.error(f"Failed to disconnect camera {camera_id}: {str(e)}")
+                QMessageBox.critical(self, "Error", f"Failed to disconnect camera: {str(e)}")
+        # Back to a keyframe preview when previews are on
+        self.update_decode_modes()
+        self.status_bar.showMessage(f"Disconnected {len(camera_ids)} camera(s)")
+
+    def handle_camera_opened(self, camera_id, ok):
+        if not ok:
+            self.status_bar.showMessage(f"Could not open Camera {camera_id}, retrying")
+
+    def update_connect_progress(self, done, total):
+        self.loading_spinner.setRange(0, total)
+        self.loading_spinner.setValue(done)
+        self.loading_spinner.setFormat("Connecting %v/%m")
+        self.loading_spinner.setVisible(done < total)
+        if done >= total:
+            self.status_bar.showMessage(f"Connected {total} camera(s)")
 
     def handle_connection_lost(self, camera_id):
         self.update_camera_status(camera_id, "disconnected")
@@ -759,11 +1038,26 @@ class CameraPage(QWidget):
         logger.info(f"Connection restored to Camera {camera_id}")
 
     def update_camera_status(self, camera_id, status):
-        for i in range(self.grid_layout.count()):
-            widget = self.grid_layout.itemAt(i).widget()
-            if isinstance(widget, CameraView) and widget.camera_id == camera_id:
-                widget.set_status(status)
-                break
+        view = self.camera_views.get(camera_id)
+        if view is not None:
+            view.set_status(status)
+
+    def handle_frame(self, camera_id, frame):
+        view = self.camera_views.get(camera_id)
+        if view is None:
+            return
+        # The RGB view is shared with any other consumer of this frame
+        rgb = frame.rgb()
+        height, width, channels = rgb.shape
+        image = QImage(rgb.data, width, height, channels * width, QImage.Format_RGB888)
+        view.update_frame(image.scaled(view.size(), Qt.KeepAspectRatio), frame)
+
+    @staticmethod
+    def to_qimage(bgr):
+        import cv2
+        rgb = cv2.cvtColor(bgr, cv2.COLOR_BGR2RGB)
+        height, width, channels = rgb.shape
+        return QImage(rgb.data, width, height, channels * width, QImage.Format_RGB888).copy()
 
     def playback_camera(self):
         selected_items = self.camera_list.selectedItems()
@@ -792,6 +1086,7 @@ class CameraPage(QWidget):
             widget = self.grid_layout.itemAt(i).widget()
             if widget:
                 widget.setParent(None)
+        self.camera_views.clear()
 
         # Calculate total pages needed
         cameras_per_page = 4  # 2x2 grid
@@ -812,8 +1107,13 @@ class CameraPage(QWidget):
         for i, (camera_id, camera_info) in enumerate(self.cameras.items()):
             if start_idx <= i < end_idx:
                 view = CameraView(camera_id)
-                if camera_info["connected"]:
+                view.ai_mode_selector.setCurrentText(self.ai_processor.modes.get(camera_id, "None"))
+                view.ai_mode_changed.connect(self.ai_processor.set_mode)
+                view.ai_mode_changed.connect(lambda *_: self.save_camera_config())
+                view.ai_mode_changed.connect(lambda *_: self.update_decode_modes())
+                if self.camera_manager.is_connected(camera_id):
                     view.set_status("connected")
+                self.camera_views[camera_id] = view
                 self.grid_layout.addWidget(view, grid_position // cols, grid_position % cols)
                 grid_position += 1
 
@@ -822,19 +1122,25 @@ class CameraPage(QWidget):
         total_width = cols * 640
         total_height = rows * 640
         grid_widget.setFixedSize(total_width, total_height)
+        self.update_decode_modes()
 
-    def update_detection_result(self, license_plate, image):
-        self.result_view.update_result(license_plate, image)
+    def update_detection_result(self, detection):
+        self.result_view.update_result(detection)
+
+    def shutdown(self):
+        """Save the configuration and stop the result feed; the owner of the service stops capture and AI"""
+        self.result_view.shutdown()
+        
+        # Save configuration
+        self.save_camera_config()
+        if self.owns_thumbnail_cache:
+            self.thumbnail_cache.shutdown()
+        if self.owns_service:
+            self.service.shutdown()
 
     def closeEvent(self, event):
         try:
-            # Stop all camera connections
-            for connection in self.camera_connections.values():
-                connection.stop()
-            
-            # Save configuration
-            self.save_camera_config()
-            
+            self.shutdown()
             logger.info("Application shutting down")
             event.accept()
         except Exception as e:
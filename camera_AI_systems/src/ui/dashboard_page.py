@@ -1,12 +1,44 @@
 
-from PyQt5.QtWidgets import QWidget, QVBoxLayout, QGroupBox, QGridLayout, QLabel, QHBoxLayout
-from PyQt5.QtCore import QTimer, Qt, QTime, QDate
+import datetime
+import logging
+import time
+import psutil
+from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QGroupBox, QGridLayout, QLabel, QHBoxLayout,
+                             QTableWidget, QTableWidgetItem, QPushButton, QFileDialog, QMessageBox)
+from PyQt5.QtCore import QTimer, Qt, QTime, QDate, QThread, pyqtSignal
 from PyQt5.QtGui import QFont, QColor
-from .memory_usage_chart import MemoryUsageChart
+from .time_series_chart import TimeSeriesChart
+from core.metrics import latency_tracker, registry, rates
+from core.watchlist import MATCH_EVENT_TYPE
+
+logger = logging.getLogger(__name__)
+
+# Seconds between event store recounts of today's alerts when no new match has been seen
+ALERTS_REFRESH_SECONDS = 30
+
+
+class AlertCountWorker(QThread):
+    """Counts watchlist matches since a timestamp off the GUI thread"""
+    counted = pyqtSignal(float, object)
+
+    def __init__(self, event_store, since, parent=None):
+        super().__init__(parent)
+        self.event_store = event_store
+        self.since = since
+
+    def run(self):
+        try:
+            self.counted.emit(self.since, self.event_store.count(self.since, time.time(),
+                                                                 event_types=[MATCH_EVENT_TYPE]))
+        except Exception as e:
+            logger.error(f"Failed to count today's alerts: {str(e)}")
+
 
 class DashboardPage(QWidget):
-    def __init__(self, parent=None):
+    def __init__(self, parent=None, resource_monitor=None, event_store=None):
         super().__init__(parent)
+        self.resource_monitor = resource_monitor
+        self.event_store = event_store
         self.init_ui()
 
     def init_ui(self):
@@ -52,16 +84,63 @@ class DashboardPage(QWidget):
         stats_layout = QGridLayout(stats_widget)
         stats_layout.setSpacing(10)  # Tăng khoảng cách giữa các thẻ
 
-        self.create_stat_card("Total Cameras", "12", stats_layout, 0, 0, color="#3498DB")
-        self.create_stat_card("Active Cameras", "8", stats_layout, 0, 1, color="#2ECC71", tooltip="Number of cameras currently active.")
-        self.create_stat_card("Alerts Today", "5", stats_layout, 0, 2, color="#E74C3C", tooltip="Total alerts triggered today.")
-        self.create_stat_card("CPU Usage", "45%", stats_layout, 0, 3, color="#F39C12", tooltip="Current CPU usage percentage.")
+        self.total_cameras_label = self.create_stat_card("Total Cameras", "0", stats_layout, 0, 0, color="#3498DB")
+        self.active_cameras_label = self.create_stat_card("Active Cameras", "0", stats_layout, 0, 1, color="#2ECC71", tooltip="Number of cameras currently active.")
+        self.alerts_label = self.create_stat_card("Alerts Today", "0", stats_layout, 0, 2, color="#E74C3C", tooltip="Total alerts triggered today.")
+        self.cpu_label = self.create_stat_card("CPU Usage", "0%", stats_layout, 0, 3, color="#F39C12", tooltip="Current CPU usage percentage.")
+
+        self._alerts_date = QDate.currentDate()
+        self._alerts_baseline = 0
+        # Last event store count and what triggered it; the label shows it until a recount lands
+        self._alerts_since = None
+        self._alerts_count = 0
+        self._alerts_session_total = None
+        self._alerts_refreshed = None
+        self._alerts_worker = None
+        self._previous_counts = {}
+        self._previous_latency = {}
+        self._previous_time = time.monotonic()
 
         layout.addWidget(stats_widget)
 
-        # Memory usage chart
-        self.memory_chart = MemoryUsageChart()
-        layout.addWidget(self.memory_chart)
+        # Rolling charts
+        charts_layout = QHBoxLayout()
+        self.resource_chart = TimeSeriesChart("System", y_max=100, unit="%")
+        self.resource_chart.add_series("CPU", "#F39C12")
+        self.resource_chart.add_series("Memory", "#9B59B6")
+        self.fps_chart = TimeSeriesChart("Frames per second")
+        self.inference_chart = TimeSeriesChart("Inference latency", unit=" ms")
+        for chart in (self.resource_chart, self.fps_chart, self.inference_chart):
+            charts_layout.addWidget(chart)
+        layout.addLayout(charts_layout)
+
+        # Per-camera throughput and latency (milliseconds)
+        camera_group = QGroupBox("Cameras")
+        camera_layout = QVBoxLayout(camera_group)
+        self.camera_table = QTableWidget(0, 8)
+        self.camera_table.setHorizontalHeaderLabels(
+            ["Camera", "FPS", "Dropped", "Inference/s", "Alerts", "Latency p50", "p95", "p99"])
+        self.camera_table.verticalHeader().setVisible(False)
+        camera_layout.addWidget(self.camera_table)
+
+        # Resource usage per subsystem (capture threads, AI worker, GUI, ...)
+        resource_group = QGroupBox("Resources")
+        resource_layout = QVBoxLayout(resource_group)
+        self.process_label = QLabel("Process: -")
+        self.resource_table = QTableWidget(0, 2)
+        self.resource_table.setHorizontalHeaderLabels(["Subsystem", "CPU %"])
+        self.resource_table.verticalHeader().setVisible(False)
+        self.export_resources_btn = QPushButton("Export Resources")
+        self.export_resources_btn.clicked.connect(self.export_resources)
+        self.export_resources_btn.setEnabled(self.resource_monitor is not None)
+        resource_layout.addWidget(self.process_label)
+        resource_layout.addWidget(self.resource_table)
+        resource_layout.addWidget(self.export_resources_btn)
+
+        tables_layout = QHBoxLayout()
+        tables_layout.addWidget(camera_group, 2)
+        tables_layout.addWidget(resource_group, 1)
+        layout.addLayout(tables_layout)
 
         # Last updated time
         self.update_time_label = QLabel("Last Updated: Just Now")
@@ -69,10 +148,22 @@ class DashboardPage(QWidget):
         self.update_time_label.setStyleSheet("font-size: 14px; color: #3498DB;")
         layout.addWidget(self.update_time_label)
 
-        # Timers
+        # Timers (only run while the page is visible, see showEvent/hideEvent)
         self.timer = QTimer(self)
+        self.timer.setInterval(1000)
         self.timer.timeout.connect(self.update_dashboard)
-        self.timer.start(1000)
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        # Re-baseline rates so the first sample does not average over the hidden period
+        self._previous_counts = {}
+        self._previous_latency = {}
+        self.update_dashboard()
+        self.timer.start()
+
+    def hideEvent(self, event):
+        self.timer.stop()
+        super().hideEvent(event)
 
     def create_stat_card(self, title, value, layout, row, col, color=None, tooltip=None):
         card = QGroupBox()
@@ -96,6 +187,7 @@ class DashboardPage(QWidget):
         card_layout.addWidget(title_label)
         card_layout.addWidget(value_label)
         layout.addWidget(card, row, col)
+        return value_label
 
     def update_dashboard(self):
         # Cập nhật ngày và giờ
@@ -104,8 +196,152 @@ class DashboardPage(QWidget):
         self.date_label.setText(current_date.toString("dddd, MMMM d, yyyy"))
         self.time_label.setText(current_time.toString("hh:mm:ss AP"))
 
-        # Cập nhật biểu đồ bộ nhớ
-        self.memory_chart.plot()
+        self.update_stats()
 
         # Cập nhật thời gian cập nhật cuối cùng
         self.update_time_label.setText(f"Last Updated: {current_time.toString('hh:mm:ss')}")
+
+    @staticmethod
+    def per_camera(snapshot, name, **match):
+        """Sum a metric's series by camera label, keeping only series whose labels equal ``match``"""
+        totals = {}
+        for labels, value in snapshot.get(name, {}).items():
+            labels = dict(labels)
+            if any(labels.get(key) != value for key, value in match.items()):
+                continue
+            camera = labels.get("camera")
+            if camera is not None:
+                totals[camera] = totals.get(camera, 0) + value
+        return totals
+
+    def update_stats(self):
+        snapshot = registry.snapshot()
+        now = time.monotonic()
+
+        def scalar(name):
+            return sum(snapshot.get(name, {}).values())
+
+        self.total_cameras_label.setText(str(scalar("cameras_configured")))
+        self.active_cameras_label.setText(str(scalar("cameras_connected")))
+        cpu = scalar('system_cpu_percent')
+        self.cpu_label.setText(f"{cpu:.0f}%")
+        self.resource_chart.append({"CPU": cpu, "Memory": psutil.virtual_memory().percent})
+
+        # Only watchlist hits are alerts; plain detections are not
+        alerts = self.per_camera(snapshot, "detections_total", type=MATCH_EVENT_TYPE)
+        self.alerts_label.setText(str(self.alerts_today(sum(alerts.values()))))
+
+        counts = {
+            "frames": self.per_camera(snapshot, "camera_frames_total"),
+            "inference": self.per_camera(snapshot, "ai_frames_processed_total"),
+        }
+        elapsed = now - self._previous_time
+        has_baseline = bool(self._previous_counts)
+        fps = rates(self._previous_counts.get("frames", {}), counts["frames"], elapsed)
+        inference = rates(self._previous_counts.get("inference", {}), counts["inference"], elapsed)
+        self._previous_counts = counts
+        self._previous_time = now
+
+        ai_dropped = self.per_camera(snapshot, "ai_frames_dropped_total")
+        display_dropped = self.per_camera(snapshot, "display_frames_dropped_total")
+        latency = {str(camera_id): spans for camera_id, spans in latency_tracker.snapshot().items()}
+
+        # Mean inference time over the last interval, from histogram count/sum deltas
+        interval_latency = {}
+        for camera, spans in latency.items():
+            span = spans.get("inference")
+            if not span:
+                continue
+            count, total = span["count"], span["mean"] * span["count"]
+            previous_count, previous_total = self._previous_latency.get(camera, (count, total))
+            if count > previous_count:
+                interval_latency[f"Camera {camera}"] = (total - previous_total) / (count - previous_count)
+            self._previous_latency[camera] = (count, total)
+
+        if has_baseline:
+            self.fps_chart.append({f"Camera {camera}": value for camera, value in fps.items()})
+            self.inference_chart.append(interval_latency)
+
+        self.update_resources(snapshot)
+
+        cameras = sorted(set(counts["frames"]) | set(alerts), key=lambda camera: (len(camera), camera))
+        self.camera_table.setRowCount(len(cameras))
+        for row, camera in enumerate(cameras):
+            glass = latency.get(camera, {}).get("glass_to_glass", {})
+            values = [
+                f"Camera {camera}",
+                f"{fps.get(camera, 0.0):.1f}",
+                str(ai_dropped.get(camera, 0) + display_dropped.get(camera, 0)),
+                f"{inference.get(camera, 0.0):.1f}",
+                str(alerts.get(camera, 0)),
+                f"{glass.get('p50', 0):.0f}",
+                f"{glass.get('p95', 0):.0f}",
+                f"{glass.get('p99', 0):.0f}",
+            ]
+            for col, value in enumerate(values):
+                self.camera_table.setItem(row, col, QTableWidgetItem(value))
+
+    def alerts_today(self, session_total):
+        """Watchlist matches since local midnight: the cached event store count when there is a
+        store, otherwise matches counted by this session since the date last changed"""
+        if QDate.currentDate() != self._alerts_date:
+            self._alerts_date = QDate.currentDate()
+            self._alerts_baseline = session_total
+            self._alerts_since = None
+            self._alerts_count = 0
+            self._alerts_refreshed = None
+        if self.event_store is None:
+            return session_total - self._alerts_baseline
+
+        # Recount on a new match, a new day, or periodically for matches recorded by another process
+        now = time.monotonic()
+        stale = self._alerts_refreshed is None or now - self._alerts_refreshed >= ALERTS_REFRESH_SECONDS
+        if (stale or session_total != self._alerts_session_total) and self._alerts_worker is None:
+            midnight = datetime.datetime.combine(datetime.date.today(), datetime.time.min)
+            self._alerts_since = time.mktime(midnight.timetuple())
+            self._alerts_worker = AlertCountWorker(self.event_store, self._alerts_since, self)
+            self._alerts_worker.counted.connect(self.on_alerts_counted)
+            self._alerts_worker.finished.connect(self.on_alerts_worker_finished)
+            self._alerts_worker.start()
+            self._alerts_session_total = session_total
+            self._alerts_refreshed = now
+        return self._alerts_count
+
+    def on_alerts_counted(self, since, count):
+        if since != self._alerts_since:
+            return  # counted from before the date changed
+        self._alerts_count = count
+        self.alerts_label.setText(str(count))
+
+    def on_alerts_worker_finished(self):
+        self._alerts_worker = None
+
+    def shutdown(self):
+        """Wait for an in-flight alert count before the event store closes"""
+        self.timer.stop()
+        if self._alerts_worker is not None:
+            self._alerts_worker.wait()
+
+    def update_resources(self, snapshot):
+        rss = sum(snapshot.get("process_rss_bytes", {}).values())
+        threads = sum(snapshot.get("process_threads", {}).values())
+        cpu = sum(snapshot.get("process_cpu_percent", {}).values())
+        self.process_label.setText(f"Process: {cpu:.0f}% CPU, {rss / (1024 ** 2):.0f} MB RSS, {threads} threads")
+        rows = sorted(((dict(labels).get("subsystem", ""), value)
+                       for labels, value in snapshot.get("subsystem_cpu_percent", {}).items()),
+                      key=lambda row: row[1], reverse=True)
+        for labels, value in snapshot.get("child_process_cpu_percent", {}).items():
+            rows.append((dict(labels).get("process", ""), value))
+        self.resource_table.setRowCount(len(rows))
+        for row, (name, value) in enumerate(rows):
+            self.resource_table.setItem(row, 0, QTableWidgetItem(name))
+            self.resource_table.setItem(row, 1, QTableWidgetItem(f"{value:.1f}"))
+
+    def export_resources(self):
+        path, _ = QFileDialog.getSaveFileName(self, "Export Resources", "resources.json", "JSON Files (*.json)")
+        if not path:
+            return
+        try:
+            self.resource_monitor.export_json(path)
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Failed to export resources: {str(e)}")
@@ -1,18 +1,29 @@
+import logging
+import time
 from PyQt5.QtWidgets import QMainWindow, QWidget, QHBoxLayout, QVBoxLayout, QPushButton, QStackedWidget
-from PyQt5.QtCore import Qt
-from .dashboard_page import DashboardPage
-from .camera_page import CameraPage
-from .ai_control_page import AIControlPage
-from .reports_page import ReportsPage
+from PyQt5.QtCore import Qt, QTimer
 from .styles import ModernStyle
-from .settings import SettingsPage
+from .thumbnail_cache import ThumbnailCache
+from core.resources import ResourceMonitor, register_current_thread
+from core.service import CameraService
+from utils import startup
+
+logger = logging.getLogger(__name__)
 
 class ModernCameraAISystem(QMainWindow):
-    def __init__(self):
+    def __init__(self, service=None):
         super().__init__()
         self.setWindowTitle("Modern Camera AI System")
         self.setGeometry(100, 100, 1400, 800)
         self.setStyleSheet(ModernStyle.get_stylesheet())
+        register_current_thread("gui")
+        self.resource_monitor = ResourceMonitor(parent=self)
+        self.resource_monitor.start()
+        # An injected service is one attached to another process (see core.remote)
+        self.service = service or CameraService(parent=self)
+        self.event_store = self.service.event_store
+        self.thumbnail_cache = ThumbnailCache(self.service.thumbnail_store)
+        startup.mark("core services started")
         self.init_ui()
 
     def init_ui(self):
@@ -38,29 +49,81 @@ class ModernCameraAISystem(QMainWindow):
         nav_layout.addWidget(self.settings_btn)
         nav_layout.addStretch()
 
-        # Stacked widget for different pages
+        # Pages are built on first navigation; only the dashboard is needed to show the window
         self.stacked_widget = QStackedWidget()
-        self.dashboard_page = DashboardPage()
-        self.camera_page = CameraPage()
-        self.ai_control_page = AIControlPage()
-        self.reports_page = ReportsPage()
-        self.settings_page = SettingsPage()
-        
-        self.stacked_widget.addWidget(self.dashboard_page)
-        self.stacked_widget.addWidget(self.camera_page)
-        self.stacked_widget.addWidget(self.ai_control_page)
-        self.stacked_widget.addWidget(self.reports_page)
-        self.stacked_widget.addWidget(self.settings_page)
-        
+        self.pages = {}
+        self.page_factories = {
+            "dashboard": self.create_dashboard_page,
+            "cameras": self.create_camera_page,
+            "ai_control": self.create_ai_control_page,
+            "reports": self.create_reports_page,
+            "settings": self.create_settings_page,
+        }
 
         # Connect navigation buttons
-        self.dashboard_btn.clicked.connect(lambda: self.stacked_widget.setCurrentWidget(self.dashboard_page))
-        self.cameras_btn.clicked.connect(lambda: self.stacked_widget.setCurrentWidget(self.camera_page))
-        self.ai_control_btn.clicked.connect(lambda: self.stacked_widget.setCurrentWidget(self.ai_control_page))
-        self.reports_btn.clicked.connect(lambda: self.stacked_widget.setCurrentWidget(self.reports_page))
-        self.settings_btn.clicked.connect(lambda: self.stacked_widget.setCurrentWidget(self.settings_page))
+        self.dashboard_btn.clicked.connect(lambda: self.show_page("dashboard"))
+        self.cameras_btn.clicked.connect(lambda: self.show_page("cameras"))
+        self.ai_control_btn.clicked.connect(lambda: self.show_page("ai_control"))
+        self.reports_btn.clicked.connect(lambda: self.show_page("reports"))
+        self.settings_btn.clicked.connect(lambda: self.show_page("settings"))
 
         main_layout.addWidget(nav_bar)
         main_layout.addWidget(self.stacked_widget)
 
-        self.stacked_widget.setCurrentWidget(self.dashboard_page)
\ No newline at end of file
+        self.show_page("dashboard")
+        # The camera page owns capture and AI (and may auto-connect), so it is
+        # built as soon as the event loop runs rather than on first visit
+        QTimer.singleShot(0, self.build_background_pages)
+
+    def create_dashboard_page(self):
+        from .dashboard_page import DashboardPage
+        return DashboardPage(resource_monitor=self.resource_monitor, event_store=self.event_store)
+
+    def create_camera_page(self):
+        from .camera_page import CameraPage
+        return CameraPage(service=self.service, thumbnail_cache=self.thumbnail_cache)
+
+    def create_ai_control_page(self):
+        from .ai_control_page import AIControlPage
+        return AIControlPage()
+
+    def create_reports_page(self):
+        from .reports_page import ReportsPage
+        from core.report_generator import ReportGenerator
+        return ReportsPage(report_generator=ReportGenerator(self.event_store),
+                           thumbnail_cache=self.thumbnail_cache)
+
+    def create_settings_page(self):
+        from .settings import SettingsPage
+        return SettingsPage()
+
+    def page(self, name):
+        """Return page ``name``, building it (and importing its module) on first use"""
+        page = self.pages.get(name)
+        if page is None:
+            started = time.perf_counter()
+            page = self.page_factories[name]()
+            self.pages[name] = page
+            self.stacked_widget.addWidget(page)
+            logger.info(f"Built {name} page in {(time.perf_counter() - started) * 1000:.0f} ms")
+        return page
+
+    def show_page(self, name):
+        self.stacked_widget.setCurrentWidget(self.page(name))
+
+    def build_background_pages(self):
+        startup.mark("window shown")
+        self.page("cameras")
+        startup.mark("camera page built")
+        startup.report()
+
+    def closeEvent(self, event):
+        # Pages are children of the stacked widget and never get their own closeEvent
+        for name in ("dashboard", "cameras", "reports"):
+            if name in self.pages:
+                self.pages[name].shutdown()
+        self.thumbnail_cache.shutdown()
+        self.service.shutdown()
+        self.resource_monitor.stop()
+        self.resource_monitor.wait()
+        super().closeEvent(event)
@@ -1,28 +1,256 @@
-from PyQt5.QtWidgets import QWidget, QVBoxLayout, QDateEdit, QPushButton, QTableWidget
-from PyQt5.QtWidgets import QMainWindow, QWidget, QHBoxLayout, QVBoxLayout, QPushButton, QLabel
+import logging
+from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QDateEdit, QPushButton, QLabel,
+                             QTableView, QHeaderView, QMessageBox, QComboBox, QProgressBar, QFileDialog)
+from PyQt5.QtCore import Qt, QDate, QSize, QThread, QAbstractTableModel, QModelIndex, pyqtSignal
+from core.report_generator import format_row, ReportExporter
+
+logger = logging.getLogger(__name__)
+
+class ReportTableModel(QAbstractTableModel):
+    """Table model that pulls report rows from a ReportCursor as the view scrolls"""
+
+    HEADERS = ["Date", "Camera", "Event", "Details"]
+    PAGE_SIZE = 200
+    THUMBNAIL_COLUMN = 3
+
+    def __init__(self, parent=None, thumbnail_cache=None):
+        super().__init__(parent)
+        self.thumbnail_cache = thumbnail_cache
+        self._rows = []
+        self._thumbnails = []
+        self._cursor = None
+        if thumbnail_cache is not None:
+            thumbnail_cache.thumbnail_loaded.connect(self.on_thumbnail_loaded)
+
+    def set_cursor(self, cursor):
+        self.beginResetModel()
+        self._rows = []
+        self._thumbnails = []
+        self._cursor = cursor
+        self.endResetModel()
+        if self.canFetchMore(QModelIndex()):
+            self.fetchMore(QModelIndex())
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        if role == Qt.DisplayRole:
+            return self._rows[index.row()][index.column()]
+        if role == Qt.DecorationRole and index.column() == self.THUMBNAIL_COLUMN and self.thumbnail_cache:
+            # Loaded on demand, so only rows scrolled into view cost a pixmap
+            return self.thumbnail_cache.get(self._thumbnails[index.row()])
+        return None
+
+    def on_thumbnail_loaded(self, key):
+        for row, thumbnail in enumerate(self._thumbnails):
+            if thumbnail == key:
+                index = self.index(row, self.THUMBNAIL_COLUMN)
+                self.dataChanged.emit(index, index, [Qt.DecorationRole])
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.HEADERS[section]
+        return None
+
+    def canFetchMore(self, parent):
+        return not parent.isValid() and self._cursor is not None and not self._cursor.exhausted
+
+    def fetchMore(self, parent):
+        try:
+            rows = self._cursor.fetch(self.PAGE_SIZE)
+        except Exception as e:
+            logger.error(f"Failed to fetch report rows: {str(e)}")
+            self._cursor.exhausted = True
+            return
+        if not rows:
+            return
+        self.beginInsertRows(QModelIndex(), len(self._rows), len(self._rows) + len(rows) - 1)
+        self._rows.extend(format_row(row) for row in rows)
+        self._thumbnails.extend(row[7] for row in rows)
+        self.endInsertRows()
+
+
+class ReportSummaryWorker(QThread):
+    """Computes report aggregates off the GUI thread"""
+    summary_ready = pyqtSignal(object)
+
+    def __init__(self, report_generator, start, end, parent=None):
+        super().__init__(parent)
+        self.report_generator = report_generator
+        self.start_date = start
+        self.end_date = end
+
+    def run(self):
+        try:
+            self.summary_ready.emit(self.report_generator.summary(self.start_date, self.end_date))
+        except Exception as e:
+            logger.error(f"Failed to summarize report: {str(e)}")
+
 
 class ReportsPage(QWidget):
-    def __init__(self, parent=None):
+    def __init__(self, parent=None, report_generator=None, thumbnail_cache=None):
         super().__init__(parent)
+        self.report_generator = report_generator
+        self.thumbnail_cache = thumbnail_cache
+        self.summary_worker = None
+        # Superseded workers keep running until their query returns; shutdown waits for all of them
+        self.summary_workers = set()
+        self.exporter = None
         self.init_ui()
 
     def init_ui(self):
         layout = QVBoxLayout(self)
-        
+
         date_widget = QWidget()
         date_layout = QHBoxLayout(date_widget)
-        self.start_date = QDateEdit()
-        self.end_date = QDateEdit()
+        self.start_date = QDateEdit(QDate.currentDate().addDays(-7))
+        self.end_date = QDateEdit(QDate.currentDate())
+        for date_edit in (self.start_date, self.end_date):
+            date_edit.setCalendarPopup(True)
         self.generate_btn = QPushButton("Generate Report")
-        
+        self.generate_btn.clicked.connect(self.generate_report)
+        self.generate_btn.setEnabled(self.report_generator is not None)
+
         date_layout.addWidget(QLabel("From:"))
         date_layout.addWidget(self.start_date)
         date_layout.addWidget(QLabel("To:"))
         date_layout.addWidget(self.end_date)
         date_layout.addWidget(self.generate_btn)
-        
+
+        self.export_format = QComboBox()
+        for label, fmt in (("CSV", "csv"), ("Parquet", "parquet"), ("PDF", "pdf")):
+            self.export_format.addItem(label, fmt)
+        self.export_btn = QPushButton("Export...")
+        self.export_btn.clicked.connect(self.export_report)
+        self.export_btn.setEnabled(self.report_generator is not None)
+        date_layout.addWidget(self.export_format)
+        date_layout.addWidget(self.export_btn)
+
         layout.addWidget(date_widget)
-        
-        self.report_table = QTableWidget(0, 4)
-        self.report_table.setHorizontalHeaderLabels(["Date", "Camera", "Event", "Details"])
-        layout.addWidget(self.report_table)
\ No newline at end of file
+
+        export_widget = QWidget()
+        export_layout = QHBoxLayout(export_widget)
+        export_layout.setContentsMargins(0, 0, 0, 0)
+        self.export_progress = QProgressBar()
+        self.cancel_export_btn = QPushButton("Cancel")
+        self.cancel_export_btn.clicked.connect(self.cancel_export)
+        export_layout.addWidget(self.export_progress)
+        export_layout.addWidget(self.cancel_export_btn)
+        export_widget.setVisible(False)
+        self.export_widget = export_widget
+        layout.addWidget(export_widget)
+
+        self.summary_label = QLabel("")
+        self.summary_label.setWordWrap(True)
+        layout.addWidget(self.summary_label)
+
+        self.report_model = ReportTableModel(self, thumbnail_cache=self.thumbnail_cache)
+        self.report_table = QTableView()
+        self.report_table.setModel(self.report_model)
+        if self.thumbnail_cache is not None:
+            self.report_table.setIconSize(QSize(48, 48))
+            self.report_table.verticalHeader().setDefaultSectionSize(52)
+        self.report_table.verticalHeader().setVisible(False)
+        self.report_table.horizontalHeader().setSectionResizeMode(QHeaderView.Interactive)
+        self.report_table.horizontalHeader().setStretchLastSection(True)
+        layout.addWidget(self.report_table)
+
+    def selected_range(self):
+        start = self.start_date.date().toPyDate()
+        end = self.end_date.date().toPyDate()
+        if start > end:
+            QMessageBox.warning(self, "Warning", "Start date must not be after end date.")
+            return None
+        return start, end
+
+    def generate_report(self):
+        date_range = self.selected_range()
+        if date_range is None:
+            return
+        start, end = date_range
+        try:
+            self.report_model.set_cursor(self.report_generator.cursor(start, end))
+        except Exception as e:
+            logger.error(f"Failed to generate report: {str(e)}")
+            QMessageBox.critical(self, "Error", f"Failed to generate report: {str(e)}")
+            return
+
+        self.summary_label.setText("Counting events...")
+        worker = ReportSummaryWorker(self.report_generator, start, end, self)
+        worker.summary_ready.connect(lambda summary, w=worker: self.show_summary(summary, w))
+        worker.finished.connect(lambda w=worker: self.summary_done(w))
+        self.summary_worker = worker
+        self.summary_workers.add(worker)
+        worker.start()
+
+    def summary_done(self, worker):
+        self.summary_workers.discard(worker)
+        worker.deleteLater()
+
+    def show_summary(self, summary, worker):
+        if worker is not self.summary_worker:
+            return  # a newer report was requested meanwhile
+        by_type = ", ".join(f"{event_type}: {count}" for event_type, count in
+                            sorted(summary["by_type"].items(), key=lambda item: -item[1]))
+        text = f"{summary['total']} events from {len(summary['by_camera'])} camera(s)"
+        self.summary_label.setText(f"{text} — {by_type}" if by_type else text)
+
+    def export_report(self):
+        if self.exporter is not None:
+            return
+        date_range = self.selected_range()
+        if date_range is None:
+            return
+        fmt = self.export_format.currentData()
+        path, _ = QFileDialog.getSaveFileName(
+            self, "Export Report", f"report_{date_range[0]}_{date_range[1]}.{fmt}",
+            f"{self.export_format.currentText()} (*.{fmt})")
+        if not path:
+            return
+
+        exporter = ReportExporter(self.report_generator, *date_range, path, fmt, self)
+        exporter.progress.connect(self.update_export_progress)
+        exporter.export_finished.connect(self.export_finished)
+        exporter.export_failed.connect(self.export_failed)
+        exporter.finished.connect(self.export_done)
+        self.exporter = exporter
+        self.export_progress.setRange(0, 0)
+        self.export_widget.setVisible(True)
+        self.export_btn.setEnabled(False)
+        exporter.start()
+
+    def update_export_progress(self, done, total):
+        self.export_progress.setRange(0, max(total, 1))
+        self.export_progress.setValue(min(done, total))
+
+    def cancel_export(self):
+        if self.exporter is not None:
+            self.cancel_export_btn.setEnabled(False)
+            self.exporter.cancel()
+
+    def export_finished(self, path, count):
+        QMessageBox.information(self, "Export", f"Exported {count} events to {path}")
+
+    def export_failed(self, message):
+        QMessageBox.critical(self, "Error", f"Failed to export report: {message}")
+
+    def export_done(self):
+        self.exporter.deleteLater()
+        self.exporter = None
+        self.export_widget.setVisible(False)
+        self.cancel_export_btn.setEnabled(True)
+        self.export_btn.setEnabled(True)
+
+    def shutdown(self):
+        if self.exporter is not None:
+            self.exporter.cancel()
+        for worker in list(self.summary_workers):
+            worker.wait()
+        if self.exporter is not None:
+            self.exporter.wait()
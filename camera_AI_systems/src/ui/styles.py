@@ -32,7 +32,7 @@ class ModernStyle:
             margin-top: 1em;
             padding-top: 1em;
         }
-        QListWidget, QTextEdit, QTableWidget {
+        QListWidget, QTextEdit, QTableWidget, QTableView {
             background-color: #2d2d2d;
             border: none;
             border-radius: 4px;
@@ -0,0 +1,124 @@
+import logging
+import queue
+from collections import OrderedDict
+from PyQt5.QtCore import QObject, QThread, pyqtSignal
+from PyQt5.QtGui import QColor, QImage, QPixmap
+from core.thumbnail_store import THUMBNAIL_SIZE
+
+logger = logging.getLogger(__name__)
+
+CACHE_CAPACITY = 256
+# Shown while a thumbnail is read from disk
+PLACEHOLDER_COLOR = "#ECF0F1"
+
+
+class ThumbnailLoader(QThread):
+    """Reads thumbnails from disk into QImages off the GUI thread.
+
+    Requests are served newest first, so the rows currently scrolled into
+    view load before ones the user has already scrolled past.
+    """
+    image_loaded = pyqtSignal(str, object)
+
+    def __init__(self, thumbnail_store, parent=None):
+        super().__init__(parent)
+        self.thumbnail_store = thumbnail_store
+        self._requests = queue.LifoQueue()
+        self._running = True
+
+    def request(self, key):
+        self._requests.put(key)
+
+    def run(self):
+        while self._running:
+            try:
+                key = self._requests.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            image = None
+            try:
+                if self.thumbnail_store.exists(key):
+                    image = QImage(self.thumbnail_store.path(key))
+            except (OSError, ValueError) as e:
+                logger.error(f"Failed to load thumbnail {key}: {str(e)}")
+            self.image_loaded.emit(key, image)
+
+    def stop(self):
+        self._running = False
+
+
+class ThumbnailCache(QObject):
+    """LRU of decoded thumbnails keyed by ThumbnailStore key.
+
+    Only the most recently shown crops stay in memory. A miss returns a
+    placeholder and queues the file for a background load; once it is in
+    the cache ``thumbnail_loaded`` fires so models can repaint the rows
+    showing that key.
+    """
+    thumbnail_loaded = pyqtSignal(str)
+
+    def __init__(self, thumbnail_store, capacity=CACHE_CAPACITY, parent=None):
+        super().__init__(parent)
+        self.thumbnail_store = thumbnail_store
+        self.capacity = capacity
+        self._pixmaps = OrderedDict()
+        self._pending = set()
+        self._placeholder = None
+        self._loader = None
+
+    def insert(self, key, image):
+        """Store a QImage or QPixmap at the thumbnail store's size, as ``get`` would load it.
+
+        QImages may come from any thread; they become pixmaps on the GUI
+        thread the first time ``get`` returns them.
+        """
+        if not key or image.isNull():
+            return
+        self._pixmaps[key] = image
+        self._pixmaps.move_to_end(key)
+        while len(self._pixmaps) > self.capacity:
+            self._pixmaps.popitem(last=False)
+
+    def get(self, key):
+        """Return the QPixmap for ``key``, a placeholder while it loads, or None without a key"""
+        if not key:
+            return None
+        pixmap = self._pixmaps.get(key)
+        if pixmap is not None:
+            if isinstance(pixmap, QImage):
+                pixmap = QPixmap.fromImage(pixmap)
+                self._pixmaps[key] = pixmap
+            self._pixmaps.move_to_end(key)
+            return pixmap
+        if key not in self._pending:
+            self._pending.add(key)
+            self.loader().request(key)
+        return self.placeholder()
+
+    def placeholder(self):
+        # Built on first use: pixmaps need the QApplication
+        if self._placeholder is None:
+            self._placeholder = QPixmap(THUMBNAIL_SIZE, THUMBNAIL_SIZE)
+            self._placeholder.fill(QColor(PLACEHOLDER_COLOR))
+        return self._placeholder
+
+    def loader(self):
+        if self._loader is None:
+            self._loader = ThumbnailLoader(self.thumbnail_store)
+            self._loader.image_loaded.connect(self.on_image_loaded)
+            self._loader.start()
+        return self._loader
+
+    def on_image_loaded(self, key, image):
+        # GUI thread (queued from the loader)
+        self._pending.discard(key)
+        if image is None or image.isNull():
+            # Misses are not cached: the writer may still have it queued
+            return
+        self.insert(key, image)
+        self.thumbnail_loaded.emit(key)
+
+    def shutdown(self):
+        if self._loader is not None:
+            self._loader.stop()
+            self._loader.wait()
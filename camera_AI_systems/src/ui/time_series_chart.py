@@ -0,0 +1,153 @@
+import math
+from array import array
+from PyQt5.QtWidgets import QWidget
+from PyQt5.QtCore import Qt, QPointF, QRectF
+from PyQt5.QtGui import QPainter, QPen, QColor, QPixmap, QPolygonF, QFont
+
+PALETTE = ["#3498DB", "#2ECC71", "#E74C3C", "#F39C12", "#9B59B6", "#1ABC9C", "#E67E22", "#ECF0F1"]
+
+
+class RingBuffer:
+    """Fixed-capacity float buffer; the oldest value is overwritten when full"""
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self._data = array('d', [math.nan] * capacity)
+        self._next = 0
+        self._size = 0
+
+    def append(self, value):
+        self._data[self._next] = value
+        self._next = (self._next + 1) % self.capacity
+        self._size = min(self._size + 1, self.capacity)
+
+    def __len__(self):
+        return self._size
+
+    def values(self):
+        """Values from oldest to newest"""
+        if self._size < self.capacity:
+            return self._data[:self._size]
+        return self._data[self._next:] + self._data[:self._next]
+
+    def last(self):
+        if not self._size:
+            return math.nan
+        return self._data[self._next - 1]
+
+
+class TimeSeriesChart(QWidget):
+    """Rolling line chart painted with QPainter.
+
+    Each sample appends to a preallocated ring buffer per series and
+    schedules a repaint; grid and labels are cached in a pixmap that is only
+    rebuilt on resize or when the y-range changes. Qt skips painting while
+    the widget is hidden, so an off-screen chart costs only the appends.
+    """
+
+    MARGIN_LEFT = 40
+    MARGIN = 8
+
+    def __init__(self, title, capacity=120, y_max=None, unit="", parent=None):
+        super().__init__(parent)
+        self.title = title
+        self.capacity = capacity
+        self.fixed_y_max = y_max
+        self.unit = unit
+        self.series = {}
+        self._colors = {}
+        self._background = None
+        self._background_y_max = None
+        self.setMinimumHeight(160)
+
+    def add_series(self, name, color=None):
+        if name not in self.series:
+            self.series[name] = RingBuffer(self.capacity)
+            self._colors[name] = QColor(color or PALETTE[len(self._colors) % len(PALETTE)])
+        return self.series[name]
+
+    def remove_series(self, name):
+        self.series.pop(name, None)
+        self._colors.pop(name, None)
+
+    def append(self, samples):
+        """Append one sample per series from ``{name: value}``; missing series get a gap"""
+        for name in samples:
+            self.add_series(name)
+        for name, buffer in self.series.items():
+            buffer.append(samples.get(name, math.nan))
+        self.update()
+
+    def y_max(self):
+        if self.fixed_y_max is not None:
+            return self.fixed_y_max
+        peak = max((value for buffer in self.series.values() for value in buffer.values()
+                    if not math.isnan(value)), default=0.0)
+        # Round up to a 1/2/5 step so the grid does not rescale on every sample
+        if peak <= 0:
+            return 1.0
+        magnitude = 10 ** math.floor(math.log10(peak))
+        for step in (1, 2, 5, 10):
+            if peak <= step * magnitude:
+                return step * magnitude
+        return 10 * magnitude
+
+    def plot_rect(self):
+        return QRectF(self.MARGIN_LEFT, self.MARGIN + 16,
+                      max(1, self.width() - self.MARGIN_LEFT - self.MARGIN),
+                      max(1, self.height() - 2 * self.MARGIN - 16))
+
+    def resizeEvent(self, event):
+        self._background = None
+        super().resizeEvent(event)
+
+    def _render_background(self, y_max):
+        pixmap = QPixmap(self.size())
+        pixmap.fill(QColor("#2d2d2d"))
+        painter = QPainter(pixmap)
+        rect = self.plot_rect()
+        painter.setPen(QColor("#ffffff"))
+        painter.setFont(QFont(self.font().family(), 9, QFont.Bold))
+        painter.drawText(QRectF(self.MARGIN, 2, self.width(), 18), Qt.AlignLeft | Qt.AlignVCenter, self.title)
+        painter.setFont(QFont(self.font().family(), 8))
+        for i in range(5):
+            y = rect.bottom() - rect.height() * i / 4
+            painter.setPen(QPen(QColor("#404040"), 1))
+            painter.drawLine(QPointF(rect.left(), y), QPointF(rect.right(), y))
+            painter.setPen(QColor("#A0A0A0"))
+            painter.drawText(QRectF(0, y - 8, self.MARGIN_LEFT - 4, 16), Qt.AlignRight | Qt.AlignVCenter,
+                             f"{y_max * i / 4:g}{self.unit}")
+        painter.end()
+        self._background = pixmap
+        self._background_y_max = y_max
+
+    def paintEvent(self, event):
+        y_max = self.y_max()
+        if self._background is None or self._background_y_max != y_max:
+            self._render_background(y_max)
+        painter = QPainter(self)
+        painter.drawPixmap(0, 0, self._background)
+        painter.setRenderHint(QPainter.Antialiasing)
+        rect = self.plot_rect()
+        step = rect.width() / max(1, self.capacity - 1)
+        legend_x = rect.right()
+        for name, buffer in self.series.items():
+            values = buffer.values()
+            offset = self.capacity - len(values)
+            painter.setPen(QPen(self._colors[name], 1.5))
+            segment = QPolygonF()
+            for i, value in enumerate(values):
+                if math.isnan(value):
+                    if segment.size() > 1:
+                        painter.drawPolyline(segment)
+                    segment = QPolygonF()
+                    continue
+                y = rect.bottom() - rect.height() * min(value, y_max) / y_max
+                segment.append(QPointF(rect.left() + (offset + i) * step, y))
+            if segment.size() > 1:
+                painter.drawPolyline(segment)
+            label = f"{name}: {buffer.last():.1f}{self.unit}" if not math.isnan(buffer.last()) else name
+            width = painter.fontMetrics().horizontalAdvance(label) + 10
+            legend_x -= width
+            painter.drawText(QRectF(legend_x, 2, width, 18), Qt.AlignRight | Qt.AlignVCenter, label)
+        painter.end()
@@ -0,0 +1,143 @@
+import json
+import logging
+import os
+import tempfile
+import threading
+
+from .helpers import app_data_dir
+
+logger = logging.getLogger(__name__)
+
+CONFIG_FILE = "camera_config.json"
+# Older versions wrote the config into whatever directory the app was started from
+LEGACY_CONFIG_PATH = CONFIG_FILE
+SAVE_DELAY = 0.5
+DEFAULT_LAYOUT = "2x2"
+# A configuration that cannot be parsed is moved aside to this name, not overwritten
+BAD_CONFIG_SUFFIX = ".bad"
+
+
+def config_path():
+    return os.path.join(app_data_dir(), CONFIG_FILE)
+
+
+def atomic_write_json(path, data):
+    """Write ``data`` as JSON so that ``path`` always holds either the old or the new file.
+
+    The JSON goes to a temporary file in the same directory, is fsynced, and
+    then renamed over ``path``; a crash mid-write leaves the previous file intact.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, temp_path = tempfile.mkstemp(prefix=".", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+    if hasattr(os, "O_DIRECTORY"):
+        dir_fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+
+
+def load_config(path=None):
+    """Read the camera configuration.
+
+    Returns ``{"cameras": {id: {"info": {...}}}, "ai_modes": {id: mode},
+    "layout": str, "auto_connect": bool, "previews": bool}`` with integer camera ids (JSON
+    object keys come back as strings), or the defaults when no configuration
+    has been saved yet. A corrupt file is renamed to ``<file>.bad`` and the
+    defaults are returned, so a bad save cannot stop the service starting.
+    """
+    candidates = [path] if path else [config_path(), LEGACY_CONFIG_PATH]
+    for candidate in candidates:
+        try:
+            with open(candidate, 'r', encoding='utf-8') as f:
+                raw = json.load(f)
+            config = {
+                "cameras": {int(camera_id): {"info": camera["info"]}
+                            for camera_id, camera in raw.get("cameras", {}).items()},
+                "ai_modes": {int(camera_id): mode for camera_id, mode in raw.get("ai_modes", {}).items()},
+                "layout": raw.get("layout", DEFAULT_LAYOUT),
+                "auto_connect": raw.get("auto_connect", False),
+                "previews": raw.get("previews", False),
+            }
+        except FileNotFoundError:
+            continue
+        except (ValueError, KeyError, TypeError, AttributeError) as e:
+            bad_path = candidate + BAD_CONFIG_SUFFIX
+            logger.error(f"Invalid camera configuration, moving it to {os.path.abspath(bad_path)} "
+                         f"and starting with defaults: {str(e)}")
+            try:
+                os.replace(candidate, bad_path)
+            except OSError as e:
+                logger.error(f"Failed to move the invalid camera configuration aside: {str(e)}")
+            break
+        except OSError as e:
+            logger.error(f"Failed to read camera configuration {os.path.abspath(candidate)}: {str(e)}")
+            break
+        if candidate == LEGACY_CONFIG_PATH:
+            # Write the new file right away, so the legacy one is read only this once
+            logger.info(f"Migrating camera configuration from {os.path.abspath(candidate)}")
+            try:
+                atomic_write_json(config_path(), config)
+            except (OSError, TypeError, ValueError) as e:
+                logger.error(f"Failed to migrate camera configuration: {str(e)}")
+        return config
+    return {"cameras": {}, "ai_modes": {}, "layout": DEFAULT_LAYOUT, "auto_connect": False, "previews": False}
+
+
+class ConfigStore:
+    """Debounced, atomic persistence of the camera configuration.
+
+    ``save`` only records the latest configuration and arms a timer; every
+    change made within ``delay`` seconds of the first one is written in a
+    single atomic rewrite. Call ``flush`` on shutdown to write immediately.
+    """
+
+    def __init__(self, path=None, delay=SAVE_DELAY):
+        self.path = path or config_path()
+        self.delay = delay
+        self._pending = None
+        self._timer = None
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+
+    def load(self):
+        # Only the default location falls back to the legacy working-directory file
+        return load_config(None if self.path == config_path() else self.path)
+
+    def save(self, config):
+        """Schedule ``config`` to be written; it must not be mutated afterwards"""
+        with self._lock:
+            self._pending = config
+            if self._timer is None:
+                self._timer = threading.Timer(self.delay, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def flush(self):
+        """Write the pending configuration now, if there is one"""
+        # Writes are serialized so an older snapshot can never land after a newer one
+        with self._write_lock:
+            with self._lock:
+                config, self._pending = self._pending, None
+                timer, self._timer = self._timer, None
+            if timer is not None:
+                timer.cancel()
+            if config is None:
+                return
+            try:
+                atomic_write_json(self.path, config)
+                logger.info("Camera configuration saved successfully")
+            except (OSError, TypeError, ValueError) as e:
+                logger.error(f"Failed to save camera configuration: {str(e)}")
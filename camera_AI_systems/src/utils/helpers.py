@@ -0,0 +1,15 @@
+import os
+
+APP_HOME_ENV = "CAMERA_AI_HOME"
+
+
+def app_data_dir(*parts):
+    """Return (and create) a directory under the application data root.
+
+    The root is ``$CAMERA_AI_HOME`` if set, otherwise ``~/.camera_ai``, so
+    files no longer depend on the working directory the app was started from.
+    """
+    root = os.environ.get(APP_HOME_ENV) or os.path.join(os.path.expanduser("~"), ".camera_ai")
+    path = os.path.join(root, *parts)
+    os.makedirs(path, exist_ok=True)
+    return path
@@ -0,0 +1,28 @@
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+# Taken when this module is first imported; main.py imports it before anything else
+_start = time.perf_counter()
+_marks = []
+
+
+def mark(phase):
+    """Record that startup ``phase`` has finished"""
+    _marks.append((phase, time.perf_counter() - _start))
+
+
+def marks():
+    """``[(phase, seconds since start)]`` in the order they were recorded"""
+    return list(_marks)
+
+
+def report():
+    """Log how long each startup phase took"""
+    lines = []
+    previous = 0.0
+    for phase, at in _marks:
+        lines.append(f"  {phase:<28} {(at - previous) * 1000:8.1f} ms   (at {at * 1000:8.1f} ms)")
+        previous = at
+    logger.info("Startup timing:\n" + "\n".join(lines))
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# The application runs from src/ and imports its packages top-level
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "src"))
@@ -0,0 +1,109 @@
+import random
+
+from core.camera_manager import DecodeThreadBudget, ReconnectBackoff, StreamHealth
+
+FULL_HD = 1920 * 1080
+
+
+def test_backoff_ceiling_doubles_up_to_cap():
+    rng = random.Random(1)
+    backoff = ReconnectBackoff(base=1.0, cap=10.0, rng=rng)
+    expected_rng = random.Random(1)
+    for ceiling in (1, 2, 4, 8, 10, 10, 10):
+        delay = backoff.next_delay()
+        assert delay == expected_rng.uniform(0, ceiling)
+        assert 0 <= delay <= ceiling
+
+
+def test_backoff_reset_starts_over():
+    backoff = ReconnectBackoff(base=2.0, cap=60.0, rng=random.Random(2))
+    for _ in range(5):
+        backoff.next_delay()
+    backoff.reset()
+    assert backoff.attempt == 0
+    assert backoff.next_delay() <= 2.0
+
+
+def test_backoff_jitter_spreads_retries():
+    delays = [ReconnectBackoff(cap=60.0, rng=random.Random(seed)).next_delay() for seed in range(50)]
+    assert len(set(delays)) == len(delays)
+
+
+def test_health_reports_closed_stream_with_last_error():
+    health = StreamHealth()
+    assert health.check(now=0) == (False, "capture not open")
+    health.mark_open_failed("connection refused")
+    assert health.check(now=0) == (False, "connection refused")
+    assert health.open_failures == 1
+
+
+def test_health_times_out_without_frames():
+    health = StreamHealth()
+    health.mark_opened()
+    opened = health.opened_at
+    assert health.check(now=opened + 4, frame_timeout=5) == (True, "")
+    alive, reason = health.check(now=opened + 6, frame_timeout=5)
+    assert not alive and reason == "no frames for 6.0s"
+
+    health.mark_frame()
+    assert health.check(now=health.last_frame_at + 4, frame_timeout=5) == (True, "")
+    assert health.frames == 1
+
+
+def test_health_consecutive_decode_errors_reset_on_frame():
+    health = StreamHealth()
+    health.mark_opened()
+    now = health.opened_at
+    for _ in range(2):
+        health.mark_decode_error()
+    assert health.check(now=now, max_decode_errors=3) == (True, "")
+    health.mark_decode_error("bad packet")
+    assert health.check(now=now, max_decode_errors=3) == (False, "3 consecutive decode errors")
+
+    health.mark_packet()
+    assert health.check(now=health.last_frame_at, max_decode_errors=3) == (True, "")
+    assert health.decode_errors == 0
+    assert health.total_decode_errors == 3
+    assert health.last_error == "bad packet"
+
+
+def test_health_reopen_clears_errors():
+    health = StreamHealth()
+    health.mark_opened()
+    health.mark_decode_error("bad packet")
+    health.mark_closed("stream ended")
+    assert health.check() == (False, "stream ended")
+    health.mark_opened()
+    assert health.check(now=health.opened_at) == (True, "")
+    assert health.decode_errors == 0 and health.last_error == ""
+
+
+def test_budget_splits_threads_by_resolution():
+    budget = DecodeThreadBudget(total=8, max_per_stream=4)
+    budget.register("4k", FULL_HD * 4)
+    budget.register("hd", FULL_HD)
+    budget.register("sd", FULL_HD // 4)
+    assert budget.allocate("4k", FULL_HD * 4) == 4
+    assert budget.allocate("hd", FULL_HD) == 1
+    assert budget.allocate("sd", FULL_HD // 4) == 1
+
+
+def test_budget_single_stream_is_capped():
+    budget = DecodeThreadBudget(total=16, max_per_stream=4)
+    assert budget.allocate("only", FULL_HD) == 4
+
+
+def test_budget_requested_threads_override_the_share():
+    budget = DecodeThreadBudget(total=2, max_per_stream=4)
+    budget.register("other", FULL_HD)
+    assert budget.allocate("pinned", FULL_HD, requested=6) == 6
+
+
+def test_budget_release_returns_the_share():
+    budget = DecodeThreadBudget(total=4, max_per_stream=4)
+    for name in ("a", "b", "c", "d"):
+        budget.register(name, FULL_HD)
+    assert budget.allocate("a", FULL_HD) == 1
+    for name in ("b", "c", "d"):
+        budget.release(name)
+    assert budget.allocate("a", FULL_HD) == 4
@@ -0,0 +1,76 @@
+import json
+import os
+import threading
+
+import pytest
+
+from utils import config as config_module
+from utils.config import DEFAULT_LAYOUT, ConfigStore, atomic_write_json, load_config
+
+
+@pytest.mark.parametrize("content", ['{"cameras": {"1": {"info": {"na', '{"cameras": {"1": {}}}', '[1, 2]'])
+def test_invalid_config_is_moved_aside(tmp_path, content):
+    path = tmp_path / "camera_config.json"
+    path.write_text(content, encoding="utf-8")
+    config = load_config(str(path))
+    assert config["cameras"] == {}
+    assert config["layout"] == DEFAULT_LAYOUT
+    assert not path.exists()
+    assert (tmp_path / "camera_config.json.bad").read_text(encoding="utf-8") == content
+
+
+def test_config_keys_come_back_as_integers(tmp_path):
+    path = tmp_path / "camera_config.json"
+    path.write_text(json.dumps({"cameras": {"3": {"info": {"name": "Gate"}}}, "ai_modes": {"3": "plates"}}),
+                    encoding="utf-8")
+    config = load_config(str(path))
+    assert config["cameras"] == {3: {"info": {"name": "Gate"}}}
+    assert config["ai_modes"] == {3: "plates"}
+    assert path.exists()
+
+
+def test_atomic_write_replaces_the_file_and_leaves_no_temporaries(tmp_path):
+    path = tmp_path / "camera_config.json"
+    atomic_write_json(str(path), {"layout": "1x1"})
+    atomic_write_json(str(path), {"layout": "3x3"})
+    assert json.loads(path.read_text(encoding="utf-8")) == {"layout": "3x3"}
+    assert os.listdir(tmp_path) == ["camera_config.json"]
+
+
+def test_failed_atomic_write_keeps_the_old_file(tmp_path):
+    path = tmp_path / "camera_config.json"
+    atomic_write_json(str(path), {"layout": "1x1"})
+    with pytest.raises(TypeError):
+        atomic_write_json(str(path), {"layout": object()})
+    assert json.loads(path.read_text(encoding="utf-8")) == {"layout": "1x1"}
+    assert os.listdir(tmp_path) == ["camera_config.json"]
+
+
+def test_saves_within_the_delay_are_written_once(tmp_path, monkeypatch):
+    writes = []
+    written = threading.Event()
+
+    def record(path, data):
+        writes.append(data)
+        written.set()
+
+    monkeypatch.setattr(config_module, "atomic_write_json", record)
+    store = ConfigStore(str(tmp_path / "camera_config.json"), delay=0.2)
+    for layout in ("1x1", "2x2", "3x3"):
+        store.save({"layout": layout})
+    assert written.wait(5)
+    assert writes == [{"layout": "3x3"}]
+
+    store.save({"layout": "4x4"})
+    store.flush()
+    store.flush()
+    assert writes == [{"layout": "3x3"}, {"layout": "4x4"}]
+
+
+def test_flush_writes_the_pending_config_immediately(tmp_path):
+    path = tmp_path / "camera_config.json"
+    store = ConfigStore(str(path), delay=60)
+    store.save({"cameras": {"1": {"info": {"name": "Gate"}}}})
+    assert not path.exists()
+    store.flush()
+    assert store.load()["cameras"] == {1: {"info": {"name": "Gate"}}}
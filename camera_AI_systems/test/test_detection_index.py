@@ -0,0 +1,49 @@
+import random
+
+from core.detection_index import DetectionIndex, normalize_plate
+from models.detection import Detection
+
+EVENT_TYPES = ("license_plate", "person", "watchlist_match")
+PLATES = ("30F12345", "30F12999", "30A00001", "51A80012", "")
+
+
+def random_detections(rng, count):
+    return [Detection(rng.randint(1, 4), rng.choice(EVENT_TYPES), label=rng.choice(PLATES), timestamp=i)
+            for i in range(count)]
+
+
+def test_query_matches_a_scan_of_the_retained_window():
+    rng = random.Random(7)
+    capacity = 50
+    index = DetectionIndex(capacity)
+    detections = random_detections(rng, 400)
+    for detection in detections:
+        index.add(detection)
+    retained = detections[-capacity:]
+    assert len(index) == capacity
+
+    for camera_id in (None, 1, 2, 5):
+        for event_type in (None,) + EVENT_TYPES:
+            for prefix in ("", "30", "30F", "30f-12", "51A80012", "9"):
+                expected = [detection for detection in reversed(retained)
+                            if DetectionIndex.matches(detection, camera_id, event_type, prefix)]
+                assert index.query(camera_id, event_type, prefix) == expected
+                assert index.query(camera_id, event_type, prefix, limit=3) == expected[:3]
+
+
+def test_eviction_drops_cameras_and_plates():
+    index = DetectionIndex(capacity=2)
+    index.add(Detection(1, "license_plate", label="30F12345"))
+    index.add(Detection(2, "person"))
+    index.add(Detection(3, "person"))
+    assert index.cameras() == [2, 3]
+    assert index.query(plate_prefix="30F") == []
+    assert [detection.camera_id for detection in index.query(event_type="person")] == [3, 2]
+
+
+def test_items_are_returned_instead_of_detections():
+    index = DetectionIndex()
+    detection = Detection(1, "license_plate", label="30F-123.45")
+    index.add(detection, item=("row", detection))
+    assert index.query(plate_prefix="30f123") == [("row", detection)]
+    assert normalize_plate(" 30f-123.45_ ") == "30F12345"
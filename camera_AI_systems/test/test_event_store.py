@@ -0,0 +1,103 @@
+import os
+import random
+import time
+from collections import Counter
+
+import pytest
+
+from core.event_store import ROLLUP_SECONDS, EventStore
+from models.detection import Detection
+
+HOURS = 10
+
+
+@pytest.fixture(scope="module")
+def events(tmp_path_factory):
+    """A closed store holding random events over the last ``HOURS`` hours, and the events"""
+    rng = random.Random(3)
+    now = time.time()
+    first_bucket = (int(now // ROLLUP_SECONDS) - HOURS) * ROLLUP_SECONDS
+    detections = []
+    for _ in range(3000):
+        # Whole seconds, so several events share a timestamp and paging has to break ties by id
+        timestamp = float(rng.randint(first_bucket, int(now) - 1))
+        detections.append(Detection(rng.randint(1, 3), rng.choice(("license_plate", "person")),
+                                    label="30F12345", timestamp=timestamp))
+    store = EventStore(str(tmp_path_factory.mktemp("events") / "events.db"), batch_size=128)
+    for detection in detections:
+        store.append(detection)
+    store.close()
+    return store, detections, first_bucket, now
+
+
+def brute_force(detections, start, end, camera_ids=None, event_types=None):
+    return Counter((detection.camera_id, detection.event_type) for detection in detections
+                   if start <= detection.timestamp < end
+                   and (not camera_ids or detection.camera_id in camera_ids)
+                   and (not event_types or detection.event_type in event_types))
+
+
+def test_summary_matches_raw_events_for_unaligned_ranges(events):
+    store, detections, first_bucket, now = events
+    rng = random.Random(5)
+    ranges = [(first_bucket, now + 1), (first_bucket + 0.5, now), (first_bucket + 90, first_bucket + 1500)]
+    for _ in range(40):
+        start = rng.uniform(first_bucket - ROLLUP_SECONDS, now)
+        ranges.append((start, rng.uniform(start, now + ROLLUP_SECONDS)))
+    for start, end in ranges:
+        for camera_ids, event_types in ((None, None), ([1, 3], None), (None, ["person"]), ([2], ["license_plate"])):
+            summary = store.summary(start, end, camera_ids, event_types)
+            assert Counter({(camera_id, event_type): count for camera_id, event_type, count in summary}) == \
+                brute_force(detections, start, end, camera_ids, event_types)
+            assert store.count(start, end, camera_ids, event_types) == \
+                sum(brute_force(detections, start, end, camera_ids, event_types).values())
+
+
+def test_rollups_count_each_hour(events):
+    store, detections, first_bucket, now = events
+    expected = Counter((int(detection.timestamp // ROLLUP_SECONDS) * ROLLUP_SECONDS,
+                        detection.camera_id, detection.event_type) for detection in detections)
+    rollups = store.rollups(first_bucket, now + ROLLUP_SECONDS)
+    assert {(bucket, camera_id, event_type): count for bucket, camera_id, event_type, count in rollups} == expected
+    assert [row[0] for row in rollups] == sorted(row[0] for row in rollups)
+
+
+def test_keyset_pages_cover_the_range_once(events):
+    store, detections, first_bucket, now = events
+    start, end = first_bucket + 1800, now
+    everything = store.query(start, end, limit=len(detections))
+    assert len(everything) == sum(brute_force(detections, start, end).values())
+
+    pages = []
+    after = None
+    while True:
+        page = store.query(start, end, limit=97, after=after)
+        if not page:
+            break
+        pages.extend(page)
+        after = (page[-1][1], page[-1][0])
+    assert pages == everything
+    assert [(row[1], row[0]) for row in pages] == sorted(((row[1], row[0]) for row in pages), reverse=True)
+
+
+def test_reopening_keeps_events_and_rollups(events):
+    store, detections, first_bucket, now = events
+    reopened = EventStore(store.path)
+    try:
+        assert reopened.count(first_bucket, now + 1) == len(detections)
+    finally:
+        reopened.close()
+
+
+def test_read_only_store_queries_without_writing(events):
+    store, detections, first_bucket, now = events
+    modified = os.path.getmtime(store.path)
+    reader = EventStore(store.path, read_only=True)
+    try:
+        reader.append(Detection(1, "person", timestamp=now))
+        assert reader.count(first_bucket, now + 1) == len(detections)
+        assert len(reader.query(first_bucket, now + 1, limit=5)) == 5
+    finally:
+        reader.close()
+    assert store.count(first_bucket, now + 1) == len(detections)
+    assert os.path.getmtime(store.path) == modified
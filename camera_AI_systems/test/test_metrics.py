@@ -0,0 +1,112 @@
+import bisect
+import random
+import threading
+
+import pytest
+
+from core.metrics import LATENCY_BUCKETS_MS, Histogram, MetricsRegistry, rates
+
+
+def test_quantile_of_empty_histogram_is_zero():
+    assert Histogram().quantile(0.5) == 0.0
+    assert Histogram().snapshot() == {"count": 0, "mean": 0.0, "p50": 0.0, "p95": 0.0, "p99": 0.0}
+
+
+def test_quantile_interpolates_within_a_bucket():
+    buckets = (10, 20, 30)
+    # Four values in (10, 20]: the median sits halfway through that bucket
+    assert Histogram._quantile(buckets, [0, 4, 0, 0], 4, 0.5) == 15.0
+    assert Histogram._quantile(buckets, [2, 2, 0, 0], 4, 0.25) == 5.0
+    assert Histogram._quantile(buckets, [2, 2, 0, 0], 4, 1.0) == 20.0
+
+
+def test_quantile_skips_empty_buckets():
+    assert Histogram._quantile((10, 20, 30), [1, 0, 1, 0], 2, 0.5) == 10.0
+    assert Histogram._quantile((10, 20, 30), [1, 0, 1, 0], 2, 0.75) == 25.0
+
+
+def test_quantile_in_overflow_bucket_reports_the_last_bound():
+    assert Histogram._quantile((10, 20), [0, 0, 3], 3, 0.5) == 20.0
+
+
+@pytest.mark.parametrize("q", [0.5, 0.9, 0.95, 0.99])
+def test_quantile_lands_in_the_bucket_of_the_exact_quantile(q):
+    rng = random.Random(11)
+    values = sorted(rng.lognormvariate(3, 1) for _ in range(5000))
+    values = [value for value in values if value <= LATENCY_BUCKETS_MS[-1]]
+    histogram = Histogram()
+    for value in values:
+        histogram.observe(value)
+    exact = values[max(0, int(q * len(values)) - 1)]
+    index = bisect.bisect_left(LATENCY_BUCKETS_MS, exact)
+    lower = LATENCY_BUCKETS_MS[index - 1] if index else 0
+    assert lower <= histogram.quantile(q) <= LATENCY_BUCKETS_MS[index]
+
+
+def test_observations_from_many_threads_are_merged():
+    histogram = Histogram(buckets=(1, 2))
+
+    def observe():
+        for _ in range(1000):
+            histogram.observe(1.5)
+
+    threads = [threading.Thread(target=observe) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert histogram.count == 8000
+    assert histogram.total == 8000 * 1.5
+    assert histogram.bucket_counts() == [0, 8000, 0]
+    assert histogram.snapshot()["mean"] == 1.5
+
+
+def test_registry_returns_the_same_metric_for_equal_labels():
+    registry = MetricsRegistry()
+    counter = registry.counter("frames_total", "Frames", camera=1)
+    assert registry.counter("frames_total", camera="1") is counter
+    assert registry.counter("frames_total", camera=2) is not counter
+    counter.inc()
+    counter.inc(2)
+    assert registry.snapshot()["frames_total"] == {(("camera", "1"),): 3, (("camera", "2"),): 0}
+
+
+def test_registry_rejects_a_name_reused_for_another_kind():
+    registry = MetricsRegistry()
+    registry.counter("frames_total")
+    with pytest.raises(ValueError):
+        registry.gauge("frames_total")
+
+
+def test_gauge_reads_its_callback_and_survives_failures():
+    registry = MetricsRegistry()
+    values = [5]
+    gauge = registry.gauge("queue_depth", fn=lambda: values[0])
+    assert gauge.value == 5
+    values[0] = 7
+    assert registry.snapshot()["queue_depth"] == {(): 7}
+    registry.gauge("queue_depth", fn=lambda: 1 / 0)
+    assert gauge.value == 0
+
+
+def test_remove_drops_matching_series_only():
+    registry = MetricsRegistry()
+    registry.counter("frames_total", camera=1)
+    registry.counter("frames_total", camera=2)
+    registry.histogram("frame_latency_ms", camera=1, span="grab")
+    registry.remove(camera=1)
+    assert [labels for labels, _ in registry.series("frames_total")] == [{"camera": "2"}]
+    assert registry.series("frame_latency_ms") == []
+
+
+def test_collect_is_sorted_and_keeps_help():
+    registry = MetricsRegistry()
+    registry.gauge("b_gauge", "Second")
+    registry.counter("a_total", "First", camera=1)
+    assert [(name, help, labels) for name, help, labels, _ in registry.collect()] == \
+        [("a_total", "First", {"camera": "1"}), ("b_gauge", "Second", {})]
+
+
+def test_rates_ignore_counter_resets():
+    assert rates({"1": 10, "2": 50}, {"1": 30, "2": 0, "3": 4}, 2.0) == {"1": 10.0, "2": 0.0, "3": 2.0}
+    assert rates({"1": 10}, {"1": 30}, 0) == {"1": 0.0}
@@ -0,0 +1,63 @@
+import urllib.error
+import urllib.request
+
+import pytest
+
+from core.metrics import MetricsRegistry
+from core.metrics_server import MetricsServer, render
+
+
+def test_render_counters_and_gauges():
+    registry = MetricsRegistry()
+    registry.counter("frames_total", "Frames read", camera=1).inc(3)
+    registry.gauge("queue_depth", fn=lambda: float("nan"))
+    registry.gauge("running", "Whether \"it\" runs\nat all").set(True)
+    assert render(registry) == (
+        "# HELP camera_ai_frames_total Frames read\n"
+        "# TYPE camera_ai_frames_total counter\n"
+        'camera_ai_frames_total{camera="1"} 3\n'
+        "# TYPE camera_ai_queue_depth gauge\n"
+        "camera_ai_queue_depth NaN\n"
+        '# HELP camera_ai_running Whether \\"it\\" runs\\nat all\n'
+        "# TYPE camera_ai_running gauge\n"
+        "camera_ai_running 1\n"
+    )
+
+
+def test_render_histogram_buckets_are_cumulative():
+    registry = MetricsRegistry()
+    histogram = registry.histogram("latency_ms", buckets=(10, 20), span="grab")
+    for value in (5, 15, 15, 40):
+        histogram.observe(value)
+    assert render(registry, namespace="") == (
+        "# TYPE latency_ms histogram\n"
+        'latency_ms_bucket{span="grab",le="10.0"} 1\n'
+        'latency_ms_bucket{span="grab",le="20.0"} 3\n'
+        'latency_ms_bucket{span="grab",le="+Inf"} 4\n'
+        'latency_ms_sum{span="grab"} 75.0\n'
+        'latency_ms_count{span="grab"} 4\n'
+    )
+
+
+def test_type_line_is_written_once_per_name():
+    registry = MetricsRegistry()
+    registry.counter("frames_total", "Frames", camera=1)
+    registry.counter("frames_total", "Frames", camera=2)
+    assert render(registry).count("# TYPE camera_ai_frames_total") == 1
+
+
+def test_server_serves_metrics_and_rejects_a_taken_port():
+    registry = MetricsRegistry()
+    registry.counter("frames_total").inc()
+    server = MetricsServer(port=0, metrics_registry=registry)
+    server.start()
+    try:
+        with urllib.request.urlopen(f"http://127.0.0.1:{server.port}/metrics", timeout=5) as response:
+            assert response.read().decode("utf-8") == render(registry)
+        with pytest.raises(urllib.error.HTTPError):
+            urllib.request.urlopen(f"http://127.0.0.1:{server.port}/other", timeout=5)
+        with pytest.raises(OSError):
+            MetricsServer(port=server.port, metrics_registry=registry).start()
+    finally:
+        server.stop()
+    assert not server.running
@@ -0,0 +1,72 @@
+import csv
+import os
+
+import pytest
+
+from core.event_store import EventStore
+from core.report_generator import EXPORT_COLUMNS, ReportCursor, export_report
+from models.detection import Detection
+
+EVENTS = 250
+
+
+@pytest.fixture
+def store(tmp_path):
+    (tmp_path / "db").mkdir()
+    store = EventStore(str(tmp_path / "db" / "events.db"), batch_size=64)
+    for i in range(EVENTS):
+        store.append(Detection(i % 3 + 1, "license_plate", label=f"30F{i:05d}", timestamp=1000.0 + i))
+    store.close()
+    reader = EventStore(store.path, read_only=True)
+    yield reader
+    reader.close()
+
+
+def cursor(store):
+    return ReportCursor(store, 0, 10000)
+
+
+def test_csv_export_writes_every_row_newest_first(store, tmp_path):
+    path = str(tmp_path / "report.csv")
+    progress = []
+    written = export_report(cursor(store), path, "csv", total=EVENTS,
+                            progress=lambda done, total: progress.append((done, total)), page_size=100)
+    assert written == EVENTS
+    assert progress == [(100, EVENTS), (200, EVENTS), (250, EVENTS)]
+    with open(path, newline="", encoding="utf-8") as f:
+        rows = list(csv.reader(f))
+    assert rows[0] == EXPORT_COLUMNS
+    assert [row[4] for row in rows[1:]] == [f"30F{i:05d}" for i in reversed(range(EVENTS))]
+    assert not os.path.exists(path + ".part")
+
+
+def test_cancelled_export_removes_the_partial_file(store, tmp_path):
+    path = str(tmp_path / "report.csv")
+    pages = []
+    written = export_report(cursor(store), path, "csv", progress=lambda done, total: pages.append(done),
+                            cancelled=lambda: len(pages) >= 1, page_size=100)
+    assert written is None
+    assert pages == [100]
+    assert sorted(os.listdir(tmp_path)) == ["db"]
+
+
+def test_failed_export_keeps_the_previous_report(store, tmp_path):
+    path = tmp_path / "report.csv"
+    path.write_text("previous\n", encoding="utf-8")
+
+    class FailingCursor(ReportCursor):
+        def fetch(self, limit):
+            if self._after is not None:
+                raise OSError("disk full")
+            return super().fetch(limit)
+
+    with pytest.raises(OSError):
+        export_report(FailingCursor(store, 0, 10000), str(path), "csv", page_size=100)
+    assert path.read_text(encoding="utf-8") == "previous\n"
+    assert not os.path.exists(str(path) + ".part")
+
+
+def test_unknown_format_is_rejected(store, tmp_path):
+    with pytest.raises(ValueError):
+        export_report(cursor(store), str(tmp_path / "report.xls"), "xls")
+    assert sorted(os.listdir(tmp_path)) == ["db"]
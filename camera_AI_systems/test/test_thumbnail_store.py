@@ -0,0 +1,60 @@
+import datetime
+import os
+
+import numpy as np
+
+from core.metrics import registry
+from core.thumbnail_store import EVICT_TARGET, ThumbnailStore
+
+
+def crop(seed, size=32):
+    return np.random.default_rng(seed).integers(0, 256, (size, size, 3), dtype=np.uint8)
+
+
+def disk_bytes(root):
+    return sum(entry.stat().st_size for day in os.scandir(root) for entry in os.scandir(day.path))
+
+
+def test_identical_crops_of_a_day_are_written_once(tmp_path):
+    deduplicated = registry.counter("thumbnails_deduplicated_total")
+    before = deduplicated.value
+    store = ThumbnailStore(str(tmp_path))
+    today = datetime.datetime(2026, 3, 1, 9).timestamp()
+    first = store.put(crop(1), today)
+    again = store.put(crop(1), today + 60)
+    other = store.put(crop(2), today)
+    next_day = store.put(crop(1), today + 86400)
+    store.close()
+
+    assert first == again != other
+    assert first.split("/")[1] == next_day.split("/")[1]
+    assert first.split("/")[0] == "2026-03-01" and next_day.split("/")[0] == "2026-03-02"
+    assert deduplicated.value - before == 1
+    for key in (first, other, next_day):
+        assert store.exists(key)
+    assert sorted(os.listdir(tmp_path / "2026-03-01")) == sorted(key.split("/")[1] for key in (first, other))
+
+
+def test_large_crops_are_scaled_down(tmp_path):
+    store = ThumbnailStore(str(tmp_path), size=16)
+    key = store.put(crop(3, size=64), datetime.datetime(2026, 3, 1).timestamp())
+    store.close()
+    import cv2
+    assert cv2.imread(store.path(key)).shape == (16, 16, 3)
+
+
+def test_eviction_drops_the_oldest_days_first(tmp_path):
+    days = ["2026-01-01", "2026-01-02", "2026-01-03"]
+    for day in days:
+        (tmp_path / day).mkdir()
+        (tmp_path / day / "old.jpg").write_bytes(b"\0" * 1000)
+    store = ThumbnailStore(str(tmp_path), max_bytes=2500)
+    key = store.put(crop(4, size=8), datetime.datetime(2026, 1, 4).timestamp())
+    store.close()
+
+    remaining = sorted(os.listdir(tmp_path))
+    assert "2026-01-01" not in remaining
+    assert remaining == sorted(days + ["2026-01-04"])[-len(remaining):]
+    assert store.exists(key)
+    assert disk_bytes(tmp_path) <= 2500 * EVICT_TARGET
+    assert store._total_bytes == disk_bytes(tmp_path)
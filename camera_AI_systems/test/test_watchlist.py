@@ -0,0 +1,92 @@
+import random
+import string
+
+import pytest
+
+from core.watchlist import (MATCH_EVENT_TYPE, PLATE_EVENT_TYPE, Watchlist, canonical_plate,
+                            edit_distance)
+from models.detection import Detection
+
+ALPHABET = string.ascii_uppercase + string.digits
+
+
+def levenshtein(a, b):
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char_a != char_b)))
+        previous = current
+    return previous[-1]
+
+
+def misread(rng, plate, edits):
+    for _ in range(edits):
+        i = rng.randrange(len(plate) + 1)
+        kind = rng.choice(("insert", "delete", "replace")) if plate else "insert"
+        if kind == "insert":
+            plate = plate[:i] + rng.choice(ALPHABET) + plate[i:]
+        elif kind == "delete" and i < len(plate):
+            plate = plate[:i] + plate[i + 1:]
+        elif i < len(plate):
+            plate = plate[:i] + rng.choice(ALPHABET) + plate[i + 1:]
+    return plate
+
+
+@pytest.mark.parametrize("max_distance", [1, 2])
+def test_match_agrees_with_brute_force(max_distance):
+    rng = random.Random(max_distance)
+    plates = {"".join(rng.choice(ALPHABET) for _ in range(rng.randint(5, 8))) for _ in range(150)}
+    watchlist = Watchlist(max_distance=max_distance)
+    for plate in plates:
+        watchlist.add(plate)
+    keys = {canonical_plate(plate) for plate in plates}
+
+    reads = [misread(rng, rng.choice(sorted(plates)), rng.randint(0, max_distance + 1)) for _ in range(600)]
+    reads += ["".join(rng.choice(ALPHABET) for _ in range(6)) for _ in range(150)]
+    for read in reads:
+        key = canonical_plate(read)
+        nearest = min(levenshtein(key, candidate) for candidate in keys)
+        match = watchlist.match(read)
+        if nearest > max_distance:
+            assert match is None, read
+        else:
+            assert match is not None, read
+            assert match.distance == nearest
+            assert levenshtein(key, canonical_plate(match.entry.plate)) == nearest
+
+
+def test_confusable_characters_are_exact_hits():
+    watchlist = Watchlist()
+    watchlist.add("51A-80012", "stolen")
+    match = watchlist.match("51a 8O0I2")
+    assert match.distance == 0
+    assert match.entry.note == "stolen"
+
+
+def test_edit_distance_stops_at_limit():
+    assert edit_distance("ABCDEF", "ABCDEF", 1) == 0
+    assert edit_distance("ABCDEF", "ABXDEF", 1) == 1
+    assert edit_distance("ABCDEF", "UVWXYZ", 1) == 2
+    assert edit_distance("AB", "ABCDE", 2) == 3
+
+
+def test_alerts_only_for_plate_detections():
+    watchlist = Watchlist()
+    watchlist.add("30F12345")
+    detections = [
+        Detection(1, PLATE_EVENT_TYPE, label="30F-12346"),
+        Detection(2, PLATE_EVENT_TYPE, label="99Z99999"),
+        Detection(3, "person", label="30F12345"),
+    ]
+    alerts = watchlist.alerts(detections)
+    assert [(alert.camera_id, alert.event_type, alert.label) for alert in alerts] == \
+        [(1, MATCH_EVENT_TYPE, "30F12345")]
+
+
+def test_load_skips_comments_and_blank_rows(tmp_path):
+    path = tmp_path / "watchlist.csv"
+    path.write_text("# plate,note\n30F12345,red sedan\n\n  ,\n51A80012\n", encoding="utf-8")
+    watchlist = Watchlist.load(str(path))
+    assert len(watchlist) == 2
+    assert watchlist.match("30F12345").entry.note == "red sedan"